@@ -0,0 +1,302 @@
+"""
+PIPELINE BENCHMARKS
+-------------------
+
+Times and memory-profiles every pipeline stage on synthetic data:
+- load_data, clean_inflation / clean_wages / build_rollups (IMF), merge_data, save_outputs
+- DB load (full + no-op incremental) and the dashboard queries from src.db.query,
+  once per --backend (sqlite, duckdb, postgres); each backend runs in its own
+  process, so module-level engines never mix
+
+Each stage is run --repeat times: wall time (min / median) via perf_counter,
+peak Python allocations via tracemalloc. Results go to a JSON file; pass
+--compare OLD.json to flag stages that got slower. A stage that raises is
+recorded with its error (never as a timing) and makes the run exit 1; when
+the full DB load fails, the DB stages after it are not timed.
+
+Usage:
+    python -m benchmarks.run_benchmarks --countries 10 --years 2 --indicators 2
+    python -m benchmarks.run_benchmarks --backend sqlite duckdb
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<old>.json
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic_data import generate
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+# A stage counts as a regression when its median is this much slower
+REGRESSION_THRESHOLD = 1.10
+
+# -------------------------------------------------------------------------------------
+# Measurement
+# -------------------------------------------------------------------------------------
+
+def _rows(result):
+    if hasattr(result, "shape"):
+        return int(result.shape[0])
+    if isinstance(result, (list, tuple)) and result and hasattr(result[0], "shape"):
+        return int(sum(r.shape[0] for r in result))
+    if isinstance(result, (list, tuple, dict)):
+        return len(result)
+    return None
+
+
+def measure(name, fn, repeat, results):
+    """Run fn() `repeat` times; keep the last result."""
+    runs, peaks, result, error = [], [], None, None
+
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e).splitlines()[0]}"
+        finally:
+            runs.append(time.perf_counter() - started)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        if error:
+            break
+
+    results[name] = {
+        "median_s": statistics.median(runs),
+        "min_s": min(runs),
+        "runs_s": runs,
+        "peak_mb": max(peaks) / 1e6,
+        "rows_out": None if error else _rows(result),
+    }
+    if error:
+        results[name]["error"] = error
+
+    status = f"❌ {error}" if error else f"{results[name]['median_s'] * 1000:9.1f} ms"
+    print(f"   {name:<28} {status}  (peak {results[name]['peak_mb']:.1f} MB)")
+    return result
+
+# -------------------------------------------------------------------------------------
+# Stages
+# -------------------------------------------------------------------------------------
+
+def run_processing_stages(meta, repeat):
+    # Imported after chdir / env setup: the pipeline modules use relative paths
+    from src.processing import clean_and_merge as cm
+    from src.processing import country_codes
+    from src.processing.commodity_rollups import build_rollups, headline_annual
+
+    country_codes.reset_lookup()
+    for column in meta["extra_indicators"]:
+        cm.EXTRA_INDICATORS.setdefault(column, f"worldbank_{column}.csv")
+
+    results = {}
+    print("⏱  Processing stages")
+
+    inflation, imf, wages = measure("load_data", cm.load_data, repeat, results)
+    extras = measure("load_extra_indicators", cm.load_extra_indicators, repeat, results)
+
+    inflation_clean = measure("clean_inflation", lambda: cm.clean_inflation(inflation.copy()), repeat, results)
+    wages_clean = measure("clean_wages", lambda: cm.clean_wages(wages.copy()), repeat, results)
+    extras_clean = measure(
+        "clean_extra_indicators",
+        lambda: [cm.clean_indicator(df.copy(), column) for column, df in extras.items()],
+        repeat, results,
+    )
+    rollups = measure("build_rollups (imf)", lambda: build_rollups(imf.copy()), repeat, results)
+    imf_annual = headline_annual(rollups["annual"])
+
+    merged = measure(
+        "merge_data",
+        lambda: cm.merge_data(inflation_clean, imf_annual, wages_clean, extras_clean),
+        repeat, results,
+    )
+    measure("save_outputs", lambda: cm.save_outputs(merged), repeat, results)
+
+    sample_country = merged["iso3"].iloc[0] if len(merged) else "USA"
+    return results, str(sample_country)
+
+
+def run_db_stages(repeat, sample_country):
+    from src.db import load_to_db, query
+    from src.db.config import BACKEND
+
+    results = {}
+    print(f"⏱  Database stages ({BACKEND})")
+    load_to_db.create_tables()
+    measure("db_load_full", load_to_db.load_csv_to_db, repeat, results)
+    if "error" in results["db_load_full"]:
+        # The remaining stages would time an empty / half-loaded database
+        print("   ⏭  database stages skipped: the full load failed")
+        return results
+    measure("db_load_incremental_noop", load_to_db.load_incremental, repeat, results)
+
+    print(f"⏱  Dashboard queries ({BACKEND})")
+    # Measure the backend, not the in-process result cache
+    query.QUERY_CACHE_ENABLED = False
+    measure("query_load_all_data", query.load_all_data, repeat, results)
+    measure("query_load_countries", query.load_countries, repeat, results)
+    measure("query_load_years", query.load_years, repeat, results)
+    measure("query_macro_data_all", lambda: query.load_macro_data(), repeat, results)
+    measure("query_macro_data_country",
+            lambda: query.load_macro_data([sample_country], (2000, 2020)), repeat, results)
+
+    return results
+
+BACKEND_URLS = {
+    "sqlite": lambda workdir: f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+    "duckdb": lambda workdir: f"duckdb:///{os.path.join(workdir, 'bench.duckdb')}",
+    "postgres": lambda workdir: os.environ.get("DATABASE_URL") or None,
+}
+
+
+def run_backend(backend, workdir, repeat, sample_country):
+    """DB stages for one backend in a child process; returns its results."""
+    url = BACKEND_URLS[backend](workdir)
+    if url is None:
+        return {"db_backend_unavailable": {"median_s": 0.0, "min_s": 0.0, "runs_s": [], "peak_mb": 0.0,
+                                           "rows_out": None, "error": "postgres needs DATABASE_URL"}}
+
+    output = os.path.join(workdir, f"db-{backend}.json")
+    env = {
+        **os.environ,
+        "DATABASE_URL": url,
+        "DATA_VERSION_FILE": os.path.join(workdir, "data", "processed", f".data_version-{backend}"),
+        "DASHBOARD_SNAPSHOT_DIR": os.path.join(workdir, "data", f"snapshot-{backend}"),
+        "PYTHONPATH": ROOT_DIR,
+    }
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.run_benchmarks", "--db-stages", output,
+         "--repeat", str(repeat), "--sample-country", sample_country],
+        cwd=workdir, env=env, check=True,
+    )
+    with open(output) as f:
+        return json.load(f)
+
+# -------------------------------------------------------------------------------------
+# Comparison
+# -------------------------------------------------------------------------------------
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\n📊 Compared with {baseline_path}")
+    regressions = []
+    for name, stage in current["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if old and "error" in stage and "error" not in old:
+            # A stage that now fails is never "faster"
+            print(f"   ❌ {name:<28} failed: {stage['error']}")
+            regressions.append(name)
+            continue
+        if not old or "error" in stage or "error" in old:
+            continue
+        ratio = stage["median_s"] / max(old["median_s"], 1e-9)
+        flag = "🔺" if ratio > REGRESSION_THRESHOLD else "  "
+        print(f"   {flag} {name:<28} {old['median_s'] * 1000:9.1f} → "
+              f"{stage['median_s'] * 1000:9.1f} ms  (x{ratio:.2f})")
+        if ratio > REGRESSION_THRESHOLD:
+            regressions.append(name)
+    return regressions
+
+# -------------------------------------------------------------------------------------
+# Entry point
+# -------------------------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ETL pipeline on synthetic data")
+    parser.add_argument("--countries", type=float, default=1.0, help="country scale (1 = 240)")
+    parser.add_argument("--years", type=float, default=1.0, help="year scale (1 = 65)")
+    parser.add_argument("--indicators", type=float, default=1.0, help="indicator scale (1 = 3)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", help="keep generated data here (default: temp dir)")
+    parser.add_argument("--output", help="result JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result JSON to compare against")
+    parser.add_argument("--backend", nargs="+", choices=sorted(BACKEND_URLS),
+                        help="database backends to compare (default: sqlite, or postgres "
+                             "when DATABASE_URL is set); postgres uses DATABASE_URL")
+    # Internal: run only the DB stages in this (child) process
+    parser.add_argument("--db-stages", metavar="OUTPUT", help=argparse.SUPPRESS)
+    parser.add_argument("--sample-country", default="USA", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.db_stages:
+        with open(args.db_stages, "w") as f:
+            json.dump(run_db_stages(args.repeat, args.sample_country), f)
+        return 0
+
+    backends = args.backend or (["postgres"] if os.getenv("DATABASE_URL") else ["sqlite"])
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="econ-bench-"))
+    meta = generate(workdir, args.countries, args.years, args.indicators)
+    os.chdir(workdir)
+
+    started = datetime.now(timezone.utc)
+    stages, sample_country = run_processing_stages(meta, args.repeat)
+
+    for backend in backends:
+        db_results = run_backend(backend, workdir, args.repeat, sample_country)
+        # Several backends → suffix the stage names so each is compared with its own history
+        suffix = f" [{backend}]" if len(backends) > 1 else ""
+        stages.update({f"{name}{suffix}": result for name, result in db_results.items()})
+
+    report = {
+        "meta": {
+            **meta,
+            "scale": {"countries": args.countries, "years": args.years, "indicators": args.indicators},
+            "repeat": args.repeat,
+            "database": backends,
+            "started_at": started.isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": stages,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, started.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    output = os.path.join(ROOT_DIR, output) if not os.path.isabs(output) else output
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {output}")
+
+    failed = [name for name, stage in stages.items() if "error" in stage]
+    if failed:
+        print(f"❌ Failed stages: {', '.join(failed)}")
+
+    if args.compare:
+        regressions = compare(report, os.path.join(ROOT_DIR, args.compare)
+                              if not os.path.isabs(args.compare) else args.compare)
+        if regressions:
+            print(f"⚠️ Slower than baseline (or failing): {', '.join(regressions)}")
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+SYNTHETIC RAW DATA GENERATOR
+----------------------------
+
+Writes World Bank / IMF / OECD raw files with the same layout as the real
+exports, at a configurable scale, into <workdir>/data/raw/:
+- worldbank_inflation.csv (+ worldbank_<indicator>.csv per extra indicator)
+- imf_commodity_price.csv (monthly, one column per commodity)
+- oecd_wages.csv (30-column SDMX layout, two measures per country-year)
+- data/reference/iso3_lookup.csv so synthetic countries resolve to ISO3
+
+Scale 1x ≈ the real pull: 240 countries, 65 years, 3 indicators, 63 commodities.
+
+Usage: python -m benchmarks.synthetic_data WORKDIR [--countries 10] [--years 2] [--indicators 5]
+
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pycountry
+
+BASE_COUNTRIES = 240
+BASE_YEARS = 65
+BASE_INDICATORS = 3
+BASE_COMMODITIES = 63
+LAST_YEAR = 2024
+
+OECD_COLUMNS = [
+    "STRUCTURE", "STRUCTURE_ID", "STRUCTURE_NAME", "ACTION", "REF_AREA", "Reference area",
+    "MEASURE", "Measure", "UNIT_MEASURE", "Unit of measure", "PAY_PERIOD", "Pay period",
+    "PRICE_BASE", "Price base", "AGGREGATION_OPERATION", "Aggregation operation", "SEX", "Sex",
+    "TIME_PERIOD", "Time period", "OBS_VALUE", "Observation value", "BASE_PER", "Base period",
+    "OBS_STATUS", "Observation status", "UNIT_MULT", "Unit multiplier", "DECIMALS", "Decimals",
+]
+
+# -------------------------------------------------------------------------------------
+# Countries
+# -------------------------------------------------------------------------------------
+
+def make_countries(n):
+    """(name, alpha_2-ish code, iso3) — real countries first, then synthetic ones."""
+    real = [(c.name, c.alpha_2, c.alpha_3) for c in pycountry.countries]
+    countries = real[:n]
+    for i in range(len(countries), n):
+        countries.append((f"Synthetic Country {i:06d}", f"Q{i:06d}", f"SYN{i:06d}"))
+    return countries
+
+
+def extra_indicator_names(n_indicators):
+    # inflation is always present; the rest are the real extras, then synthetic ones
+    names = ["gdp_per_capita", "unemployment_rate"]
+    names += [f"indicator_{i:03d}" for i in range(len(names), n_indicators - 1)]
+    return names[:max(n_indicators - 1, 0)]
+
+# -------------------------------------------------------------------------------------
+# Writers
+# -------------------------------------------------------------------------------------
+
+def write_worldbank(raw_dir, countries, years, indicators, rng):
+    codes = np.repeat([c[1] for c in countries], len(years))
+    names = np.repeat([c[0] for c in countries], len(years))
+    year_col = np.tile(years, len(countries))
+
+    files = {"inflation_rate": "worldbank_inflation.csv"}
+    files.update({name: f"worldbank_{name}.csv" for name in indicators})
+
+    for column, file_name in files.items():
+        values = rng.normal(5, 4, len(year_col))
+        values[rng.random(len(values)) < 0.05] = np.nan
+        df = pd.DataFrame({"country_code": codes, "country": names, "year": year_col, column: values})
+        df.dropna(subset=[column]).to_csv(os.path.join(raw_dir, file_name), index=False)
+
+
+def write_imf(raw_dir, years, n_commodities, rng):
+    dates = pd.date_range(f"{years[0]}-01-01", f"{years[-1]}-12-01", freq="MS")
+    columns = ["All Commodity Price Index"] + [f"Commodity {i:03d}" for i in range(1, n_commodities)]
+    walk = 100 + rng.normal(0, 1, (len(dates), len(columns))).cumsum(axis=0)
+
+    df = pd.DataFrame(np.abs(walk), columns=columns)
+    df.insert(0, "Date", dates.strftime("%Y-%m-%d"))
+    df.iloc[::-1].to_csv(os.path.join(raw_dir, "imf_commodity_price.csv"), index=False)
+
+
+def write_oecd(raw_dir, countries, years, rng):
+    n = len(countries) * len(years) * 2
+    df = pd.DataFrame({column: "" for column in OECD_COLUMNS}, index=range(n))
+
+    df["STRUCTURE"] = "DATAFLOW"
+    df["STRUCTURE_ID"] = "OECD.ELS.SAE:DSD_EARNINGS@AV_AN_WAGE(1.0)"
+    df["REF_AREA"] = np.repeat([c[2] for c in countries], len(years) * 2)
+    df["MEASURE"] = "WG"
+    df["UNIT_MEASURE"] = np.tile(["USD_PPP", "USD"], len(countries) * len(years))
+    df["TIME_PERIOD"] = np.tile(np.repeat(years, 2), len(countries))
+    df["OBS_VALUE"] = rng.normal(50000, 10000, n).round(3)
+    df["OBS_STATUS"] = "A"
+    df.to_csv(os.path.join(raw_dir, "oecd_wages.csv"), index=False)
+
+
+def write_lookup(workdir, countries):
+    # Real countries resolve through pycountry; synthetic ones are pre-seeded
+    rows = [(name, iso3, "country") for name, _, iso3 in countries if iso3.startswith("SYN")]
+    rows += [(iso3, iso3, "country") for _, _, iso3 in countries if iso3.startswith("SYN")]
+    path = os.path.join(workdir, "data", "reference", "iso3_lookup.csv")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame(rows, columns=["key", "iso3", "kind"]).to_csv(path, index=False)
+
+# -------------------------------------------------------------------------------------
+# Entry point
+# -------------------------------------------------------------------------------------
+
+def generate(workdir, countries=1.0, years=1.0, indicators=1.0, seed=42):
+    """Write a synthetic raw data tree under `workdir`. Scales multiply the 1x sizes."""
+    rng = np.random.default_rng(seed)
+
+    n_countries = max(int(BASE_COUNTRIES * countries), 1)
+    n_years = max(int(BASE_YEARS * years), 2)
+    n_indicators = max(int(BASE_INDICATORS * indicators), 1)
+    n_commodities = max(int(BASE_COMMODITIES * indicators), 1)
+
+    raw_dir = os.path.join(workdir, "data", "raw")
+    os.makedirs(raw_dir, exist_ok=True)
+
+    country_list = make_countries(n_countries)
+    year_list = np.arange(LAST_YEAR - n_years + 1, LAST_YEAR + 1)
+    extras = extra_indicator_names(n_indicators)
+
+    write_worldbank(raw_dir, country_list, year_list, extras, rng)
+    write_imf(raw_dir, year_list, n_commodities, rng)
+    write_oecd(raw_dir, country_list, year_list, rng)
+    write_lookup(workdir, country_list)
+
+    meta = {
+        "countries": n_countries,
+        "years": n_years,
+        "indicators": n_indicators,
+        "commodities": n_commodities,
+        "extra_indicators": extras,
+    }
+    print(f"🧪 Synthetic data → {raw_dir}: {meta['countries']:,} countries × "
+          f"{meta['years']} years × {meta['indicators']} indicators")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic raw data")
+    parser.add_argument("workdir")
+    parser.add_argument("--countries", type=float, default=1.0)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--indicators", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate(args.workdir, args.countries, args.years, args.indicators, args.seed)
@@ -0,0 +1,207 @@
+"""
+DERIVED INDICATORS
+------------------
+
+Computed for every country at once on the merged dataset (grouped window
+operations, no per-country Python loops):
+- YoY changes: inflation_rate (percentage points), wage_index and
+  commodity_price (percent); only between consecutive years
+- real_wage_growth: nominal wage growth deflated by inflation_rate
+- rolling inflation / commodity_price correlation over ROLLING_WINDOW observations
+  (column inflation_commodity_corr_<N>obs: a gap in a country's years makes
+  the window span more than N calendar years)
+- per-country correlation matrix of every value column (long format)
+
+Persisted next to the processed data; the dashboard reads these tables:
+- data/processed/derived_indicators.parquet
+- data/processed/country_correlations.parquet
+
+Usage: python -m src.analysis.derived [--window 10]
+
+"""
+
+import argparse
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from src.processing.parquet_store import load_processed
+from src.utils.instrumentation import instrumented
+from src.utils.schema import compact
+
+PROCESSED_DIR = "data/processed"
+DERIVED_PATH = os.path.join(PROCESSED_DIR, "derived_indicators.parquet")
+CORRELATIONS_PATH = os.path.join(PROCESSED_DIR, "country_correlations.parquet")
+
+ROLLING_WINDOW = int(os.getenv("DERIVED_ROLLING_WINDOW", "10"))
+MIN_PERIODS = int(os.getenv("DERIVED_MIN_PERIODS", "5"))
+
+VALUE_COLUMNS = ["inflation_rate", "wage_index", "commodity_price"]
+
+# -------------------------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------------------------
+
+def country_panel(df):
+    """One row per (iso3, year), sorted; duplicate source rows are averaged."""
+    values = [c for c in df.columns if c not in ("iso3", "date", "year") and pd.api.types.is_numeric_dtype(df[c])]
+
+    df = df.dropna(subset=["iso3", "date"]).copy()
+    df["iso3"] = df["iso3"].astype(str)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+    panel = df.groupby(["iso3", "date"], sort=True)[values].mean().reset_index()
+    panel[values] = panel[values].astype("float64")
+    panel["year"] = panel["date"].dt.year.astype("int16")
+    return panel
+
+
+def _correlation(n, sx, sy, sxx, syy, sxy, min_obs):
+    # Pearson from (masked) sums; NaN for constant series or too few pairs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        corr = cov / np.sqrt(var)
+    corr = np.where((n >= min_obs) & (var > 0), corr, np.nan)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _pair_sums(x, y):
+    """Columns whose sums give a pairwise-complete correlation of x and y."""
+    mask = (x.notna() & y.notna()).astype("float64")
+    x = x.where(mask > 0, 0.0)
+    y = y.where(mask > 0, 0.0)
+    return pd.DataFrame({"n": mask, "sx": x, "sy": y, "sxx": x * x, "syy": y * y, "sxy": x * y})
+
+# -------------------------------------------------------------------------------------
+# Derived series
+# -------------------------------------------------------------------------------------
+
+def yoy_changes(panel):
+    by_country = panel.groupby("iso3", sort=False)
+
+    # Gaps in a country's years → no YoY value for the first year after the gap
+    consecutive = (panel["year"] - by_country["year"].shift(1)) == 1
+
+    previous = by_country[VALUE_COLUMNS].shift(1)
+    out = pd.DataFrame(index=panel.index)
+    out["inflation_rate_yoy_pp"] = (panel["inflation_rate"] - previous["inflation_rate"]).where(consecutive)
+    for column in ("wage_index", "commodity_price"):
+        change = (panel[column] / previous[column] - 1) * 100
+        out[f"{column}_yoy_pct"] = change.where(consecutive).replace([np.inf, -np.inf], np.nan)
+    return out
+
+
+def real_wage_growth(wage_yoy_pct, inflation_rate):
+    """(1 + nominal growth) / (1 + inflation) - 1, in percent."""
+    return ((1 + wage_yoy_pct / 100) / (1 + inflation_rate / 100) - 1) * 100
+
+
+def rolling_correlation(panel, x, y, window=ROLLING_WINDOW, min_periods=MIN_PERIODS):
+    """Per-country rolling Pearson correlation from grouped rolling sums."""
+    sums = _pair_sums(panel[x], panel[y])
+    sums["iso3"] = panel["iso3"].to_numpy()
+
+    rolled = (
+        sums.groupby("iso3", sort=False)
+        .rolling(window, min_periods=1)
+        .sum()
+        .reset_index(level=0, drop=True)
+        .reindex(panel.index)
+    )
+    return pd.Series(
+        _correlation(rolled["n"], rolled["sx"], rolled["sy"], rolled["sxx"], rolled["syy"], rolled["sxy"],
+                     min_periods),
+        index=panel.index,
+    )
+
+
+@instrumented()
+def compute_derived(df, window=ROLLING_WINDOW):
+    panel = country_panel(df)
+
+    derived = panel[["iso3", "date", "year"]].copy()
+    derived = derived.join(yoy_changes(panel))
+    derived["real_wage_growth_pct"] = real_wage_growth(derived["wage_index_yoy_pct"], panel["inflation_rate"])
+    derived[f"inflation_commodity_corr_{window}obs"] = rolling_correlation(
+        panel, "inflation_rate", "commodity_price", window
+    )
+    return derived
+
+# -------------------------------------------------------------------------------------
+# Per-country correlation matrix
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def country_correlations(df, columns=None, min_obs=MIN_PERIODS):
+    """Long table iso3, var_x, var_y, corr, n_obs — every pair, every country, one groupby."""
+    panel = country_panel(df)
+    if columns is None:
+        columns = [c for c in panel.columns if c not in ("iso3", "date", "year")]
+
+    pairs = list(combinations(columns, 2))
+    if not pairs:
+        return pd.DataFrame(columns=["iso3", "var_x", "var_y", "corr", "n_obs"])
+
+    sums = pd.concat(
+        {f"{x}|{y}": _pair_sums(panel[x], panel[y]) for x, y in pairs}, axis=1
+    )
+    totals = sums.groupby(panel["iso3"].to_numpy()).sum()
+
+    frames = []
+    for x, y in pairs:
+        t = totals[f"{x}|{y}"]
+        frames.append(pd.DataFrame({
+            "iso3": totals.index,
+            "var_x": x,
+            "var_y": y,
+            "corr": _correlation(t["n"], t["sx"], t["sy"], t["sxx"], t["syy"], t["sxy"], min_obs),
+            "n_obs": t["n"].astype("int32").to_numpy(),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
+
+# -------------------------------------------------------------------------------------
+# Persist / read
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def build_derived(df=None, window=ROLLING_WINDOW):
+    if df is None:
+        df = load_processed()
+
+    print("🧮 Computing derived indicators...")
+    derived = compute_derived(df, window)
+    correlations = country_correlations(df)
+
+    os.makedirs(os.path.dirname(DERIVED_PATH), exist_ok=True)
+    compact(derived).to_parquet(DERIVED_PATH, index=False)
+    compact(correlations, floats=False).to_parquet(CORRELATIONS_PATH, index=False)
+
+    print(f"✅ Derived indicators saved to {DERIVED_PATH} ({len(derived):,} rows)")
+    print(f"✅ Per-country correlations saved to {CORRELATIONS_PATH} ({len(correlations):,} rows)")
+    return {"derived": derived, "correlations": correlations}
+
+
+def load_derived(countries=None, year_range=None, path=DERIVED_PATH):
+    filters = []
+    if countries:
+        filters.append(("iso3", "in", list(countries)))
+    if year_range:
+        start_year, end_year = year_range
+        filters.append(("year", ">=", int(start_year)))
+        filters.append(("year", "<=", int(end_year)))
+    return pd.read_parquet(path, filters=filters or None)
+
+
+def load_country_correlations(countries=None, path=CORRELATIONS_PATH):
+    filters = [("iso3", "in", list(countries))] if countries else None
+    return pd.read_parquet(path, filters=filters)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute derived indicators")
+    parser.add_argument("--window", type=int, default=ROLLING_WINDOW, help="rolling correlation window (observations)")
+    build_derived(window=parser.parse_args().window)
@@ -1,125 +1,77 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-
-# -------------------------------------------------------------------
-# Load merged dataset
-# -------------------------------------------------------------------
-
-def load_data():
-    file_path = "data/processed/cleaned_global_data.csv"
-
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"cleaned_global_data.csv not found at: {file_path}")
-
-    print("📂 Loading merged dataset...")
-    df = pd.read_csv(file_path)
-
-    # Convert date column to datetime
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    return df
-
-
-# -------------------------------------------------------------------
-# Summary statistics
-# -------------------------------------------------------------------
-
-def basic_summary(df):
-    print("\n📊 BASIC SUMMARY")
-    print(df.describe(include="all"))
-
-    print("\n🔍 Missing Values:")
-    print(df.isna().sum())
-
-
-# -------------------------------------------------------------------
-# Correlation Analysis
-# -------------------------------------------------------------------
-
-def correlation_analysis(df):
-    numeric_df = df.select_dtypes(include=["float64", "int64"])
-
-    print("\n📈 Correlation Matrix:")
-    print(numeric_df.corr())
-
-    plt.figure(figsize=(10, 6))
-    sns.heatmap(numeric_df.corr(), annot=True, cmap="coolwarm")
-    plt.title("Correlation Heatmap")
-    plt.tight_layout()
-
-    output_path = "reports/figures/correlation_heatmap.png"
-    os.makedirs("reports/figures", exist_ok=True)
-    plt.savefig(output_path)
-    plt.close()
-
-    print(f"✅ Correlation heatmap saved to {output_path}")
-
-
-# -------------------------------------------------------------------
-# Trend Plot for each variable
-# -------------------------------------------------------------------
-
-def plot_time_series(df):
-
-    variables = ["inflation_rate", "gdp_per_capita", "wage_index"]
-
-    for var in variables:
-        if var not in df.columns:
-            print(f"⚠️ Skipping {var} (not found in dataset)")
-            continue
-
-        plt.figure(figsize=(12, 6))
-        sns.lineplot(data=df, x="date", y=var, hue="iso3")
-
-        plt.title(f"{var.replace('_', ' ').title()} Over Time")
-        plt.tight_layout()
-
-        output_path = f"reports/figures/{var}_trend.png"
-        plt.savefig(output_path)
-        plt.close()
-
-        print(f"📈 Saved {var} trend plot → {output_path}")
-
-
-# -------------------------------------------------------------------
-# GDP vs Inflation scatter
-# -------------------------------------------------------------------
-
-def scatter_gdp_inflation(df):
-    if "gdp_per_capita" not in df.columns or "inflation_rate" not in df.columns:
-        print("⚠️ No data available for GDP vs Inflation scatter plot.")
-        return
-
-    plt.figure(figsize=(10, 6))
-    sns.scatterplot(data=df, x="gdp_per_capita", y="inflation_rate", hue="iso3")
-
-    plt.title("GDP per Capita vs Inflation Rate")
-    plt.tight_layout()
-
-    output_path = "reports/figures/gdp_vs_inflation.png"
-    plt.savefig(output_path)
-    plt.close()
-
-    print(f"📉 GDP vs Inflation scatter saved to {output_path}")
-
-
-# -------------------------------------------------------------------
-# Main runner
-# -------------------------------------------------------------------
-
-def run_eda():
-    df = load_data()
-
-    basic_summary(df)
-    correlation_analysis(df)
-    plot_time_series(df)
-    scatter_gdp_inflation(df)
-
-    print("\n🎉 PHASE 4 COMPLETED: All EDA outputs generated in reports/figures/")
-
-
-if __name__ == "__main__":
-    run_eda()
+import argparse
+import os
+
+from src.analysis.render import NUMERIC_DTYPES, render_figures
+from src.processing.parquet_store import PROCESSED_CSV, dataset_exists, load_processed
+from src.utils.instrumentation import instrumented
+from src.utils.schema import compact, memory_report
+
+# Fast mode draws one pre-aggregated line per country instead of seaborn CI bootstraps
+EDA_FAST = os.getenv("EDA_FAST", "0") == "1"
+EDA_MEMORY_REPORT = os.getenv("EDA_MEMORY_REPORT", "1") == "1"
+
+# -------------------------------------------------------------------
+# Load merged dataset
+# -------------------------------------------------------------------
+
+@instrumented("eda_load_data")
+def load_data(columns=None, filters=None):
+    if not dataset_exists() and not os.path.exists(PROCESSED_CSV):
+        raise FileNotFoundError(f"cleaned_global_data.csv not found at: {PROCESSED_CSV}")
+
+    print("📂 Loading merged dataset...")
+
+    # Parquet store (projection / pushdown) with CSV fallback; dates come back parsed
+    df = load_processed(columns=columns, filters=filters)
+
+    # Shared compact schema; report what it saves on this load
+    loaded = df.copy() if EDA_MEMORY_REPORT else None
+    df = compact(df)
+    if EDA_MEMORY_REPORT:
+        memory_report(loaded, df, "EDA dataset")
+
+    return df
+
+
+# -------------------------------------------------------------------
+# Summary statistics
+# -------------------------------------------------------------------
+
+def basic_summary(df):
+    print("\n📊 BASIC SUMMARY")
+    print(df.describe(include="all"))
+
+    print("\n🔍 Missing Values:")
+    print(df.isna().sum())
+
+
+# -------------------------------------------------------------------
+# Main runner
+# -------------------------------------------------------------------
+
+@instrumented()
+def run_eda(fast=None, force=False, workers=None):
+    # Figures render in parallel and only when their data slice changed (src/analysis/render.py)
+    fast = EDA_FAST if fast is None else fast
+    df = load_data()
+
+    basic_summary(df)
+
+    print("\n📈 Correlation Matrix:")
+    print(df.select_dtypes(include=NUMERIC_DTYPES).corr())
+
+    status = render_figures(df, fast=fast, force=force, workers=workers)
+    counts = {k: sum(s == k for s in status.values()) for k in ("rendered", "cached", "failed")}
+    print(f"\n🖼  Figures: {counts['rendered']} rendered, {counts['cached']} unchanged, "
+          f"{counts['failed']} failed ({'fast' if fast else 'full'} mode)")
+
+    print("\n🎉 PHASE 4 COMPLETED: All EDA outputs generated in reports/figures/")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the EDA figures")
+    parser.add_argument("--fast", action="store_true", help="pre-aggregated series, no seaborn bootstraps")
+    parser.add_argument("--force", action="store_true", help="re-render even if the data is unchanged")
+    parser.add_argument("--workers", type=int, help="process pool size")
+    args = parser.parse_args()
+    run_eda(fast=args.fast or None, force=args.force, workers=args.workers)
@@ -0,0 +1,292 @@
+"""
+RANGE-AGGREGATION INDEX
+-----------------------
+
+Precomputed per-country, per-indicator index over the annual series, so any
+year-window statistic is answered without scanning the data:
+- values laid out on a dense (indicator, country, year) grid, NaN = no observation
+- prefix sums + prefix counts over the years → window sum / count / NaN-aware mean
+- sparse tables (level k = min / max over 2^k years) → window min / max from
+  two overlapping blocks
+- every query is O(1) per country, vectorized across countries
+
+Incremental rebuild: after a merge only the years from the first new or
+revised one onwards are recomputed (appended years are the common case);
+a change in the country or indicator set rebuilds everything.
+
+Persisted next to the processed data; the dashboard summary panel reads it:
+- data/processed/range_index.npz
+
+Usage: python -m src.analysis.range_index [--full] [--window 2000 2010] [--country USA ...]
+
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.processing.parquet_store import load_processed
+from src.utils.instrumentation import instrumented
+
+PROCESSED_DIR = "data/processed"
+RANGE_INDEX_PATH = os.path.join(PROCESSED_DIR, "range_index.npz")
+
+STATISTICS = ["n_years", "mean", "min", "max"]
+
+# ((path, mtime), index) of the last loaded file
+_INDEX = None
+
+# -------------------------------------------------------------------------------------
+# Grid
+# -------------------------------------------------------------------------------------
+
+def annual_grid(df):
+    """(countries, first_year, columns, values[indicator, country, year]) from the merged data."""
+    columns = [c for c in df.columns if c not in ("iso3", "date", "year") and pd.api.types.is_numeric_dtype(df[c])]
+
+    df = df.dropna(subset=["iso3", "date"])
+    years = pd.to_datetime(df["date"], errors="coerce").dt.year
+    panel = (
+        df[columns].astype("float64")
+        .groupby([df["iso3"].astype(str).to_numpy(), years.to_numpy()], sort=True)
+        .mean()
+    )
+
+    country_codes, countries = pd.factorize(panel.index.get_level_values(0), sort=True)
+    year_values = panel.index.get_level_values(1).astype("int64")
+    first_year = int(year_values.min()) if len(panel) else 0
+    n_years = int(year_values.max()) - first_year + 1 if len(panel) else 0
+
+    values = np.full((len(columns), len(countries), n_years), np.nan)
+    values[:, country_codes, year_values - first_year] = panel.to_numpy().T
+    return np.asarray(countries, dtype=str), first_year, columns, values
+
+
+def _first_difference(old, new):
+    """First year position where the two grids differ (NaN == NaN); len(old) years if none."""
+    n_old = old.shape[-1]
+    same = (old == new[..., :n_old]) | (np.isnan(old) & np.isnan(new[..., :n_old]))
+    changed = np.flatnonzero(~same.all(axis=(0, 1)))
+    return int(changed[0]) if len(changed) else n_old
+
+# -------------------------------------------------------------------------------------
+# Index
+# -------------------------------------------------------------------------------------
+
+class RangeIndex:
+    def __init__(self, countries, first_year, columns, sums, counts, mins, maxs):
+        self.countries = countries
+        self.first_year = first_year
+        self.columns = list(columns)
+        self.sums = sums        # [indicator, country, year + 1], sums[..., i] = Σ values before year i
+        self.counts = counts    # same layout, observations instead of values
+        self.mins = mins        # [level][indicator, country, year], level k covers 2^k years
+        self.maxs = maxs
+
+    @property
+    def n_years(self):
+        return self.sums.shape[-1] - 1
+
+    @property
+    def years(self):
+        return range(self.first_year, self.first_year + self.n_years)
+
+    @property
+    def values(self):
+        return self.mins[0]
+
+    @classmethod
+    def build(cls, df):
+        countries, first_year, columns, values = annual_grid(df)
+        return cls._from_grid(countries, first_year, columns, values)
+
+    @classmethod
+    def _from_grid(cls, countries, first_year, columns, values, previous=None, start=0):
+        """Index over `values`; positions before `start` are copied from `previous`."""
+        k_count, c_count, n_years = values.shape
+
+        observed = ~np.isnan(values)
+        sums = np.zeros((k_count, c_count, n_years + 1))
+        counts = np.zeros((k_count, c_count, n_years + 1), dtype="int32")
+        if previous is not None:
+            sums[..., :start + 1] = previous.sums[..., :start + 1]
+            counts[..., :start + 1] = previous.counts[..., :start + 1]
+        sums[..., start + 1:] = sums[..., start, None] + np.cumsum(np.where(observed, values, 0.0)[..., start:], axis=-1)
+        counts[..., start + 1:] = counts[..., start, None] + np.cumsum(observed[..., start:], axis=-1)
+
+        mins, maxs = [values], [values]
+        span = 1
+        while span * 2 <= n_years:
+            half, span = span, span * 2
+            valid = n_years - span + 1
+            level_min = np.full(values.shape, np.nan)
+            level_max = np.full(values.shape, np.nan)
+
+            # Blocks that end before `start` are unchanged
+            reuse = 0
+            if previous is not None and len(mins) < len(previous.mins):
+                reuse = min(max(start - span + 1, 0), valid)
+                level_min[..., :reuse] = previous.mins[len(mins)][..., :reuse]
+                level_max[..., :reuse] = previous.maxs[len(maxs)][..., :reuse]
+
+            level_min[..., reuse:valid] = np.fmin(mins[-1][..., reuse:valid], mins[-1][..., reuse + half:valid + half])
+            level_max[..., reuse:valid] = np.fmax(maxs[-1][..., reuse:valid], maxs[-1][..., reuse + half:valid + half])
+            mins.append(level_min)
+            maxs.append(level_max)
+
+        return cls(countries, first_year, columns, sums, counts, mins, maxs)
+
+    def update(self, df):
+        """(index, first rebuilt year or None) for new merged data; unchanged years are reused."""
+        countries, first_year, columns, values = annual_grid(df)
+
+        same_layout = (
+            columns == self.columns
+            and first_year == self.first_year
+            and np.array_equal(countries, self.countries)
+            and values.shape[-1] >= self.n_years
+        )
+        if not same_layout:
+            return RangeIndex._from_grid(countries, first_year, columns, values), first_year
+
+        start = _first_difference(self.values, values)
+        if start == values.shape[-1]:
+            return self, None
+        return RangeIndex._from_grid(countries, first_year, columns, values, self, start), first_year + start
+
+    # ---------------------------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------------------------
+
+    def _rows(self, countries):
+        if countries is None:
+            return np.arange(len(self.countries))
+        countries = np.asarray(list(countries), dtype=str)
+        rows = np.searchsorted(self.countries, countries)
+        rows = np.minimum(rows, max(len(self.countries) - 1, 0))
+        return rows[self.countries[rows] == countries] if len(self.countries) else rows[:0]
+
+    def window_arrays(self, start_year, end_year, countries=None):
+        """{statistic: array[indicator, country]} over the inclusive year window."""
+        rows = self._rows(countries)
+        shape = (len(self.columns), len(rows))
+
+        i = max(int(start_year) - self.first_year, 0)
+        j = min(int(end_year) - self.first_year, self.n_years - 1)
+        if i > j:
+            empty = np.full(shape, np.nan)
+            return rows, {"n_years": np.zeros(shape, dtype="int32"), "sum": empty, "mean": empty,
+                          "min": empty, "max": empty}
+
+        n = self.counts[:, rows, j + 1] - self.counts[:, rows, i]
+        total = self.sums[:, rows, j + 1] - self.sums[:, rows, i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(n > 0, total / n, np.nan)
+
+        # Two (overlapping) power-of-two blocks cover [i, j]
+        level = int(j - i + 1).bit_length() - 1
+        last = j - (1 << level) + 1
+        mins, maxs = self.mins[level], self.maxs[level]
+        return rows, {
+            "n_years": n,
+            "sum": np.where(n > 0, total, np.nan),
+            "mean": mean,
+            "min": np.fmin(mins[:, rows, i], mins[:, rows, last]),
+            "max": np.fmax(maxs[:, rows, i], maxs[:, rows, last]),
+        }
+
+    def window(self, start_year, end_year, countries=None, columns=None, statistics=STATISTICS):
+        """Long table iso3, indicator, <statistics> for the inclusive year window."""
+        rows, stats = self.window_arrays(start_year, end_year, countries)
+        picked = list(range(len(self.columns))) if columns is None else [self.columns.index(c) for c in columns]
+
+        out = pd.DataFrame({
+            "iso3": np.tile(self.countries[rows], len(picked)),
+            "indicator": np.repeat([self.columns[k] for k in picked], len(rows)),
+        })
+        for name in statistics:
+            out[name] = stats[name][picked].reshape(-1)
+        return out
+
+    # ---------------------------------------------------------------------------------
+    # Persist / read
+    # ---------------------------------------------------------------------------------
+
+    def save(self, path=RANGE_INDEX_PATH):
+        arrays = {f"min_{k}": m for k, m in enumerate(self.mins[1:], start=1)}
+        arrays.update({f"max_{k}": m for k, m in enumerate(self.maxs[1:], start=1)})
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, countries=self.countries, first_year=self.first_year, columns=np.asarray(self.columns),
+                 values=self.values, sums=self.sums, counts=self.counts, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=RANGE_INDEX_PATH):
+        with np.load(path) as data:
+            levels = sum(name.startswith("min_") for name in data.files)
+            values = data["values"]
+            return cls(
+                data["countries"], int(data["first_year"]), data["columns"].tolist(), data["sums"], data["counts"],
+                [values] + [data[f"min_{k}"] for k in range(1, levels + 1)],
+                [values] + [data[f"max_{k}"] for k in range(1, levels + 1)],
+            )
+
+    def __repr__(self):
+        years = f"{self.first_year}-{self.first_year + self.n_years - 1}" if self.n_years else "no years"
+        return f"RangeIndex({len(self.countries)} countries × {len(self.columns)} indicators, {years})"
+
+
+@instrumented()
+def build_range_index(df=None, full=False, path=RANGE_INDEX_PATH):
+    if df is None:
+        df = load_processed()
+
+    previous = None
+    if not full and os.path.exists(path):
+        try:
+            previous = RangeIndex.load(path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Unreadable range index, rebuilding: {e}")
+
+    if previous is None:
+        index = RangeIndex.build(df)
+        print(f"🗂  Range index built: {index}")
+    else:
+        index, rebuilt_from = previous.update(df)
+        if rebuilt_from is None:
+            print(f"⏭  Range index unchanged: {index}")
+            return index
+        print(f"🗂  Range index rebuilt from {rebuilt_from}: {index}")
+
+    index.save(path)
+    print(f"✅ Range index saved to {path}")
+    return index
+
+
+def load_range_index(path=RANGE_INDEX_PATH):
+    """Loaded index, reused until the file changes; None when it has not been built."""
+    global _INDEX
+
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _INDEX is None or _INDEX[0] != (path, mtime):
+        _INDEX = ((path, mtime), RangeIndex.load(path))
+    return _INDEX[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build / query the year-window aggregation index")
+    parser.add_argument("--full", action="store_true", help="rebuild every year, ignoring the saved index")
+    parser.add_argument("--window", nargs=2, type=int, metavar=("START", "END"), help="print window statistics")
+    parser.add_argument("--country", nargs="+", help="ISO3 codes for --window (default all)")
+    args = parser.parse_args()
+
+    index = build_range_index(full=args.full)
+    if args.window:
+        print(index.window(*args.window, countries=args.country).to_string(index=False))
@@ -0,0 +1,194 @@
+"""
+EDA RENDER ENGINE
+-----------------
+
+- Every figure is a spec: name, the columns it needs, a draw function
+- Each figure is drawn in its own worker process on the Agg backend
+- A figure is skipped when the hash of its data slice (and render mode)
+  matches reports/figures/.render_cache.json and the PNG still exists
+- fast=True draws pre-aggregated series (one mean per country-date) with
+  plain matplotlib instead of seaborn's bootstrapped estimators
+
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+FIGURES_DIR = "reports/figures"
+CACHE_PATH = os.path.join(FIGURES_DIR, ".render_cache.json")
+
+TREND_VARIABLES = ["inflation_rate", "gdp_per_capita", "wage_index"]
+
+# Value columns may be float32 after src.utils.schema.compact; int16 year stays out
+NUMERIC_DTYPES = ["float32", "float64", "int64"]
+
+# Bump to invalidate every cached figure after changing a draw function
+RENDER_VERSION = "1"
+
+# -------------------------------------------------------------------------------------
+# Draw functions (run inside workers; import pyplot lazily on the Agg backend)
+# -------------------------------------------------------------------------------------
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def draw_correlation(df, output_path, fast=False):
+    import seaborn as sns
+    plt = _pyplot()
+
+    numeric_df = df.select_dtypes(include=NUMERIC_DTYPES)
+
+    plt.figure(figsize=(10, 6))
+    sns.heatmap(numeric_df.corr(), annot=True, cmap="coolwarm")
+    plt.title("Correlation Heatmap")
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def draw_trend(df, var, output_path, fast=False):
+    plt = _pyplot()
+
+    plt.figure(figsize=(12, 6))
+    if fast:
+        # One mean per (date, country) → one Line2D per country, no bootstrap
+        wide = df.groupby(["date", "iso3"], observed=True)[var].mean().unstack("iso3")
+        plt.plot(wide.index, wide.to_numpy(), linewidth=0.8)
+        plt.xlabel("date")
+        plt.ylabel(var)
+    else:
+        import seaborn as sns
+        sns.lineplot(data=df, x="date", y=var, hue="iso3")
+
+    plt.title(f"{var.replace('_', ' ').title()} Over Time")
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def draw_scatter(df, output_path, fast=False):
+    plt = _pyplot()
+
+    plt.figure(figsize=(10, 6))
+    if fast:
+        data = df.dropna(subset=["gdp_per_capita", "inflation_rate"])
+        codes = data["iso3"].astype("category").cat.codes
+        plt.scatter(data["gdp_per_capita"], data["inflation_rate"], c=codes, cmap="tab20", s=8)
+        plt.xlabel("gdp_per_capita")
+        plt.ylabel("inflation_rate")
+    else:
+        import seaborn as sns
+        sns.scatterplot(data=df, x="gdp_per_capita", y="inflation_rate", hue="iso3")
+
+    plt.title("GDP per Capita vs Inflation Rate")
+    plt.tight_layout()
+    plt.savefig(output_path)
+    plt.close()
+
+# -------------------------------------------------------------------------------------
+# Figure specs
+# -------------------------------------------------------------------------------------
+
+def figure_specs(df, figures_dir=FIGURES_DIR):
+    """[(name, columns, draw_fn, extra_args, output_path)] for the figures this data supports."""
+    specs = []
+
+    numeric = list(df.select_dtypes(include=NUMERIC_DTYPES).columns)
+    specs.append(("correlation_heatmap", numeric, draw_correlation, (),
+                  os.path.join(figures_dir, "correlation_heatmap.png")))
+
+    for var in TREND_VARIABLES:
+        if var not in df.columns:
+            print(f"⚠️ Skipping {var} (not found in dataset)")
+            continue
+        specs.append((f"{var}_trend", ["date", "iso3", var], draw_trend, (var,),
+                      os.path.join(figures_dir, f"{var}_trend.png")))
+
+    if "gdp_per_capita" in df.columns and "inflation_rate" in df.columns:
+        specs.append(("gdp_vs_inflation", ["iso3", "gdp_per_capita", "inflation_rate"], draw_scatter, (),
+                      os.path.join(figures_dir, "gdp_vs_inflation.png")))
+    else:
+        print("⚠️ No data available for GDP vs Inflation scatter plot.")
+
+    return specs
+
+
+def slice_hash(data, name, fast):
+    h = hashlib.sha256(f"{name}|{fast}|{RENDER_VERSION}|{list(data.columns)}".encode())
+    h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+# -------------------------------------------------------------------------------------
+# Cache
+# -------------------------------------------------------------------------------------
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+# -------------------------------------------------------------------------------------
+# Engine
+# -------------------------------------------------------------------------------------
+
+def _render(draw_fn, data, args, output_path, fast):
+    draw_fn(data, *args, output_path, fast=fast)
+    return output_path
+
+
+def render_figures(df, fast=False, force=False, workers=None, figures_dir=FIGURES_DIR):
+    """Render every figure in parallel, skipping unchanged ones. Returns {name: status}."""
+    os.makedirs(figures_dir, exist_ok=True)
+    cache_path = os.path.join(figures_dir, os.path.basename(CACHE_PATH))
+    cache = load_cache(cache_path)
+
+    jobs = {}
+    status = {}
+    for name, columns, draw_fn, args, output_path in figure_specs(df, figures_dir):
+        data = df[columns]
+        digest = slice_hash(data, name, fast)
+
+        if not force and cache.get(name) == digest and os.path.exists(output_path):
+            status[name] = "cached"
+            print(f"⏭  {name}: data unchanged — kept {output_path}")
+            continue
+        jobs[name] = (draw_fn, data, args, output_path, digest)
+
+    if jobs:
+        workers = workers or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_render, draw_fn, data, args, output_path, fast): name
+                for name, (draw_fn, data, args, output_path, _) in jobs.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    output_path = future.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    print(f"❌ {name} failed: {e}")
+                    continue
+                status[name] = "rendered"
+                cache[name] = jobs[name][4]
+                print(f"📈 Saved {name} → {output_path}")
+
+        save_cache(cache, cache_path)
+
+    return status
@@ -0,0 +1,231 @@
+"""
+READ-ONLY DATA API
+------------------
+
+HTTP front for src.db.query, so other tools stop reading the CSV or
+scanning the database themselves:
+
+    GET /health                  status + data version
+    GET /countries, /years       filter values
+    GET /macro                   ?country=USA&country=DEU&start_year=2000&end_year=2020
+                                 &column=inflation_rate&limit=…&offset=…&format=json|arrow
+    GET /commodities             commodity names
+    GET /commodities/prices      ?commodity=Copper&start_year=…&end_year=…&format=…
+
+- every read goes through query.py's shared result cache, so one process
+  serves all consumers; DB work runs in a worker thread, off the event loop
+- JSON is gzip'd when the client accepts it; format=arrow returns an Arrow
+  IPC stream written batch by batch
+- ETag = data version + request: If-None-Match gets a 304 (no DB work)
+  until the loader publishes the next refresh
+- pages: limit (API_PAGE_SIZE, at most API_MAX_PAGE_SIZE; 0 = everything)
+  + offset; total rows in X-Total-Count, next page in the Link header
+
+Usage: uvicorn src.api.app:app [--host 0.0.0.0 --port 8000]
+       python -m src.api.app
+
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import math
+import os
+from typing import Literal
+
+import pyarrow as pa
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.db import query
+from src.utils.schema import FLOAT32_ATOL
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "10000"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "100000"))
+
+# Rows per Arrow record batch (one chunk of the streamed body)
+ARROW_BATCH_ROWS = int(os.getenv("API_ARROW_BATCH_ROWS", "65536"))
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = int(os.getenv("API_GZIP_MIN_BYTES", "1024"))
+
+# float32 values are exact to FLOAT32_ATOL → JSON prints them at that precision
+FLOAT32_DECIMALS = max(round(-math.log10(2 * FLOAT32_ATOL)), 0)
+
+app = FastAPI(title="Global Econ Data API", description="Read-only access to macro_data and commodity prices")
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
+
+# -------------------------------------------------------------------------------------
+# ETag / conditional requests
+# -------------------------------------------------------------------------------------
+
+def request_etag(request, version):
+    # Weak: the gzip'd and identity bodies are the same representation
+    params = sorted(request.query_params.multi_items())
+    digest = hashlib.sha256(f"{version}|{request.url.path}|{params}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def not_modified(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+async def conditional(request, read, render):
+    """304 straight from the data version; otherwise read in a worker thread and render."""
+    version = query.get_data_version()
+    etag = request_etag(request, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Data-Version": version}
+
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        result = await asyncio.to_thread(read)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=503, detail=f"database unavailable: {type(e).__name__}")
+
+    response = render(result)
+    response.headers.update(headers)
+    return response
+
+# -------------------------------------------------------------------------------------
+# Rendering
+# -------------------------------------------------------------------------------------
+
+def _drain(sink):
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def arrow_chunks(table):
+    """Arrow IPC stream, yielded one record batch at a time."""
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=ARROW_BATCH_ROWS):
+            writer.write_batch(batch)
+            yield _drain(sink)
+    # End-of-stream marker written on close
+    yield _drain(sink)
+
+
+def json_body(df, page):
+    df = df.copy()
+    if "date" in df.columns:
+        df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+    for column in df.columns[df.dtypes == "float32"]:
+        df[column] = df[column].astype("float64").round(FLOAT32_DECIMALS)
+
+    # to_json serializes the rows in C; only the envelope is assembled here
+    envelope = json.dumps(page)[:-1]
+    return f'{envelope}, "data": {df.to_json(orient="records")}}}'
+
+
+def render_page(request, limit, offset, fmt):
+    def render(df):
+        total = len(df)
+        page = df.iloc[offset:offset + limit] if limit else df.iloc[offset:]
+        next_offset = offset + len(page) if offset + len(page) < total else None
+
+        headers = {"X-Total-Count": str(total)}
+        if next_offset is not None:
+            headers["Link"] = f'<{request.url.include_query_params(offset=next_offset)}>; rel="next"'
+
+        if fmt == "arrow":
+            table = pa.Table.from_pandas(page, preserve_index=False)
+            return StreamingResponse(arrow_chunks(table), media_type=ARROW_MEDIA_TYPE, headers=headers)
+
+        body = json_body(page, {"total": total, "offset": offset, "limit": limit, "next_offset": next_offset})
+        return Response(body, media_type="application/json", headers=headers)
+
+    return render
+
+
+def render_json(result):
+    return JSONResponse(result)
+
+
+def year_range(start_year, end_year):
+    # Only the bounds that were given are filtered on
+    if start_year is None and end_year is None:
+        return None
+    return (start_year, end_year)
+
+# -------------------------------------------------------------------------------------
+# Endpoints
+# -------------------------------------------------------------------------------------
+
+PageLimit = Query(API_PAGE_SIZE, ge=0, le=API_MAX_PAGE_SIZE, description="rows per page, 0 = all")
+PageOffset = Query(0, ge=0)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "data_version": query.get_data_version()}
+
+
+@app.get("/countries")
+async def countries(request: Request):
+    return await conditional(request, query.load_countries, render_json)
+
+
+@app.get("/years")
+async def years(request: Request):
+    return await conditional(request, lambda: [int(y) for y in query.load_years()], render_json)
+
+
+@app.get("/macro")
+async def macro(
+    request: Request,
+    country: list[str] | None = Query(None, description="ISO3 code (repeatable)"),
+    start_year: int | None = None,
+    end_year: int | None = None,
+    column: list[str] | None = Query(None, description="value column (repeatable); default all"),
+    limit: int = PageLimit,
+    offset: int = PageOffset,
+    format: Literal["json", "arrow"] = "json",
+):
+    def read():
+        return query.load_macro_data(country, year_range(start_year, end_year), column)
+
+    return await conditional(request, read, render_page(request, limit, offset, format))
+
+
+@app.get("/commodities")
+async def commodities(request: Request):
+    return await conditional(request, query.load_commodity_names, render_json)
+
+
+@app.get("/commodities/prices")
+async def commodity_prices(
+    request: Request,
+    commodity: list[str] | None = Query(None, description="commodity name (repeatable); default all"),
+    start_year: int | None = None,
+    end_year: int | None = None,
+    limit: int = PageLimit,
+    offset: int = PageOffset,
+    format: Literal["json", "arrow"] = "json",
+):
+    def read():
+        return query.load_commodities(commodity, year_range(start_year, end_year))
+
+    return await conditional(request, read, render_page(request, limit, offset, format))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("src.api.app:app", host=API_HOST, port=API_PORT)
@@ -1,79 +1,241 @@
-import sys
-import os
-
-# Get project root: global-econ-dashboard/
-ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-if ROOT_DIR not in sys.path:
-    sys.path.insert(0, ROOT_DIR)
-
-print("PYTHONPATH ->", sys.path[0])  # debug
-
-from src.db.query import load_all_data, load_countries, load_years
-
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-st.set_page_config(page_title="Global Economic Dashboard", layout="wide")
-
-st.title("🌍 Global Economic Dashboard")
-st.markdown("Live data from PostgreSQL • Inflation • Wages • Commodities")
-
-# Load data
-df = load_all_data()
-# FIX: Convert date column to datetime
-df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-# Sidebar filters
-st.sidebar.header("🔎 Filters")
-countries = load_countries()
-years = load_years()
-
-# 🔥 FIX: Convert years to integers + sort
-years = sorted([int(y) for y in years])
-
-selected_country = st.sidebar.selectbox("Select Country", ["ALL"] + countries)
-
-# 🔥 FIX: Make sure slider gets int values
-year_range = st.sidebar.slider(
-    "Select Year Range",
-    min_value=min(years),
-    max_value=max(years),
-    value=(min(years), max(years)),
-    step=1
-)
-
-df_filtered = df[
-    (df["date"].dt.year >= year_range[0]) &
-    (df["date"].dt.year <= year_range[1])
-]
-
-if selected_country != "ALL":
-    df_filtered = df_filtered[df_filtered["iso3"] == selected_country]
-
-# ======= 1️⃣ Inflation Trend =======
-st.subheader("📈 Inflation Over Time")
-
-fig_inf = px.line(df_filtered, x="date", y="inflation_rate", color="iso3",
-                  title="Inflation Trend")
-st.plotly_chart(fig_inf, use_container_width=True)
-
-# ======= 2️⃣ Wage Trend =======
-st.subheader("💼 Wage Index Over Time")
-fig_wage = px.line(df_filtered, x="date", y="wage_index", color="iso3",
-                   title="Wage Index Trend")
-st.plotly_chart(fig_wage, use_container_width=True)
-
-# ======= 3️⃣ Inflation vs Wages =======
-st.subheader("📉 Inflation vs Wage Index")
-fig_scatter = px.scatter(df_filtered, x="inflation_rate", y="wage_index",
-                         color="iso3", title="Inflation vs Wages")
-st.plotly_chart(fig_scatter, use_container_width=True)
-
-# ======= 4️⃣ Commodity Prices =======
-st.subheader("🛢️ Commodity Price Trend")
-fig_com = px.line(df_filtered, x="date", y="commodity_price",
-                  title="Commodity Price Trend")
-st.plotly_chart(fig_com, use_container_width=True)
-
-st.success("✨ Dashboard Loaded Successfully")
+import sys
+import os
+
+# Get project root: global-econ-dashboard/
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+print("PYTHONPATH ->", sys.path[0])  # debug
+
+import streamlit as st
+
+# db        every read goes to PostgreSQL (via src.db.query)
+# snapshot  boot from the Arrow snapshot written by the loader; no DB, no SQLAlchemy import
+# auto      PostgreSQL, falling back to the snapshot when the database is unavailable
+DASHBOARD_MODE = os.getenv("DASHBOARD_MODE", "auto").lower()
+
+st.set_page_config(page_title="Global Economic Dashboard", layout="wide")
+
+st.title("🌍 Global Economic Dashboard")
+st.markdown("Live data from PostgreSQL • Inflation • Wages • Commodities")
+
+# Cached across reruns AND sessions; the data version (bumped by the loader after
+# each refresh) is part of every cache key, so a refresh invalidates all of them.
+CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "3600"))
+
+
+def data_source(source):
+    # Heavy modules are imported on first use only
+    if source == "snapshot":
+        from src.db import snapshot
+        return snapshot
+    from src.db import query
+    return query
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_countries(version, source):
+    return data_source(source).load_countries()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_years(version, source):
+    # 🔥 FIX: Convert years to integers + sort
+    return sorted([int(y) for y in data_source(source).load_years()])
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_commodity_names(version):
+    from src.processing.commodity_rollups import HEADLINE, commodity_names, rollup_path
+
+    if not os.path.exists(rollup_path("annual")):
+        return [HEADLINE]
+    return commodity_names()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_commodity_rollup(resolution, commodities, year_range, version):
+    # Precomputed by clean_and_merge → no monthly aggregation in the dashboard;
+    # the commodity filter is pushed down into the Parquet scan
+    from src.processing.commodity_rollups import load_rollup, rollup_path
+
+    if not os.path.exists(rollup_path(resolution)):
+        return None
+    df = load_rollup(resolution, commodities=list(commodities), year_range=year_range)
+
+    # Monthly table holds the raw price; the rollups are plotted by their mean
+    return df.rename(columns={"price": "commodity_price", "mean": "commodity_price"})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_derived(country, year_range, version):
+    # Precomputed by src.analysis.derived next to the processed data
+    from src.analysis.derived import DERIVED_PATH, load_derived
+
+    if not os.path.exists(DERIVED_PATH):
+        return None
+    return load_derived(None if country == "ALL" else [country], year_range)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_country_correlations(country, version):
+    from src.analysis.derived import CORRELATIONS_PATH, load_country_correlations
+
+    if not os.path.exists(CORRELATIONS_PATH):
+        return None
+    return load_country_correlations(None if country == "ALL" else [country])
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_macro_data(country, year_range, version, source):
+    countries = None if country == "ALL" else [country]
+    return data_source(source).load_macro_data(countries=countries, year_range=year_range)
+
+
+def snapshot_version():
+    from src.db.snapshot import load_meta, snapshot_exists
+
+    if not snapshot_exists():
+        return None
+    return str(load_meta().get("version"))
+
+
+source = "snapshot" if DASHBOARD_MODE == "snapshot" else "db"
+
+if source == "db":
+    try:
+        data_version = data_source("db").get_data_version()
+        countries = cached_countries(data_version, source)
+    except Exception as e:
+        if DASHBOARD_MODE != "auto" or snapshot_version() is None:
+            raise
+        print("⚠️ Database unavailable, serving snapshot:", e)
+        source = "snapshot"
+
+if source == "snapshot":
+    data_version = snapshot_version()
+    if data_version is None:
+        st.error("No dashboard snapshot found — run the loader (python -m src.db.load_to_db) first.")
+        st.stop()
+    if DASHBOARD_MODE != "snapshot":
+        st.warning("⚠️ Database unavailable — showing the last snapshot.")
+    countries = cached_countries(data_version, source)
+
+# Sidebar filters
+st.sidebar.header("🔎 Filters")
+years = cached_years(data_version, source)
+
+selected_country = st.sidebar.selectbox("Select Country", ["ALL"] + countries)
+
+# 🔥 FIX: Make sure slider gets int values
+year_range = st.sidebar.slider(
+    "Select Year Range",
+    min_value=min(years),
+    max_value=max(years),
+    value=(min(years), max(years)),
+    step=1
+)
+
+commodity_resolution = st.sidebar.radio("Commodity Resolution", ["annual", "quarterly", "monthly"],
+                                        format_func=str.title, horizontal=True)
+
+from src.processing.commodity_rollups import HEADLINE
+
+commodity_options = cached_commodity_names(data_version)
+selected_commodities = st.sidebar.multiselect("Commodities", commodity_options,
+                                              default=[c for c in commodity_options if c == HEADLINE])
+
+# Country + year filters are pushed down into SQL (or the snapshot scan)
+df_filtered = cached_macro_data(selected_country, tuple(year_range), data_version, source)
+
+from src.dashboard.charts import format_stats, global_line_chart, line_chart, scatter_chart
+
+# Charts are LTTB-downsampled per series and switch to WebGL when large;
+# the caption under each one reports the points kept and build time
+# (+ payload size with CHART_MEASURE_PAYLOAD=1).
+
+# ======= 1️⃣ Inflation Trend =======
+st.subheader("📈 Inflation Over Time")
+
+fig_inf, stats_inf = line_chart(df_filtered, x="date", y="inflation_rate", color="iso3",
+                                title="Inflation Trend")
+st.plotly_chart(fig_inf, use_container_width=True)
+st.caption(format_stats(stats_inf))
+
+# ======= 2️⃣ Wage Trend =======
+st.subheader("💼 Wage Index Over Time")
+fig_wage, stats_wage = line_chart(df_filtered, x="date", y="wage_index", color="iso3",
+                                  title="Wage Index Trend")
+st.plotly_chart(fig_wage, use_container_width=True)
+st.caption(format_stats(stats_wage))
+
+# ======= 3️⃣ Inflation vs Wages =======
+st.subheader("📉 Inflation vs Wage Index")
+fig_scatter, stats_scatter = scatter_chart(df_filtered, x="inflation_rate", y="wage_index",
+                                           color="iso3", title="Inflation vs Wages")
+st.plotly_chart(fig_scatter, use_container_width=True)
+st.caption(format_stats(stats_scatter))
+
+# ======= 4️⃣ Commodity Prices =======
+# Commodity prices are global → one trace per selected commodity from the precomputed tables
+st.subheader("🛢️ Commodity Price Trend")
+df_commodity = cached_commodity_rollup(commodity_resolution, tuple(selected_commodities),
+                                       tuple(year_range), data_version)
+if df_commodity is not None and selected_commodities:
+    fig_com, stats_com = line_chart(df_commodity, x="date", y="commodity_price", color="commodity",
+                                    title="Commodity Price Trend")
+else:
+    # No rollups on disk → headline index from macro_data
+    fig_com, stats_com = global_line_chart(df_filtered, x="date", y="commodity_price",
+                                           title="Commodity Price Trend")
+st.plotly_chart(fig_com, use_container_width=True)
+st.caption(format_stats(stats_com))
+
+# ======= 5️⃣ Derived Indicators =======
+st.subheader("🧮 Real Wages & Correlations")
+df_derived = cached_derived(selected_country, tuple(year_range), data_version)
+df_corr = cached_country_correlations(selected_country, data_version)
+
+if df_derived is None or df_corr is None:
+    st.info("Derived indicators not built yet — run python -m src.analysis.derived")
+else:
+    fig_real, stats_real = line_chart(df_derived, x="date", y="real_wage_growth_pct", color="iso3",
+                                      title="Real Wage Growth (%, deflated by inflation)")
+    st.plotly_chart(fig_real, use_container_width=True)
+    st.caption(format_stats(stats_real))
+
+    rolling_column = next(c for c in df_derived.columns if c.startswith("inflation_commodity_corr_"))
+    fig_roll, stats_roll = line_chart(df_derived, x="date", y=rolling_column, color="iso3",
+                                      title="Rolling Correlation: Inflation vs Commodity Prices")
+    st.plotly_chart(fig_roll, use_container_width=True)
+    st.caption(format_stats(stats_roll))
+
+    if selected_country == "ALL":
+        pair = df_corr[(df_corr["var_x"] == "inflation_rate") & (df_corr["var_y"] == "commodity_price")]
+        st.dataframe(pair.dropna(subset=["corr"]).sort_values("corr", ascending=False)
+                     [["iso3", "corr", "n_obs"]], hide_index=True, use_container_width=True)
+    else:
+        matrix = df_corr.pivot(index="var_x", columns="var_y", values="corr")
+        st.dataframe(matrix.round(3), use_container_width=True)
+
+# ======= 6️⃣ Summary Statistics =======
+# Served from the precomputed range index: O(1) per country for any year window,
+# so the table follows the slider without re-reading the data
+st.subheader("📊 Summary Statistics")
+
+from src.analysis.range_index import load_range_index
+
+range_index = load_range_index()
+if range_index is None:
+    st.info("Range index not built yet — run python -m src.analysis.range_index")
+elif selected_country == "ALL":
+    indicator = st.selectbox("Indicator", range_index.columns)
+    summary = range_index.window(*year_range, columns=[indicator])
+    summary = summary[summary["n_years"] > 0].sort_values("mean", ascending=False)
+    st.dataframe(summary.drop(columns="indicator").round(3), hide_index=True, use_container_width=True)
+else:
+    summary = range_index.window(*year_range, countries=[selected_country])
+    st.dataframe(summary.drop(columns="iso3").set_index("indicator").round(3), use_container_width=True)
+
+st.success("✨ Dashboard Loaded Successfully")
@@ -0,0 +1,150 @@
+"""
+CHART DATA REDUCTION
+--------------------
+
+Keeps the Plotly payload sent to the browser small:
+- LTTB (Largest-Triangle-Three-Buckets) downsampling per series above a point budget
+- Global series (commodity prices, identical for every country) collapsed to one trace
+- WebGL traces (scattergl) once a chart has more points than SVG handles well
+- Points kept + build time reported for every chart; the payload size only
+  with CHART_MEASURE_PAYLOAD=1 (measuring it serializes the figure again)
+
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# Total points per chart (split across its series) before LTTB kicks in
+POINT_BUDGET = int(os.getenv("CHART_POINT_BUDGET", "5000"))
+
+# Never reduce a single series below this many points
+MIN_SERIES_POINTS = 20
+
+# Charts with more points than this are rendered with WebGL
+WEBGL_THRESHOLD = int(os.getenv("CHART_WEBGL_THRESHOLD", "2000"))
+
+# Exact payload size = a second fig.to_json() per chart and rerun → opt-in
+MEASURE_PAYLOAD = os.getenv("CHART_MEASURE_PAYLOAD", "0") == "1"
+
+# -------------------------------------------------------------------------------------
+# LTTB downsampling
+# -------------------------------------------------------------------------------------
+
+def lttb_indices(x, y, n_out):
+    """Indices of the `n_out` points LTTB keeps (first and last are always kept)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point for the final bucket)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Point in this bucket forming the largest triangle with a and the next average
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+
+    return keep
+
+
+def downsample(df, x, y, group=None, budget=POINT_BUDGET):
+    """LTTB-reduce every series of `df` so the chart stays within `budget` points."""
+    df = df.dropna(subset=[y]).sort_values([group, x] if group else [x])
+    if len(df) <= budget:
+        return df
+
+    groups = [df] if group is None else [g for _, g in df.groupby(group, sort=False, observed=True)]
+    per_series = max(budget // max(len(groups), 1), MIN_SERIES_POINTS)
+
+    parts = []
+    for part in groups:
+        if len(part) > per_series:
+            xs = part[x].to_numpy()
+            if np.issubdtype(xs.dtype, np.datetime64):
+                xs = xs.astype("datetime64[ns]").astype("int64")
+            part = part.iloc[lttb_indices(xs, part[y].to_numpy(), per_series)]
+        parts.append(part)
+
+    return pd.concat(parts)
+
+
+def global_series(df, x, y):
+    """One row per x for a series that is repeated for every country."""
+    return df[[x, y]].dropna().drop_duplicates(subset=x).sort_values(x)
+
+# -------------------------------------------------------------------------------------
+# Figure builders
+# -------------------------------------------------------------------------------------
+
+def _render_mode(n_points):
+    return "webgl" if n_points > WEBGL_THRESHOLD else "svg"
+
+
+def line_chart(df, x, y, color=None, title=None, budget=POINT_BUDGET):
+    started = time.perf_counter()
+    data = downsample(df, x, y, group=color, budget=budget)
+    fig = px.line(data, x=x, y=y, color=color, title=title,
+                  render_mode=_render_mode(len(data)))
+    return fig, chart_stats(fig, len(df), len(data), started)
+
+
+def scatter_chart(df, x, y, color=None, title=None):
+    # Scatters are not downsampled (that would change the picture) — WebGL instead
+    started = time.perf_counter()
+    data = df.dropna(subset=[x, y])
+    fig = px.scatter(data, x=x, y=y, color=color, title=title,
+                     render_mode=_render_mode(len(data)))
+    return fig, chart_stats(fig, len(df), len(data), started)
+
+
+def global_line_chart(df, x, y, title=None, budget=POINT_BUDGET):
+    fig, stats = line_chart(global_series(df, x, y), x, y, title=title, budget=budget)
+    stats["rows_in"] = int(len(df))
+    return fig, stats
+
+# -------------------------------------------------------------------------------------
+# Reporting
+# -------------------------------------------------------------------------------------
+
+def chart_stats(fig, rows_in, points_out, started, measure_payload=None):
+    build_ms = (time.perf_counter() - started) * 1000
+    measure_payload = MEASURE_PAYLOAD if measure_payload is None else measure_payload
+    return {
+        "rows_in": int(rows_in),
+        "points_out": int(points_out),
+        "payload_bytes": len(fig.to_json()) if measure_payload else None,
+        "build_ms": build_ms,
+        "webgl": any(trace.type == "scattergl" for trace in fig.data),
+    }
+
+
+def format_stats(stats):
+    mode = "WebGL" if stats["webgl"] else "SVG"
+    payload = f"{stats['payload_bytes'] / 1024:,.0f} KB payload • " if stats["payload_bytes"] is not None else ""
+    return (f"{stats['points_out']:,} of {stats['rows_in']:,} points • {payload}"
+            f"{stats['build_ms']:,.0f} ms • {mode}")
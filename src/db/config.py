@@ -1,19 +1,164 @@
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# ENV values
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASS = os.getenv("DB_PASS", "password")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "global_econ")
-
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-engine = create_engine(DATABASE_URL, echo=True)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+import glob
+import os
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy.orm import sessionmaker
+from dotenv import load_dotenv
+
+from src.utils.instrumentation import instrument_engine
+
+load_dotenv()
+
+
+def _flag(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+# ENV values
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASS = os.getenv("DB_PASS", "password")
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "global_econ")
+
+# SQL echo logs every statement (one line per INSERT on a load) → opt-in only
+DB_ECHO = _flag("DB_ECHO", "false")
+
+# Per-query timing records in the metrics log (stage totals are always kept)
+DB_QUERY_TIMING = _flag("DB_QUERY_TIMING", "false")
+
+# postgres (default) | sqlite | duckdb — the embedded ones need no database server
+# (duckdb uses the duckdb + duckdb-engine packages pinned in requirements.txt)
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/global_econ.db")
+DUCKDB_PATH = os.getenv("DUCKDB_PATH", "data/global_econ.duckdb")
+
+# DuckDB also exposes the processed Parquet dataset in place as `processed_macro_data`
+DUCKDB_PROCESSED_GLOB = os.getenv("DUCKDB_PROCESSED_GLOB", "data/processed/macro_data/**/*.parquet")
+
+# A DuckDB file is locked by one read-write process OR shared by read-only ones:
+# connections are opened per use, and a connect that hits the other side's lock
+# retries for this long (seconds) before failing
+DUCKDB_LOCK_TIMEOUT = float(os.getenv("DUCKDB_LOCK_TIMEOUT", "30"))
+
+
+def backend_url(backend=DB_BACKEND):
+    if backend in ("postgres", "postgresql"):
+        return f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    if backend == "sqlite":
+        return f"sqlite:///{SQLITE_PATH}"
+    if backend == "duckdb":
+        return f"duckdb:///{DUCKDB_PATH}"
+    raise ValueError(f"Unknown DB_BACKEND '{backend}' (expected postgres, sqlite or duckdb)")
+
+
+# A full DATABASE_URL (e.g. sqlite:///data/global_econ.db) overrides DB_BACKEND
+DATABASE_URL = os.getenv("DATABASE_URL") or backend_url()
+BACKEND = make_url(DATABASE_URL).get_backend_name()   # postgresql | sqlite | duckdb
+
+if BACKEND == "duckdb":
+    try:
+        import duckdb_engine  # noqa: F401  (registers the duckdb:// dialect)
+    except ImportError as e:
+        # Otherwise SQLAlchemy fails later with "Can't load plugin: sqlalchemy.dialects:duckdb"
+        raise ImportError(
+            "The duckdb backend needs the DuckDB driver: pip install duckdb duckdb-engine "
+            "(both pinned in requirements.txt)"
+        ) from e
+
+# Connection pool: shared by the dashboard, notebooks and the API
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # seconds, -1 = never
+DB_POOL_PRE_PING = _flag("DB_POOL_PRE_PING", "true")          # drop dead connections after DB restarts
+
+
+def _in_memory(url):
+    database = make_url(url).database
+    return not database or database == ":memory:"
+
+
+def engine_options(url=DATABASE_URL, read_only=False):
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    backend = make_url(url).get_backend_name()
+
+    if backend != "postgresql" and _in_memory(url):
+        # Every new connection would be a new empty database → share one
+        if backend == "duckdb":
+            options["poolclass"] = StaticPool
+    elif backend == "duckdb":
+        # A pooled connection would hold the file lock for the life of the process
+        # (dashboard / API) and lock the loader out → connect per use instead
+        options["poolclass"] = NullPool
+        if read_only:
+            options["connect_args"] = {"read_only": True}
+    else:
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+def _ensure_database_dir(url):
+    # Embedded backends create the file, not its directory
+    if make_url(url).get_backend_name() in ("sqlite", "duckdb") and not _in_memory(url):
+        os.makedirs(os.path.dirname(make_url(url).database) or ".", exist_ok=True)
+
+
+_ensure_database_dir(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options())
+
+# Readers (src.db.query: dashboard, API) — a read-only DuckDB connection, so any
+# number of reader processes can share the file between loads; the same engine elsewhere
+if BACKEND == "duckdb" and not _in_memory(DATABASE_URL):
+    read_engine = create_engine(DATABASE_URL, **engine_options(read_only=True))
+else:
+    read_engine = engine
+
+
+def _duckdb_events(target):
+    @event.listens_for(target, "do_connect")
+    def _retry_locked(dialect, connection_record, cargs, cparams):
+        deadline = time.monotonic() + DUCKDB_LOCK_TIMEOUT
+        while True:
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception as e:
+                # "Could not set lock on file …": a load (or a reader) has it open right now
+                if "lock" not in str(e).lower() or time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+    @event.listens_for(target, "connect")
+    def _processed_view(dbapi_connection, connection_record):
+        # Columnar scan of the Parquet store, no load step (ad-hoc / notebook queries)
+        if next(glob.iglob(DUCKDB_PROCESSED_GLOB, recursive=True), None) is None:
+            return
+        dbapi_connection.execute(
+            "CREATE OR REPLACE TEMP VIEW processed_macro_data AS "
+            f"SELECT * FROM read_parquet('{DUCKDB_PROCESSED_GLOB}', hive_partitioning = true)"
+        )
+
+
+if BACKEND == "duckdb":
+    _duckdb_events(engine)
+    if read_engine is not engine:
+        _duckdb_events(read_engine)
+
+if BACKEND == "sqlite":
+    # pysqlite only BEGINs before DML → let SQLAlchemy emit BEGIN itself so DDL
+    # (the loader's staging-table swap) is part of the transaction too
+    @event.listens_for(engine, "connect")
+    def _sqlite_autocommit_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+instrument_engine(engine, log_queries=DB_QUERY_TIMING)
+if read_engine is not engine:
+    instrument_engine(read_engine, log_queries=DB_QUERY_TIMING)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
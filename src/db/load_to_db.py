@@ -1,50 +1,486 @@
-import pandas as pd
-from sqlalchemy.orm import Session
-from src.db.config import engine, SessionLocal
-from src.db.models import Base, MacroData
-
-def create_tables():
-    print("📦 Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✔ Tables created successfully!")
-
-def load_csv_to_db():
-    file_path = "data/processed/cleaned_global_data.csv"
-    print(f"📥 Loading CSV: {file_path}")
-
-    df = pd.read_csv(file_path)
-
-    # Convert date column
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    print("📤 Inserting rows into database...")
-
-    session = SessionLocal()
-
-    try:
-        for _, row in df.iterrows():
-            entry = MacroData(
-                iso3=row["iso3"],
-                date=row["date"],
-                inflation_rate=row.get("inflation_rate"),
-                wage_index=row.get("wage_index"),
-                commodity_price=row.get("commodity_price")
-            )
-            session.add(entry)
-
-        session.commit()
-        print("✅ All data inserted successfully!")
-
-    except Exception as e:
-        session.rollback()
-        print("❌ Error inserting data:", e)
-
-    finally:
-        session.close()
-
-def main():
-    create_tables()
-    load_csv_to_db()
-
-if __name__ == "__main__":
-    main()
+"""
+LOAD PROCESSED DATA INTO THE DATABASE
+-------------------------------------
+
+macro_data is loaded from the processed Parquet store (or a CSV):
+- incremental (default)  upsert only the (iso3, date) rows whose row_hash changed
+- full                   bulk load everything into a staging table, swap it in
+- swap                   the staging swap, only when some row changed (refresh service)
+The monthly commodity panel replaces commodity_prices when its content changed.
+
+Upgrading an existing database: create_all never alters a table that already
+exists, so a macro_data created before row_hash / the unique (iso3, date) key
+(which may also hold duplicate country-years) is detected before loading and
+rebuilt once by a full staging-swap reload — the staging table has the current
+schema and the loaded frame one row per key. Later runs are incremental again.
+
+Usage: python -m src.db.load_to_db [--mode incremental|full|swap]
+
+"""
+
+import argparse
+import io
+import os
+import time
+from contextlib import nullcontext
+
+import pandas as pd
+from sqlalchemy import Engine, MetaData, Sequence, delete, inspect, select
+from src.db.config import engine
+from src.db.models import Base, CommodityPrice, MacroData
+from src.db.query import get_data_version, invalidate_cache
+from src.db.snapshot import snapshot_exists, write_snapshot
+from src.processing.commodity_rollups import rollup_path
+from src.processing.parquet_store import load_processed
+from src.utils.instrumentation import instrumented
+
+# Rows per COPY / executemany batch
+CHUNK_SIZE = int(os.getenv("LOAD_CHUNK_SIZE", "50000"))
+
+KEY_COLUMNS = ["iso3", "date"]
+VALUE_COLUMNS = ["inflation_rate", "wage_index", "commodity_price"]
+
+# Staging copies alternate between two names so their index / constraint names
+# never collide with the ones the live table inherited from the previous swap
+STAGING_SUFFIXES = ("_staging_a", "_staging_b")
+
+# PostgreSQL: how long the swap may wait for its (brief) exclusive lock, and how often to retry
+SWAP_LOCK_TIMEOUT_MS = int(os.getenv("SWAP_LOCK_TIMEOUT_MS", "5000"))
+SWAP_RETRIES = int(os.getenv("SWAP_RETRIES", "3"))
+
+def create_tables():
+    print("📦 Creating database tables...")
+    Base.metadata.create_all(bind=engine)
+    print("✔ Tables created successfully!")
+
+# -------------------------------------------------------------------------------------
+# Bulk load helpers
+# -------------------------------------------------------------------------------------
+
+def _load_columns(df, table):
+    # Only columns that exist in both the frame and the table (never the surrogate id)
+    return [c.name for c in table.columns if c.name != "id" and c.name in df.columns]
+
+def _copy_chunk(conn, table, columns, chunk):
+    # PostgreSQL: stream the chunk as CSV through COPY FROM STDIN
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, columns=columns, header=False, index=False, date_format="%Y-%m-%d")
+    buffer.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def _duckdb_chunk(conn, table, columns, chunk):
+    # DuckDB: scan the DataFrame directly (executemany would insert row by row)
+    raw = conn.connection.dbapi_connection
+    raw.register("_bulk_chunk", chunk[columns])
+    try:
+        column_list = ", ".join(columns)
+        conn.exec_driver_sql(f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM _bulk_chunk")
+    finally:
+        raw.unregister("_bulk_chunk")
+
+def _executemany_chunk(conn, table, columns, chunk):
+    # Any other backend (SQLite, ...): one multi-row INSERT via executemany
+    records = chunk[columns].astype(object).where(chunk[columns].notna(), None)
+    conn.execute(table.insert(), records.to_dict("records"))
+
+@instrumented()
+def bulk_load(df, table=None, chunk_size=CHUNK_SIZE, bind=None):
+    """Append a frame to `table` in chunks (COPY on PostgreSQL, DataFrame scan on DuckDB, executemany elsewhere)."""
+    table = table if table is not None else MacroData.__table__
+    bind = bind if bind is not None else engine
+    columns = _load_columns(df, table)
+
+    if "date" in columns:
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce").dt.date)
+
+    write_chunk = {"postgresql": _copy_chunk, "duckdb": _duckdb_chunk}.get(bind.dialect.name, _executemany_chunk)
+    total = len(df)
+    loaded = 0
+    started = time.perf_counter()
+
+    for start in range(0, total, chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        chunk_started = time.perf_counter()
+
+        # One transaction per chunk keeps the session (and WAL) bounded
+        with bind.begin() as conn:
+            write_chunk(conn, table, columns, chunk)
+
+        elapsed = time.perf_counter() - chunk_started
+        loaded += len(chunk)
+        print(f"   ↳ chunk {start // chunk_size + 1}: {len(chunk):,} rows "
+              f"in {elapsed:.2f}s ({len(chunk) / max(elapsed, 1e-9):,.0f} rows/s) "
+              f"[{loaded:,}/{total:,}]")
+
+    elapsed = time.perf_counter() - started
+    print(f"⚡ Loaded {loaded:,} rows in {elapsed:.2f}s "
+          f"({loaded / max(elapsed, 1e-9):,.0f} rows/s)")
+    return loaded
+
+# -------------------------------------------------------------------------------------
+# Row fingerprints (incremental mode)
+# -------------------------------------------------------------------------------------
+
+def prepare_frame(df):
+    """Normalize keys, keep one row per (iso3, date) and attach row_hash."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=KEY_COLUMNS).drop_duplicates(subset=KEY_COLUMNS, keep="first")
+
+    for col in VALUE_COLUMNS:
+        if col not in df.columns:
+            df[col] = float("nan")
+
+    # uint64 hash of the value columns, stored as signed BIGINT
+    df["row_hash"] = (
+        pd.util.hash_pandas_object(df[VALUE_COLUMNS], index=False)
+        .to_numpy()
+        .view("int64")
+    )
+    return df.reset_index(drop=True)
+
+@instrumented()
+def fetch_stored_hashes(bind=None):
+    bind = bind if bind is not None else engine
+    table = MacroData.__table__
+    query = select(table.c.iso3, table.c.date, table.c.row_hash)
+
+    with bind.connect() as conn:
+        stored = pd.read_sql(query, conn)
+
+    stored["date"] = pd.to_datetime(stored["date"], errors="coerce")
+    return stored.rename(columns={"row_hash": "stored_hash"})
+
+def legacy_schema(bind=None, table=None):
+    """True when the stored table predates row_hash / the unique (iso3, date) key."""
+    table = table if table is not None else MacroData.__table__
+    bind = bind if bind is not None else engine
+
+    inspector = inspect(bind)
+    if not inspector.has_table(table.name):
+        return False
+    if "row_hash" not in {c["name"] for c in inspector.get_columns(table.name)}:
+        return True
+
+    if bind.dialect.name == "duckdb":
+        # duckdb-engine does not reflect constraints → read DuckDB's own catalog
+        with (bind.connect() if isinstance(bind, Engine) else nullcontext(bind)) as conn:
+            keys = [row[0] for row in conn.exec_driver_sql(
+                "SELECT constraint_column_names FROM duckdb_constraints() "
+                f"WHERE table_name = '{table.name}' AND constraint_type = 'UNIQUE'"
+            )]
+    else:
+        keys = [uq["column_names"] for uq in inspector.get_unique_constraints(table.name)]
+        keys += [ix["column_names"] for ix in inspector.get_indexes(table.name) if ix.get("unique")]
+    return sorted(KEY_COLUMNS) not in [sorted(k) for k in keys]
+
+def changed_rows(df, stored):
+    """Rows of `df` that are new or whose values differ from what is stored."""
+    compared = df.merge(stored, on=KEY_COLUMNS, how="left")
+    mask = compared["stored_hash"].isna() | (compared["stored_hash"] != compared["row_hash"])
+    return df[mask.to_numpy()]
+
+# -------------------------------------------------------------------------------------
+# Upsert
+# -------------------------------------------------------------------------------------
+
+def _upsert_statement(table, dialect_name, columns):
+    if dialect_name in ("postgresql", "duckdb"):
+        # DuckDB speaks the PostgreSQL ON CONFLICT syntax
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    stmt = insert(table)
+    updates = {c: stmt.excluded[c] for c in columns if c not in KEY_COLUMNS}
+    return stmt.on_conflict_do_update(index_elements=KEY_COLUMNS, set_=updates)
+
+@instrumented()
+def upsert(df, table=None, chunk_size=CHUNK_SIZE, bind=None):
+    """INSERT ... ON CONFLICT (iso3, date) DO UPDATE, in chunks."""
+    table = table if table is not None else MacroData.__table__
+    bind = bind if bind is not None else engine
+    columns = _load_columns(df, table)
+    df = df.assign(date=df["date"].dt.date)
+
+    stmt = _upsert_statement(table, bind.dialect.name, columns)
+
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        records = chunk[columns].astype(object).where(chunk[columns].notna(), None)
+        records = records.to_dict("records")
+
+        with bind.begin() as conn:
+            if stmt is not None:
+                conn.execute(stmt, records)
+            else:
+                # No native upsert: replace the affected keys inside one transaction
+                for record in records:
+                    conn.execute(delete(table).where(
+                        (table.c.iso3 == record["iso3"]) & (table.c.date == record["date"])
+                    ))
+                conn.execute(table.insert(), records)
+
+    return len(df)
+
+# -------------------------------------------------------------------------------------
+# Staging table + atomic swap
+# -------------------------------------------------------------------------------------
+
+def _staging_name(conn, table):
+    """The staging name whose index / constraint names the live table is NOT using."""
+    first, second = (table.name + suffix for suffix in STAGING_SUFFIXES)
+    if conn.dialect.name == "duckdb":
+        # Rows are copied back into the live table (see _swap) → it never inherits staging names
+        return first
+
+    inspector = inspect(conn)
+    used = {ix["name"] for ix in inspector.get_indexes(table.name)}
+    used |= {uq["name"] for uq in inspector.get_unique_constraints(table.name)}
+    used.add(inspector.get_pk_constraint(table.name).get("name"))
+    return second if any(first in (name or "") for name in used) else first
+
+def staging_table(table, name):
+    """Copy of `table` named `name`; explicitly named constraints follow the new name."""
+    staging = table.to_metadata(MetaData(), name=name)
+    for constraint in staging.constraints:
+        if constraint.name:
+            constraint.name = constraint.name.replace(table.name, name)
+    return staging
+
+def _swap(conn, table, staging):
+    columns = ", ".join(c.name for c in table.columns if c.name != "id")
+
+    if conn.dialect.name == "duckdb":
+        # DuckDB cannot rename indexed tables; its MVCC gives readers the old rows until commit
+        if legacy_schema(conn, table):
+            # Old schema → recreate the live table from the model before copying back
+            conn.exec_driver_sql(f"DROP TABLE {table.name}")
+            table.create(conn)
+        else:
+            conn.execute(delete(table))
+        conn.exec_driver_sql(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {staging.name}")
+        conn.exec_driver_sql(f"DROP TABLE {staging.name}")
+        return
+
+    if conn.dialect.name == "postgresql":
+        # The renames need a brief exclusive lock: give up instead of queueing readers behind it
+        conn.exec_driver_sql(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT_MS}ms'")
+
+    retired = f"{table.name}_retired"
+    conn.exec_driver_sql(f"ALTER TABLE {table.name} RENAME TO {retired}")
+    conn.exec_driver_sql(f"ALTER TABLE {staging.name} RENAME TO {table.name}")
+    conn.exec_driver_sql(f"DROP TABLE {retired}")
+
+@instrumented()
+def swap_load(df, table=None, chunk_size=CHUNK_SIZE, bind=None):
+    """Bulk load `df` into a staging copy of `table`, then swap it in with one transaction.
+
+    Readers keep querying the old table during the (slow) load and see the new
+    one only after the swap commits — never a half-loaded or empty table.
+    """
+    table = table if table is not None else MacroData.__table__
+    bind = bind if bind is not None else engine
+
+    with bind.connect() as conn:
+        staging = staging_table(table, _staging_name(conn, table))
+
+    if bind.dialect.name == "duckdb":
+        # Sequence-backed ids (models.py): an old-schema live table never created the sequence
+        with bind.begin() as conn:
+            for column in staging.columns:
+                if isinstance(column.default, Sequence):
+                    conn.exec_driver_sql(f"CREATE SEQUENCE IF NOT EXISTS {column.default.name}")
+
+    # A crashed run may have left the staging table behind
+    staging.drop(bind, checkfirst=True)
+    staging.create(bind)
+    loaded = bulk_load(df, table=staging, chunk_size=chunk_size, bind=bind)
+
+    for attempt in range(1, SWAP_RETRIES + 1):
+        try:
+            with bind.begin() as conn:
+                _swap(conn, table, staging)
+            break
+        except Exception as e:
+            if attempt == SWAP_RETRIES:
+                staging.drop(bind, checkfirst=True)
+                raise
+            print(f"⚠️ Swap attempt {attempt} failed ({e}); retrying...")
+            time.sleep(attempt)
+
+    print(f"🔀 Swapped {staging.name} → {table.name}")
+    return loaded
+
+# -------------------------------------------------------------------------------------
+# Processed data → macro_data
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def read_source(file_path=None):
+    # Default: the partitioned Parquet store, reading only the loaded columns
+    if file_path is None:
+        print("📥 Loading processed dataset (parquet)")
+        return load_processed(columns=KEY_COLUMNS + VALUE_COLUMNS)
+
+    print(f"📥 Loading CSV: {file_path}")
+    return pd.read_csv(file_path)
+
+@instrumented()
+def publish_refresh(bump=True):
+    """Bump the data version and rewrite the dashboard snapshot."""
+    version = invalidate_cache() if bump else get_data_version()
+    try:
+        write_snapshot(version)
+    except Exception as e:
+        # The DB is already up to date; a stale snapshot only affects snapshot mode
+        print("⚠️ Could not write dashboard snapshot:", e)
+    return version
+
+def load_csv_to_db(file_path=None, chunk_size=CHUNK_SIZE):
+    """Full reload: bulk load every row into a staging table, then swap it in."""
+    df = prepare_frame(read_source(file_path))
+
+    print("📤 Inserting rows into database...")
+
+    try:
+        swap_load(df, chunk_size=chunk_size)
+        publish_refresh()
+        print("✅ All data inserted successfully!")
+
+    except Exception as e:
+        print("❌ Error inserting data:", e)
+        # Re-raised: the runner must record load_db as failed, not as up to date
+        raise
+
+@instrumented()
+def load_swap(file_path=None, chunk_size=CHUNK_SIZE):
+    """Full reload through the staging swap, only when some row changed (refresh service)."""
+    df = prepare_frame(read_source(file_path))
+    if legacy_schema():
+        # No row_hash to compare against; the swap replaces the table anyway
+        return upgrade_by_swap(df, chunk_size)
+
+    stored = fetch_stored_hashes()
+    delta = changed_rows(df, stored)
+
+    print(f"🔍 {len(df):,} rows compared → {len(delta):,} new or changed")
+
+    if delta.empty and len(df) == len(stored):
+        print("✅ Nothing to do — macro_data is up to date.")
+        if not snapshot_exists():
+            publish_refresh(bump=False)
+        return 0
+
+    try:
+        loaded = swap_load(df, chunk_size=chunk_size)
+        publish_refresh()
+        print(f"✅ Reloaded {loaded:,} rows!")
+        return loaded
+
+    except Exception as e:
+        print("❌ Error reloading data:", e)
+        raise
+
+def upgrade_by_swap(df, chunk_size=CHUNK_SIZE):
+    """One full staging-swap reload of an old-schema macro_data (see module docstring)."""
+    print("🔧 macro_data predates row_hash / the unique (iso3, date) key → "
+          "rebuilding it with one full staging-swap reload")
+    try:
+        loaded = swap_load(df, chunk_size=chunk_size)
+        publish_refresh()
+        print(f"✅ Upgraded macro_data: {loaded:,} rows, one per (iso3, date)")
+        return loaded
+
+    except Exception as e:
+        print("❌ Error upgrading macro_data:", e)
+        raise
+
+@instrumented()
+def load_incremental(file_path=None, chunk_size=CHUNK_SIZE):
+    """Upsert only the (iso3, date) rows whose fingerprint changed."""
+    df = prepare_frame(read_source(file_path))
+    if legacy_schema():
+        return upgrade_by_swap(df, chunk_size)
+
+    stored = fetch_stored_hashes()
+    delta = changed_rows(df, stored)
+
+    print(f"🔍 {len(df):,} rows compared → {len(delta):,} new or changed")
+
+    if delta.empty:
+        print("✅ Nothing to do — macro_data is up to date.")
+        if not snapshot_exists():
+            publish_refresh(bump=False)
+        return 0
+
+    try:
+        upserted = upsert(delta, chunk_size=chunk_size)
+        publish_refresh()
+        print(f"✅ Upserted {upserted:,} rows!")
+        return upserted
+
+    except Exception as e:
+        print("❌ Error upserting data:", e)
+        raise
+
+# -------------------------------------------------------------------------------------
+# Monthly commodity panel → commodity_prices
+# -------------------------------------------------------------------------------------
+
+def _commodity_frame(df):
+    df = df[["commodity", "date", "price"]].copy()
+    df["commodity"] = df["commodity"].astype(str)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["price"] = df["price"].astype("float64")
+    return df.sort_values(["commodity", "date"]).reset_index(drop=True)
+
+@instrumented()
+def load_commodities(file_path=None, force=False, chunk_size=CHUNK_SIZE):
+    """Replace commodity_prices with the monthly table (small) when its content changed."""
+    file_path = file_path or rollup_path("monthly")
+    if not os.path.exists(file_path):
+        print(f"⚠️ {file_path} not found — run the IMF rollups first.")
+        return 0
+
+    df = _commodity_frame(pd.read_parquet(file_path))
+    table = CommodityPrice.__table__
+
+    if not force:
+        with engine.connect() as conn:
+            stored = _commodity_frame(pd.read_sql(select(table), conn))
+        if df.equals(stored):
+            print("✅ Nothing to do — commodity_prices is up to date.")
+            return 0
+
+    print(f"📤 Replacing commodity_prices ({len(df):,} rows)...")
+    return swap_load(df, table=table, chunk_size=chunk_size)
+
+def main(mode="incremental"):
+    create_tables()
+    if mode == "full":
+        load_csv_to_db()
+    elif mode == "swap":
+        load_swap()
+    else:
+        load_incremental()
+
+    if load_commodities(force=mode == "full"):
+        publish_refresh()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load processed data into macro_data")
+    parser.add_argument("--mode", choices=["incremental", "full", "swap"], default="incremental",
+                        help="incremental: upsert changed rows; full: reload via staging swap; "
+                             "swap: staging swap only when something changed")
+    main(parser.parse_args().mode)
@@ -1,16 +1,57 @@
-from sqlalchemy import Column, Integer, Float, String, Date
-from sqlalchemy.orm import declarative_base
-
-Base = declarative_base()
-
-class MacroData(Base):
-    __tablename__ = "macro_data"
-
-    id = Column(Integer, primary_key=True, index=True)
-    iso3 = Column(String, index=True)
-    date = Column(Date, index=True)
-
-    inflation_rate = Column(Float)
-    wage_index = Column(Float)
-    commodity_price = Column(Float)
-
+from sqlalchemy import DDL, Column, Integer, BigInteger, Double, Float, String, Date, Sequence, UniqueConstraint, event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import CreateColumn
+
+Base = declarative_base()
+
+# PostgreSQL (SERIAL) and SQLite (ROWID) generate ids themselves → the sequence is
+# optional there; DuckDB has no SERIAL and uses it explicitly (see bottom of file)
+MACRO_DATA_ID_SEQ = Sequence("macro_data_id_seq", optional=True)
+
+# FLOAT is double precision on PostgreSQL / SQLite but 4-byte REAL on DuckDB
+VALUE_TYPE = Float().with_variant(Double(), "duckdb")
+
+class MacroData(Base):
+    __tablename__ = "macro_data"
+    __table_args__ = (
+        # One row per country-year → re-running the loader upserts instead of duplicating
+        UniqueConstraint("iso3", "date", name="uq_macro_data_iso3_date"),
+    )
+
+    id = Column(Integer, MACRO_DATA_ID_SEQ, primary_key=True, index=True)
+    iso3 = Column(String, index=True)
+    date = Column(Date, index=True)
+
+    inflation_rate = Column(VALUE_TYPE)
+    wage_index = Column(VALUE_TYPE)
+    commodity_price = Column(VALUE_TYPE)
+
+    # Fingerprint of the value columns, used by the incremental loader
+    row_hash = Column(BigInteger)
+
+class CommodityPrice(Base):
+    """Monthly IMF price of every commodity, long: one row per (commodity, date)."""
+    __tablename__ = "commodity_prices"
+
+    # (commodity, date) leads the primary key index → selecting one series is an index range scan
+    commodity = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    price = Column(VALUE_TYPE)
+
+# -------------------------------------------------------------------------------------
+# DuckDB: sequence-backed surrogate ids
+# -------------------------------------------------------------------------------------
+
+event.listen(
+    MacroData.__table__, "before_create",
+    DDL(f"CREATE SEQUENCE IF NOT EXISTS {MACRO_DATA_ID_SEQ.name}").execute_if(dialect="duckdb"),
+)
+
+
+@compiles(CreateColumn, "duckdb")
+def _duckdb_sequence_default(element, compiler, **kw):
+    column = element.element
+    if column.primary_key and isinstance(column.default, Sequence):
+        return f"{column.name} INTEGER DEFAULT nextval('{column.default.name}') NOT NULL"
+    return compiler.visit_create_column(element, **kw)
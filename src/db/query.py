@@ -1,21 +1,230 @@
-import pandas as pd
-from sqlalchemy import text
-from src.db.config import engine
-
-def load_all_data():
-    query = text("SELECT * FROM macro_data")
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df
-
-def load_countries():
-    query = text("SELECT DISTINCT iso3 FROM macro_data ORDER BY iso3")
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df['iso3'].tolist()
-
-def load_years():
-    query = text("SELECT DISTINCT EXTRACT(YEAR FROM date) AS year FROM macro_data ORDER BY year")
-    with engine.connect() as conn:
-        df = pd.read_sql(query, conn)
-    return df['year'].tolist()
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+from cachetools import TTLCache
+from sqlalchemy import extract, select, text
+from src.db.config import read_engine
+from src.db.models import CommodityPrice, MacroData
+from src.utils.schema import compact
+
+# Bumped by the loader after every refresh; consumers use it as a cache key
+DATA_VERSION_FILE = os.getenv("DATA_VERSION_FILE", "data/processed/.data_version")
+
+VALUE_COLUMNS = ["inflation_rate", "wage_index", "commodity_price"]
+
+# Result cache shared by every consumer in this process (dashboard, notebooks, API)
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "600"))
+QUERY_CACHE_MAX_MB = float(os.getenv("QUERY_CACHE_MAX_MB", "256"))
+
+# -------------------------------------------------------------------------------------
+# Data version / cache invalidation
+# -------------------------------------------------------------------------------------
+
+def get_data_version():
+    try:
+        with open(DATA_VERSION_FILE) as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+def invalidate_cache():
+    """Called by the loader after a refresh: every cache keyed on the version misses."""
+    os.makedirs(os.path.dirname(DATA_VERSION_FILE) or ".", exist_ok=True)
+    version = str(time.time_ns())
+    with open(DATA_VERSION_FILE, "w") as f:
+        f.write(version)
+    clear_query_cache()
+    return version
+
+# -------------------------------------------------------------------------------------
+# Query result cache (LRU + TTL, bounded by result size in bytes)
+# -------------------------------------------------------------------------------------
+
+def _result_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class _ResultCache(TTLCache):
+    _clearing = False
+
+    # popitem() makes room for a new entry → an eviction, unless clear() is
+    # emptying the cache through it
+    def popitem(self):
+        key, value = super().popitem()
+        if not self._clearing:
+            _stats["evictions"] += 1
+        return key, value
+
+    def clear(self):
+        self._clearing = True
+        try:
+            super().clear()
+        finally:
+            self._clearing = False
+
+
+_cache = _ResultCache(maxsize=int(QUERY_CACHE_MAX_MB * 1024 * 1024), ttl=QUERY_CACHE_TTL,
+                      getsizeof=_result_size)
+_cache_lock = threading.RLock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0, "db_seconds": 0.0}
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _cache_key(query):
+    # Compiled SQL + bound parameters + data version (bumped by the loader in any process)
+    compiled = query.compile(read_engine)
+    params = tuple(sorted((k, _hashable(v)) for k, v in compiled.params.items()))
+    return str(compiled), params, get_data_version()
+
+
+def cached_read(query, postprocess=None):
+    """pd.read_sql through the result cache; returns a copy the caller may modify."""
+    key = _cache_key(query) if QUERY_CACHE_ENABLED else None
+
+    if key is not None:
+        with _cache_lock:
+            df = _cache.get(key)
+            if df is not None:
+                _stats["hits"] += 1
+        if df is not None:
+            return df.copy()
+
+    started = time.perf_counter()
+    with read_engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+    if postprocess is not None:
+        df = postprocess(df)
+    elapsed = time.perf_counter() - started
+
+    with _cache_lock:
+        _stats["misses"] += 1
+        _stats["db_seconds"] += elapsed
+
+    if key is not None:
+        with _cache_lock:
+            try:
+                _cache[key] = df
+            except ValueError:
+                # Larger than the whole cache
+                _stats["uncacheable"] += 1
+        df = df.copy()
+
+    return df
+
+
+def clear_query_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def query_cache_stats():
+    """Counters for dashboards / notebooks: hits, misses, evictions, bytes, mean DB latency."""
+    with _cache_lock:
+        _cache.expire()
+        entries, current_bytes = len(_cache), _cache.currsize
+
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        "mean_db_ms": _stats["db_seconds"] / _stats["misses"] * 1000 if _stats["misses"] else 0.0,
+        "entries": entries,
+        "bytes": current_bytes,
+        "max_bytes": _cache.maxsize,
+        "ttl_s": QUERY_CACHE_TTL,
+    }
+
+# -------------------------------------------------------------------------------------
+# Queries
+# -------------------------------------------------------------------------------------
+
+def _year_conditions(column, year_range):
+    """(start_year, end_year), either bound may be None (open-ended window)."""
+    # Range on the raw date column keeps the date index usable
+    start_year, end_year = year_range
+    conditions = []
+    if start_year is not None:
+        conditions.append(column >= date(int(start_year), 1, 1))
+    if end_year is not None:
+        conditions.append(column <= date(int(end_year), 12, 31))
+    return conditions
+
+def load_all_data():
+    query = text("SELECT * FROM macro_data")
+    return cached_read(query, compact)
+
+def load_macro_data(countries=None, year_range=None, columns=None):
+    """Filtered read: country, year-range and column selection all happen in SQL."""
+    table = MacroData.__table__
+
+    columns = VALUE_COLUMNS if columns is None else list(columns)
+    unknown = [c for c in columns if c not in table.c]
+    if unknown:
+        raise ValueError(f"Unknown macro_data columns: {unknown}")
+
+    query = select(table.c.iso3, table.c.date, *[table.c[c] for c in columns])
+
+    if countries:
+        query = query.where(table.c.iso3.in_(list(countries)))
+
+    if year_range:
+        query = query.where(*_year_conditions(table.c.date, year_range))
+
+    query = query.order_by(table.c.iso3, table.c.date)
+
+    return cached_read(query, _typed_macro_frame)
+
+def _typed_macro_frame(df):
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+    # Categorical iso3 / float32 values: per-session memory in the dashboard
+    return compact(df)
+
+def load_countries():
+    query = text("SELECT DISTINCT iso3 FROM macro_data ORDER BY iso3")
+    df = cached_read(query)
+    return df['iso3'].tolist()
+
+def load_years():
+    # extract() compiles per backend (EXTRACT on PostgreSQL / DuckDB, strftime on SQLite)
+    year = extract("year", MacroData.__table__.c.date).label("year")
+    query = select(year).distinct().order_by(year)
+    df = cached_read(query)
+    return df['year'].tolist()
+
+def load_commodities(commodities=None, year_range=None):
+    """Monthly prices (long: commodity, date, price) of the selected commodities."""
+    table = CommodityPrice.__table__
+    query = select(table.c.commodity, table.c.date, table.c.price)
+
+    if commodities:
+        query = query.where(table.c.commodity.in_(list(commodities)))
+
+    if year_range:
+        query = query.where(*_year_conditions(table.c.date, year_range))
+
+    query = query.order_by(table.c.commodity, table.c.date)
+
+    return cached_read(query, _typed_commodity_frame)
+
+def _typed_commodity_frame(df):
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["commodity"] = df["commodity"].astype("category")
+    return df
+
+def load_commodity_names():
+    query = select(CommodityPrice.__table__.c.commodity).distinct().order_by(CommodityPrice.__table__.c.commodity)
+    df = cached_read(query)
+    return df["commodity"].tolist()
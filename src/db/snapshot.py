@@ -0,0 +1,142 @@
+"""
+DASHBOARD SNAPSHOT
+------------------
+
+After every refresh the loader dumps macro_data to an uncompressed Arrow IPC
+(Feather v2) file plus a small meta.json (countries, years, data version):
+
+    data/snapshot/macro_data.arrow
+    data/snapshot/meta.json
+
+The dashboard can boot from it without touching the database
+(DASHBOARD_MODE=snapshot) or fall back to it when PostgreSQL is down
+(DASHBOARD_MODE=auto). The file is memory-mapped, so reads only page in the
+columns a chart needs.
+
+The read side only imports pyarrow / pandas on first use; SQLAlchemy is only
+imported by write_snapshot().
+
+"""
+
+import json
+import os
+
+SNAPSHOT_DIR = os.getenv("DASHBOARD_SNAPSHOT_DIR", "data/snapshot")
+SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, "macro_data.arrow")
+META_PATH = os.path.join(SNAPSHOT_DIR, "meta.json")
+
+VALUE_COLUMNS = ["inflation_rate", "wage_index", "commodity_price"]
+
+# (mtime, table) of the last mapped snapshot
+_TABLE = None
+
+# -------------------------------------------------------------------------------------
+# Write (loader side)
+# -------------------------------------------------------------------------------------
+
+def write_snapshot(version=None, bind=None):
+    """Dump macro_data + meta.json; both files are swapped in atomically."""
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    from sqlalchemy import select
+
+    from src.db.config import engine
+    from src.db.models import MacroData
+
+    table = MacroData.__table__
+    query = select(table.c.iso3, table.c.date, *[table.c[c] for c in VALUE_COLUMNS]) \
+        .order_by(table.c.iso3, table.c.date)
+
+    with (bind or engine).connect() as conn:
+        df = pd.read_sql(query, conn)
+
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df[VALUE_COLUMNS] = df[VALUE_COLUMNS].astype("float64")
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    tmp_path = SNAPSHOT_PATH + ".tmp"
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp_path,
+                          compression="uncompressed")
+    os.replace(tmp_path, SNAPSHOT_PATH)
+
+    years = df["date"].dt.year.dropna().astype(int)
+    meta = {
+        "version": version,
+        "rows": len(df),
+        "countries": sorted(df["iso3"].dropna().unique().tolist()),
+        "years": sorted(years.unique().tolist()),
+        "written_at": pd.Timestamp.now(tz="UTC").isoformat(),
+    }
+    tmp_path = META_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, META_PATH)
+
+    print(f"📸 Snapshot written → {SNAPSHOT_PATH} ({len(df):,} rows)")
+    return meta
+
+# -------------------------------------------------------------------------------------
+# Read (dashboard side)
+# -------------------------------------------------------------------------------------
+
+def snapshot_exists():
+    return os.path.exists(SNAPSHOT_PATH) and os.path.exists(META_PATH)
+
+
+def load_meta():
+    with open(META_PATH) as f:
+        return json.load(f)
+
+
+def _table():
+    global _TABLE
+    import pyarrow as pa
+
+    mtime = os.path.getmtime(SNAPSHOT_PATH)
+    if _TABLE is None or _TABLE[0] != mtime:
+        # Zero-copy: the uncompressed IPC buffers point straight into the mapping
+        with pa.memory_map(SNAPSHOT_PATH, "r") as source:
+            _TABLE = (mtime, pa.ipc.open_file(source).read_all())
+    return _TABLE[1]
+
+
+def load_countries():
+    return load_meta()["countries"]
+
+
+def load_years():
+    return load_meta()["years"]
+
+
+def load_macro_data(countries=None, year_range=None, columns=None):
+    """Same contract as src.db.query.load_macro_data, served from the snapshot."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    columns = VALUE_COLUMNS if columns is None else list(columns)
+    unknown = [c for c in columns if c not in VALUE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown macro_data columns: {unknown}")
+
+    table = _table().select(["iso3", "date", *columns])
+
+    mask = None
+    if countries:
+        mask = pc.is_in(table["iso3"], value_set=pa.array(list(countries)))
+    if year_range:
+        start_year, end_year = year_range
+        year = pc.year(table["date"])
+        bounds = []
+        if start_year is not None:
+            bounds.append(pc.greater_equal(year, int(start_year)))
+        if end_year is not None:
+            bounds.append(pc.less_equal(year, int(end_year)))
+        for in_range in bounds:
+            mask = in_range if mask is None else pc.and_(mask, in_range)
+    if mask is not None:
+        table = table.filter(mask)
+
+    from src.utils.schema import compact
+    return compact(table.to_pandas())
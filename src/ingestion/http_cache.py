@@ -0,0 +1,312 @@
+"""
+HTTP CACHE - CONTENT-ADDRESSED RESPONSES FOR INGESTION
+------------------------------------------------------
+
+Shared fetch layer for the ingestion modules (World Bank API, OECD / IMF
+source files):
+- every response body is stored once under its sha256
+  (data/raw/.http_cache/blobs/ab/abcd…); a small index entry per request
+  (method + URL + sorted params) points at the blob with its ETag /
+  Last-Modified
+- refetches send If-None-Match / If-Modified-Since; a 304 returns the
+  cached body with not_modified=True so callers can skip parsing entirely
+- local source files get the same contract: sha256 + mtime stand in for
+  the validators, an unchanged file is "not modified"; the file is hashed
+  in chunks and the index entry references it in place (no blob copy,
+  never read into memory by the cache) — an offline replay re-hashes it and
+  raises CacheMiss when it no longer matches the recorded sha256
+- a blob is deleted once the last index entry pointing at it is overwritten
+- HTTP_CACHE_MODE=offline replays cached responses only (never the
+  network): deterministic ingestion runs and tests without a connection;
+  a request that was never cached raises CacheMiss
+
+Usage: python -m src.ingestion.http_cache [--clear]   (cache summary)
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from collections import Counter
+from datetime import datetime, timezone
+
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "data/raw/.http_cache")
+
+# online   conditional refetch, cache every 200
+# offline  replay from the cache only
+HTTP_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "online").lower()
+
+REQUEST_TIMEOUT = 60
+
+# Bytes read per step when hashing a local source file
+FILE_CHUNK_SIZE = 1024 * 1024
+
+
+class CacheMiss(Exception):
+    """Offline mode and the request was never cached."""
+
+
+class CachedResponse:
+    def __init__(self, url, status, body=None, not_modified=False, from_cache=False, entry=None, path=None):
+        self.url = url
+        self.status = status
+        self.path = path
+        self._body = body
+        self.not_modified = not_modified
+        self.from_cache = from_cache
+        self.entry = entry or {}
+
+    @property
+    def body(self):
+        # Local files: read only if a caller asks for the bytes (prefer .path)
+        if self._body is None and self.path is not None:
+            with open(self.path, "rb") as f:
+                self._body = f.read()
+        return self._body
+
+    def json(self):
+        return json.loads(self.body)
+
+    def text(self, encoding="utf-8"):
+        return self.body.decode(encoding)
+
+    def __repr__(self):
+        flag = " not-modified" if self.not_modified else (" cached" if self.from_cache else "")
+        return f"CachedResponse({self.status}{flag} {self.url})"
+
+# -------------------------------------------------------------------------------------
+# Store
+# -------------------------------------------------------------------------------------
+
+def request_key(url, params=None, method="GET"):
+    canonical = json.dumps([method.upper(), url, sorted((str(k), str(v)) for k, v in (params or {}).items())])
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _hash_file(path, chunk_size=FILE_CHUNK_SIZE):
+    """(sha256, size) of a file, read chunk by chunk."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class HTTPCache:
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, mode=HTTP_CACHE_MODE):
+        if mode not in ("online", "offline"):
+            raise ValueError(f"Unknown HTTP cache mode: {mode}")
+        self.cache_dir = cache_dir
+        self._refs = None
+        self.mode = mode
+
+    @property
+    def offline(self):
+        return self.mode == "offline"
+
+    def _index_path(self, key):
+        return os.path.join(self.cache_dir, "index", f"{key}.json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def lookup(self, url, params=None):
+        try:
+            with open(self._index_path(request_key(url, params))) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if entry.get("path"):
+            return entry if os.path.exists(entry["path"]) else None
+        return entry if os.path.exists(self._blob_path(entry["blob"])) else None
+
+    def _read_entry(self, index_path):
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _references(self):
+        """{blob digest: index entries stored in it}, read from the index once per cache object."""
+        if self._refs is None:
+            index_dir = os.path.join(self.cache_dir, "index")
+            entries = (self._read_entry(os.path.join(index_dir, name))
+                       for name in (os.listdir(index_dir) if os.path.isdir(index_dir) else []))
+            self._refs = Counter(e["blob"] for e in entries if e and not e.get("path"))
+        return self._refs
+
+    def read_blob(self, entry):
+        with open(self._blob_path(entry["blob"]), "rb") as f:
+            return f.read()
+
+    def store(self, url, params, body, etag=None, last_modified=None, content_type=None):
+        """Body → blob (written once per content), request → index entry."""
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            _write_atomic(blob_path, body)
+
+        return self._write_entry(url, params, digest, len(body), etag, last_modified, content_type)
+
+    def store_file(self, url, path, digest, size, etag=None):
+        """Local file → index entry referencing the file itself (the bytes are not copied)."""
+        return self._write_entry(url, None, digest, size, etag, path=os.path.abspath(path))
+
+    def _write_entry(self, url, params, digest, size, etag=None, last_modified=None, content_type=None,
+                     path=None):
+        entry = {
+            "url": url,
+            "params": {str(k): str(v) for k, v in (params or {}).items()},
+            "blob": digest,
+            "size": size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if path is not None:
+            entry["path"] = path
+
+        index_path = self._index_path(request_key(url, params))
+        refs = self._references()
+        previous = self._read_entry(index_path)
+        _write_atomic(index_path, json.dumps(entry, indent=2).encode())
+
+        # Local files reference themselves; only entries without a path own a blob
+        if path is None:
+            refs[digest] += 1
+        if previous and not previous.get("path"):
+            refs[previous["blob"]] -= 1
+            if refs[previous["blob"]] <= 0:
+                # Superseded content nothing else points at → the cache does not grow per revision
+                del refs[previous["blob"]]
+                try:
+                    os.remove(self._blob_path(previous["blob"]))
+                except FileNotFoundError:
+                    pass
+        return entry
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def replay(self, url, params=None):
+        entry = self.lookup(url, params)
+        if entry is None:
+            raise CacheMiss(f"{url} {params or ''} is not in the HTTP cache ({self.cache_dir})")
+        if entry.get("path"):
+            # Referenced in place → only a replay if the file still has the recorded content
+            if _hash_file(entry["path"])[0] != entry["blob"]:
+                raise CacheMiss(f"{entry['path']} changed since it was cached ({self.cache_dir})")
+            return CachedResponse(url, 200, from_cache=True, entry=entry, path=entry["path"])
+        return CachedResponse(url, 200, self.read_blob(entry), from_cache=True, entry=entry)
+
+    def _result(self, url, params, status, body, headers, entry):
+        """304 → cached body flagged not_modified; 200 → stored; anything else passed through."""
+        if status == 304 and entry is not None:
+            return CachedResponse(url, 304, self.read_blob(entry), not_modified=True, from_cache=True, entry=entry)
+        if status == 200:
+            entry = self.store(url, params, body, headers.get("ETag"), headers.get("Last-Modified"),
+                               headers.get("Content-Type"))
+        return CachedResponse(url, status, body, entry=entry)
+
+    # ---------------------------------------------------------------------------------
+    # Fetch
+    # ---------------------------------------------------------------------------------
+
+    def get(self, url, params=None, session=None, timeout=REQUEST_TIMEOUT):
+        """Blocking GET (requests) with conditional revalidation."""
+        if self.offline:
+            return self.replay(url, params)
+
+        import requests
+
+        entry = self.lookup(url, params)
+        response = (session or requests).get(url, params=params, headers=self.conditional_headers(entry),
+                                             timeout=timeout)
+        return self._result(url, params, response.status_code, response.content, response.headers, entry)
+
+    async def aget(self, session, url, params=None):
+        """aiohttp GET with conditional revalidation."""
+        if self.offline:
+            return self.replay(url, params)
+
+        entry = self.lookup(url, params)
+        async with session.get(url, params=params, headers=self.conditional_headers(entry)) as response:
+            body = await response.read()
+            return self._result(url, params, response.status, body, response.headers, entry)
+
+    def get_file(self, path):
+        """Local source file with the same contract: unchanged content → not_modified.
+
+        The response carries .path (read the file from there); the cache only
+        hashes it in chunks and records a reference, it never holds a copy.
+        """
+        url = "file://" + os.path.abspath(path)
+        entry = self.lookup(url)
+
+        if self.offline:
+            return self.replay(url)
+
+        stat = os.stat(path)
+        etag = f"{stat.st_size}-{stat.st_mtime_ns}"
+        if entry and entry.get("etag") == etag:
+            # Same size + mtime → unchanged without reading the file
+            return CachedResponse(url, 304, not_modified=True, from_cache=True, entry=entry, path=path)
+
+        digest, size = _hash_file(path)
+        unchanged = entry is not None and entry["blob"] == digest
+        entry = self.store_file(url, path, digest, size, etag)
+        return CachedResponse(url, 304 if unchanged else 200, not_modified=unchanged, entry=entry, path=path)
+
+    # ---------------------------------------------------------------------------------
+    # Maintenance
+    # ---------------------------------------------------------------------------------
+
+    def summary(self):
+        index_dir = os.path.join(self.cache_dir, "index")
+        blobs_dir = os.path.join(self.cache_dir, "blobs")
+        entries = len(os.listdir(index_dir)) if os.path.isdir(index_dir) else 0
+        blob_sizes = [
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(blobs_dir) for name in names
+        ]
+        return {"entries": entries, "blobs": len(blob_sizes), "bytes": sum(blob_sizes)}
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self._refs = None
+
+
+# Shared by the ingestion modules
+cache = HTTPCache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingestion HTTP cache")
+    parser.add_argument("--clear", action="store_true", help="delete every cached response")
+    args = parser.parse_args()
+
+    if args.clear:
+        cache.clear()
+        print(f"🗑  Cleared {HTTP_CACHE_DIR}")
+    stats = cache.summary()
+    print(f"📦 {HTTP_CACHE_DIR}: {stats['entries']:,} requests → {stats['blobs']:,} blobs "
+          f"({stats['bytes'] / 1e6:.1f} MB), mode={HTTP_CACHE_MODE}")
@@ -1,37 +1,47 @@
-import pandas as pd
-from pathlib import Path
-
-RAW_DIR = Path("data/raw")
-RAW_DIR.mkdir(parents=True, exist_ok=True)
-
-IMF_FILE = RAW_DIR / "imf_commodity_prices.csv"
-
-def ingest_imf():
-    # Read file in raw mode (no delimiter parsing)
-    with open(IMF_FILE, "r", encoding="ISO-8859-1") as f:
-        lines = f.readlines()
-
-    print("Preview of raw file (first 10 lines):")
-    for l in lines[:10]:
-        print(l.strip())
-
-    # Try flexible CSV reading (handles inconsistent delimiters)
-    try:
-        df = pd.read_csv(IMF_FILE, encoding="ISO-8859-1", on_bad_lines="skip")
-    except Exception:
-        df = pd.read_csv(IMF_FILE, sep=";", encoding="ISO-8859-1", on_bad_lines="skip")
-
-    # Drop empty columns
-    df = df.dropna(axis=1, how="all")
-
-    # Drop empty rows
-    df = df.dropna(how="all")
-
-    # Save cleaned version
-    out_file = RAW_DIR / "imf_commodity_prices_clean.csv"
-    df.to_csv(out_file, index=False)
-    print(f"\n✅ Cleaned IMF data saved → {out_file}")
-    print(df.head())
-
-if __name__ == "__main__":
-    ingest_imf()
+from itertools import islice
+
+import pandas as pd
+from pathlib import Path
+
+from src.ingestion.http_cache import cache
+from src.utils.instrumentation import instrumented
+
+RAW_DIR = Path("data/raw")
+RAW_DIR.mkdir(parents=True, exist_ok=True)
+
+IMF_FILE = RAW_DIR / "imf_commodity_prices.csv"
+OUT_FILE = RAW_DIR / "imf_commodity_prices_clean.csv"
+
+@instrumented()
+def ingest_imf():
+    source = cache.get_file(IMF_FILE)
+    if source.not_modified and OUT_FILE.exists():
+        print(f"⏭  {IMF_FILE} unchanged — keeping {OUT_FILE}")
+        return None
+
+    # The preview reads 10 lines; the parser streams the file itself (no full-text copy)
+    print("Preview of raw file (first 10 lines):")
+    with open(source.path, encoding="ISO-8859-1") as f:
+        for l in islice(f, 10):
+            print(l.strip())
+
+    # Try flexible CSV reading (handles inconsistent delimiters)
+    try:
+        df = pd.read_csv(source.path, encoding="ISO-8859-1", on_bad_lines="skip")
+    except Exception:
+        df = pd.read_csv(source.path, encoding="ISO-8859-1", sep=";", on_bad_lines="skip")
+
+    # Drop empty columns
+    df = df.dropna(axis=1, how="all")
+
+    # Drop empty rows
+    df = df.dropna(how="all")
+
+    # Save cleaned version
+    df.to_csv(OUT_FILE, index=False)
+    print(f"\n✅ Cleaned IMF data saved → {OUT_FILE}")
+    print(df.head())
+    return df
+
+if __name__ == "__main__":
+    ingest_imf()
@@ -1,20 +1,30 @@
-import requests
-import pandas as pd
-from pathlib import Path
-
-OUT_DIR = Path("data/raw")
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-RAW_DIR = Path("data/raw")
-
-OECD_FILE = Path("infra/data_sources/oecd_wages.csv")  # local file
-
-def ingest_oecd():
-    df = pd.read_csv(OECD_FILE)
-    print(df.head())
-    out_file = RAW_DIR/"oecd_wages.csv"
-    df.to_csv(out_file, index=False)
-    print(f"✅ Saved OECD wage data → {out_file}")
-
-if __name__ == "__main__":
-    ingest_oecd()
-
+import requests
+import pandas as pd
+from pathlib import Path
+
+from src.ingestion.http_cache import cache
+from src.utils.instrumentation import instrumented
+
+OUT_DIR = Path("data/raw")
+OUT_DIR.mkdir(parents=True, exist_ok=True)
+RAW_DIR = Path("data/raw")
+
+OECD_FILE = Path("infra/data_sources/oecd_wages.csv")  # local file
+
+@instrumented()
+def ingest_oecd():
+    out_file = RAW_DIR/"oecd_wages.csv"
+    source = cache.get_file(OECD_FILE)
+    if source.not_modified and out_file.exists():
+        print(f"⏭  {OECD_FILE} unchanged — keeping {out_file}")
+        return None
+
+    df = pd.read_csv(source.path)
+    print(df.head())
+    df.to_csv(out_file, index=False)
+    print(f"✅ Saved OECD wage data → {out_file}")
+    return df
+
+if __name__ == "__main__":
+    ingest_oecd()
+
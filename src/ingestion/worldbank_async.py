@@ -0,0 +1,334 @@
+"""
+WORLD BANK INGESTION - CONCURRENT, MULTI-INDICATOR
+--------------------------------------------------
+
+- Fetches every configured indicator and ALL of its pages concurrently
+  (page 1 first for the pagination metadata, then pages 2..N in parallel)
+- Bounded concurrency (one semaphore shared by every request)
+- Retries with exponential backoff on timeouts, 429 and 5xx
+- Streams the pages to disk in page order (tmp file → atomic rename)
+- Every page goes through the on-disk HTTP cache (src/ingestion/http_cache.py):
+  conditional refetch, and a 304 on page 1 skips the indicator without
+  parsing anything; HTTP_CACHE_MODE=offline replays the cached pages
+
+Incremental by default: a per-indicator watermark (last year, API lastupdated,
+last full sync) lives in data/raw/.worldbank_watermarks.json
+- nightly runs request only date=<last_year - LOOKBACK + 1>:<current year>
+- an unchanged `lastupdated` stamp → nothing is rewritten
+- the delta is merged into the raw CSV, last write wins on (country_code, year);
+  values withdrawn by the API inside the window are dropped
+- full resync on first run, with --full, or every FULL_RESYNC_DAYS days
+
+Point WORLDBANK_API_URL at a local stand-in server to run it without network.
+
+Usage: python -m src.ingestion.worldbank_async [INDICATOR_CODE ...] [--full]
+
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+from datetime import datetime, timezone
+
+import aiohttp
+import pandas as pd
+
+from src.ingestion.http_cache import cache
+from src.utils.instrumentation import stage
+
+BASE_URL = os.getenv("WORLDBANK_API_URL", "http://api.worldbank.org/v2")
+RAW_DIR = "data/raw"
+
+# World Bank indicator code → column name in the raw file
+INDICATORS = {
+    "FP.CPI.TOTL.ZG": "inflation_rate",
+    "NY.GDP.PCAP.CD": "gdp_per_capita",
+    "SL.UEM.TOTL.ZS": "unemployment_rate",
+}
+
+# Keep the historical file name for inflation; others are worldbank_<column>.csv
+RAW_FILES = {"inflation_rate": "worldbank_inflation.csv"}
+
+PER_PAGE = int(os.getenv("WORLDBANK_PER_PAGE", "1000"))
+MAX_CONCURRENCY = int(os.getenv("WORLDBANK_CONCURRENCY", "8"))
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 60
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+WATERMARK_PATH = os.getenv("WORLDBANK_WATERMARK_PATH", os.path.join(RAW_DIR, ".worldbank_watermarks.json"))
+LOOKBACK_YEARS = int(os.getenv("WORLDBANK_LOOKBACK_YEARS", "2"))
+FULL_RESYNC_DAYS = int(os.getenv("WORLDBANK_FULL_RESYNC_DAYS", "30"))
+
+KEY_COLUMNS = ["country_code", "year"]
+
+
+def raw_file(column, raw_dir=RAW_DIR):
+    return os.path.join(raw_dir, RAW_FILES.get(column, f"worldbank_{column}.csv"))
+
+# -------------------------------------------------------------------------------------
+# HTTP
+# -------------------------------------------------------------------------------------
+
+class RetryableError(Exception):
+    pass
+
+
+async def fetch_page(session, semaphore, url, params):
+    """GET one page through the HTTP cache, retrying transient failures with exponential backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with semaphore:
+                response = await cache.aget(session, url, params)
+            if response.status in RETRY_STATUSES:
+                raise RetryableError(f"HTTP {response.status}")
+            if response.status >= 400:
+                raise ValueError(f"HTTP {response.status} from {url}")
+            return response
+
+        except (RetryableError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random())
+            print(f"   ↻ {url} page {params.get('page')}: {e} — retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+# -------------------------------------------------------------------------------------
+# Indicator download
+# -------------------------------------------------------------------------------------
+
+def _records(records):
+    # (country_code, country, year, value or None)
+    for r in records or []:
+        value = r.get("value")
+        yield (r["country"]["id"], r["country"]["value"], int(r["date"]),
+               None if value is None else float(value))
+
+
+def _rows(records):
+    # Same shape as the original ingestion: country_code, country, year, <column>
+    return (r for r in _records(records) if r[3] is not None)
+
+
+async def fetch_first_page(session, semaphore, code, base_url=BASE_URL, date_range=None):
+    """Page 1 response for an indicator and optional year window (not parsed yet:
+    a 304 means the indicator is unchanged and the caller may skip it)."""
+    url = f"{base_url}/country/all/indicator/{code}"
+    params = {"format": "json", "per_page": PER_PAGE}
+    if date_range:
+        params["date"] = f"{date_range[0]}:{date_range[1]}"
+
+    response = await fetch_page(session, semaphore, url, {**params, "page": 1})
+    return url, params, response
+
+
+def first_payload(response, code):
+    """Parsed page 1: [pagination / lastupdated metadata, records]."""
+    first = response.json()
+    if not isinstance(first, list) or not first or not isinstance(first[0], dict):
+        raise ValueError(f"Unexpected World Bank response for {code}: {first}")
+    return first
+
+
+async def iter_remaining_pages(session, semaphore, url, params, pages):
+    """Pages 2..N fetched concurrently, yielded in page order (a page that lands
+    early waits for the ones before it), so the output file is deterministic."""
+    tasks = [
+        asyncio.ensure_future(fetch_page(session, semaphore, url, {**params, "page": page}))
+        for page in range(2, pages + 1)
+    ]
+    try:
+        for task in tasks:
+            payload = (await task).json()
+            yield payload[1] if len(payload) > 1 else []
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_indicator(session, semaphore, code, column, base_url=BASE_URL, raw_dir=RAW_DIR):
+    """Full history → raw CSV (streamed). Returns (records written, watermark metadata)."""
+    url, params, response = await fetch_first_page(session, semaphore, code, base_url)
+    first = first_payload(response, code)
+
+    out_path = raw_file(column, raw_dir)
+    if response.not_modified and os.path.exists(out_path):
+        # Same payload as the cached fetch → the raw CSV already holds it
+        print(f"⏭  {code}: 304 Not Modified — keeping {out_path}")
+        years = pd.read_csv(out_path, usecols=["year"])["year"]
+        return 0, {"last_year": int(years.max()) if len(years) else None,
+                   "last_updated": first[0].get("lastupdated")}
+
+    pages = int(first[0].get("pages", 1))
+
+    tmp_path = out_path + ".tmp"
+    os.makedirs(raw_dir, exist_ok=True)
+
+    written = 0
+    last_year = None
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["country_code", "country", "year", column])
+
+        def write(records):
+            nonlocal written, last_year
+            rows = list(_rows(records))
+            writer.writerows(rows)
+            written += len(rows)
+            last_year = max([r[2] for r in rows] + ([last_year] if last_year else []), default=None)
+
+        write(first[1] if len(first) > 1 else [])
+
+        # Remaining pages concurrently; written in page order as soon as the previous one is
+        async for records in iter_remaining_pages(session, semaphore, url, params, pages):
+            write(records)
+
+    os.replace(tmp_path, out_path)
+    print(f"✅ {code} → {out_path} ({pages} pages, {written:,} records)")
+    return written, {"last_year": last_year, "last_updated": first[0].get("lastupdated")}
+
+# -------------------------------------------------------------------------------------
+# Incremental (watermark) mode
+# -------------------------------------------------------------------------------------
+
+def load_watermarks(path=WATERMARK_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_watermarks(watermarks, path=WATERMARK_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def needs_full_sync(watermark, out_path, now=None):
+    if not watermark or watermark.get("last_year") is None or not os.path.exists(out_path):
+        return True
+    now = now or datetime.now(timezone.utc)
+    last_full = datetime.fromisoformat(watermark["last_full_sync"])
+    return (now - last_full).days >= FULL_RESYNC_DAYS
+
+
+def merge_delta(existing, delta, column):
+    """Last write wins on (country_code, year); existing row order is kept, new keys appended."""
+    existing = existing.set_index(KEY_COLUMNS)
+    delta = delta.set_index(KEY_COLUMNS)
+
+    # Withdrawn values inside the requested window disappear from the raw store
+    withdrawn = delta.index[delta[column].isna()]
+    existing = existing.drop(index=withdrawn.intersection(existing.index))
+    delta = delta.dropna(subset=[column])
+
+    overlap = delta.index.isin(existing.index)
+    existing.loc[delta.index[overlap], delta.columns] = delta[overlap]
+
+    merged = pd.concat([existing, delta[~overlap]]).reset_index()
+    return merged[["country_code", "country", "year", column]]
+
+
+async def fetch_delta(session, semaphore, code, column, watermark, base_url=BASE_URL, raw_dir=RAW_DIR):
+    """Fetch only the recent year window and merge it into the raw CSV."""
+    start_year = int(watermark["last_year"]) - LOOKBACK_YEARS + 1
+    end_year = max(datetime.now(timezone.utc).year, int(watermark["last_year"]))
+
+    url, params, response = await fetch_first_page(session, semaphore, code, base_url, (start_year, end_year))
+    if response.not_modified:
+        print(f"⏭  {code}: 304 Not Modified — nothing to merge")
+        return 0, {"last_year": watermark["last_year"], "last_updated": watermark.get("last_updated")}
+
+    first = first_payload(response, code)
+    last_updated = first[0].get("lastupdated")
+
+    if last_updated and last_updated == watermark.get("last_updated"):
+        print(f"⏭  {code}: unchanged since {last_updated} — nothing to merge")
+        return 0, {"last_year": watermark["last_year"], "last_updated": last_updated}
+
+    records = list(_records(first[1] if len(first) > 1 else []))
+    async for page in iter_remaining_pages(session, semaphore, url, params, int(first[0].get("pages", 1))):
+        records.extend(_records(page))
+
+    delta = pd.DataFrame(records, columns=["country_code", "country", "year", column])
+    out_path = raw_file(column, raw_dir)
+    existing = pd.read_csv(out_path, dtype={"country_code": str, "country": str})
+
+    merged = merge_delta(existing, delta, column)
+    tmp_path = out_path + ".tmp"
+    merged.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+
+    years = delta.dropna(subset=[column])["year"]
+    last_year = max(int(watermark["last_year"]), int(years.max()) if len(years) else 0)
+    print(f"✅ {code} → {out_path} (window {start_year}-{end_year}: {len(delta):,} records fetched, "
+          f"{len(merged):,} rows stored)")
+    return len(delta), {"last_year": last_year, "last_updated": last_updated}
+
+
+async def sync_indicator(session, semaphore, code, column, watermarks, full=False,
+                         base_url=BASE_URL, raw_dir=RAW_DIR):
+    """Full or incremental fetch depending on the watermark; updates watermarks[code]."""
+    watermark = watermarks.get(code)
+    now = datetime.now(timezone.utc)
+    full = full or needs_full_sync(watermark, raw_file(column, raw_dir), now)
+
+    if full:
+        written, meta = await fetch_indicator(session, semaphore, code, column, base_url, raw_dir)
+        watermarks[code] = {**meta, "column": column, "mode": "full",
+                            "last_full_sync": now.isoformat(), "last_run": now.isoformat()}
+    else:
+        written, meta = await fetch_delta(session, semaphore, code, column, watermark, base_url, raw_dir)
+        watermarks[code] = {**watermark, **meta, "mode": "incremental", "last_run": now.isoformat()}
+    return written
+
+
+async def ingest(indicators=None, base_url=BASE_URL, raw_dir=RAW_DIR, concurrency=MAX_CONCURRENCY,
+                 full=False, watermark_path=WATERMARK_PATH):
+    """Sync every indicator concurrently. Returns {code: records fetched or exception}."""
+    indicators = INDICATORS if indicators is None else indicators
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
+    watermarks = load_watermarks(watermark_path)
+
+    print(f"🌍 Fetching {len(indicators)} World Bank indicators (concurrency={concurrency})...")
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        results = await asyncio.gather(
+            *[sync_indicator(session, semaphore, code, column, watermarks, full, base_url, raw_dir)
+              for code, column in indicators.items()],
+            return_exceptions=True,
+        )
+
+    # Failed indicators keep their previous watermark
+    save_watermarks(watermarks, watermark_path)
+
+    summary = dict(zip(indicators, results))
+    for code, result in summary.items():
+        if isinstance(result, Exception):
+            print(f"❌ Error fetching {code}: {result}")
+    return summary
+
+
+def main(codes=None, full=False):
+    indicators = INDICATORS if not codes else {c: INDICATORS.get(c, c.lower().replace(".", "_")) for c in codes}
+
+    with stage("worldbank_ingest", indicators=len(indicators), full=full) as metrics:
+        summary = asyncio.run(ingest(indicators, full=full))
+        metrics.rows_out = sum(r for r in summary.values() if isinstance(r, int))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent World Bank ingestion")
+    parser.add_argument("codes", nargs="*", help="indicator codes (default: all configured)")
+    parser.add_argument("--full", action="store_true", help="full resync, ignoring the watermarks")
+    args = parser.parse_args()
+    main(args.codes, full=args.full)
@@ -0,0 +1,134 @@
+"""
+REFRESH SERVICE - SCHEDULED INGEST → CLEAN → LOAD
+-------------------------------------------------
+
+Long-running process that keeps the database fresh without running the
+scripts by hand:
+- APScheduler runs the pipeline DAG (src/pipeline/runner.py), World Bank
+  ingestion included, on a cron schedule or a fixed interval
+- a file lock (data/.refresh.lock) makes overlapping runs — a slow refresh,
+  a second daemon, a manual --once — skip instead of racing each other
+- the DB load goes through a staging table swapped in by one transaction
+  (load_to_db "swap" mode): readers never see a half-loaded macro_data and
+  never wait on the bulk inserts
+- the swap bumps the data version → query / Streamlit caches and the
+  dashboard snapshot are refreshed
+- runs niced, with a small process pool, so the dashboard stays responsive
+
+Usage: python -m src.pipeline.refresh_service [--once] [--now] [--cron "0 3 * * *"]
+                                              [--interval-hours 24] [--workers N] [--eda]
+
+"""
+
+import argparse
+import os
+import signal
+import time
+from datetime import datetime, timezone
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from filelock import FileLock, Timeout
+
+from src.pipeline.runner import build_stages, run
+
+# Crontab expression (UTC) wins over the interval when set, e.g. "0 3 * * *"
+REFRESH_CRON = os.getenv("REFRESH_CRON")
+REFRESH_INTERVAL_HOURS = float(os.getenv("REFRESH_INTERVAL_HOURS", "24"))
+
+REFRESH_LOCK_PATH = os.getenv("REFRESH_LOCK_PATH", "data/.refresh.lock")
+
+# Keep the refresh in the background: few workers, lower CPU priority
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "2"))
+REFRESH_NICE = int(os.getenv("REFRESH_NICE", "10"))
+
+REFRESH_WITH_EDA = os.getenv("REFRESH_WITH_EDA", "false").lower() in ("1", "true", "yes")
+
+# -------------------------------------------------------------------------------------
+# One refresh
+# -------------------------------------------------------------------------------------
+
+def refresh_once(lock_path=REFRESH_LOCK_PATH, workers=REFRESH_WORKERS, with_eda=REFRESH_WITH_EDA):
+    """Ingest → clean → load once; returns the stage status, or None if a refresh is already running."""
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    lock = FileLock(lock_path)
+
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        print("⏳ Another refresh holds the lock — skipped")
+        return None
+
+    try:
+        started = time.perf_counter()
+        print(f"\n🔄 Refresh started at {datetime.now(timezone.utc).isoformat(timespec='seconds')}")
+
+        stages = build_stages(with_ingest=True, with_db=True, with_eda=with_eda, load_mode="swap")
+        status = run(stages, workers=workers)
+
+        failed = [n for n, s in status.items() if s in ("failed", "blocked")]
+        elapsed = time.perf_counter() - started
+        if failed:
+            print(f"⚠️ Refresh finished in {elapsed:.1f}s with failures: {failed}")
+        else:
+            print(f"✅ Refresh finished in {elapsed:.1f}s")
+        return status
+
+    finally:
+        lock.release()
+
+# -------------------------------------------------------------------------------------
+# Scheduler
+# -------------------------------------------------------------------------------------
+
+def build_scheduler(cron=REFRESH_CRON, interval_hours=REFRESH_INTERVAL_HOURS, run_now=False, **refresh_kwargs):
+    scheduler = BlockingScheduler(timezone="UTC")
+    if cron:
+        trigger = CronTrigger.from_crontab(cron, timezone="UTC")
+    else:
+        trigger = IntervalTrigger(hours=interval_hours)
+
+    job_options = {}
+    if run_now:
+        job_options["next_run_time"] = datetime.now(timezone.utc)
+
+    # max_instances=1 + coalesce: a refresh that overruns its slot is never stacked
+    scheduler.add_job(refresh_once, trigger, kwargs=refresh_kwargs, id="refresh", name="refresh",
+                      max_instances=1, coalesce=True, misfire_grace_time=3600, **job_options)
+    return scheduler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scheduled ingest → clean → load refresh")
+    parser.add_argument("--once", action="store_true", help="run one refresh and exit")
+    parser.add_argument("--now", action="store_true", help="also refresh right away when the daemon starts")
+    parser.add_argument("--cron", default=REFRESH_CRON, help="crontab schedule (UTC)")
+    parser.add_argument("--interval-hours", type=float, default=REFRESH_INTERVAL_HOURS)
+    parser.add_argument("--workers", type=int, default=REFRESH_WORKERS, help="process pool size")
+    parser.add_argument("--eda", action="store_true", default=REFRESH_WITH_EDA, help="also re-render the EDA figures")
+    args = parser.parse_args(argv)
+
+    if REFRESH_NICE and hasattr(os, "nice"):
+        os.nice(REFRESH_NICE)
+
+    if args.once:
+        status = refresh_once(workers=args.workers, with_eda=args.eda)
+        return 1 if status is None or any(s in ("failed", "blocked") for s in status.values()) else 0
+
+    scheduler = build_scheduler(args.cron, args.interval_hours, run_now=args.now,
+                                workers=args.workers, with_eda=args.eda)
+    schedule = f"cron '{args.cron}' (UTC)" if args.cron else f"every {args.interval_hours:g}h"
+    print(f"⏰ Refresh service started — {schedule}; lock {REFRESH_LOCK_PATH}")
+
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.shutdown(wait=False))
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    print("👋 Refresh service stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,375 @@
+"""
+PIPELINE RUNNER - CONTENT-HASHED DAG
+------------------------------------
+
+Declares the ETL chain as stages with file inputs / outputs:
+
+    [worldbank_ingest] ─┐
+                        ├─ clean_inflation ─┐
+                        ├─ clean_<extra>  ──┤
+    oecd_wages.csv ───── clean_wages ───────┼─ merge ─┬─ load_db
+    imf_commodity_price.csv ─ imf_rollups ──┘         ├─ derived
+                                                      ├─ range_index
+                                                      └─ eda
+
+- A stage is skipped when the content hash of its inputs and of its code
+  (every src module its function imports, followed transitively) matches
+  the last successful run and its outputs still exist
+- Independent stages run in parallel in a process pool
+- State lives in data/.pipeline_state.json
+
+Only-IMF-changed refresh → imf_rollups, then merge, load_db, derived, range_index, eda re-run;
+the clean_* stages are skipped.
+
+Usage: python -m src.pipeline.runner [--force] [--only STAGE ...] [--workers N]
+                                     [--with-ingest] [--no-db] [--no-eda] [--dry-run]
+
+"""
+
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import textwrap
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+
+from src.utils.instrumentation import stage as instrumented_stage
+
+RAW_DIR = "data/raw"
+INTERIM_DIR = "data/interim"
+PROCESSED_DIR = "data/processed"
+STATE_PATH = os.getenv("PIPELINE_STATE_PATH", "data/.pipeline_state.json")
+
+HASH_BLOCK = 1 << 20
+
+# Repository root: `src.x.y` → <root>/src/x/y.py
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# -------------------------------------------------------------------------------------
+# Stage functions (module level → picklable for the process pool)
+# -------------------------------------------------------------------------------------
+
+def run_worldbank_ingest():
+    from src.ingestion import worldbank_async
+    worldbank_async.main()
+
+
+def run_clean_source(name):
+    from src.processing.stream_clean import stream_clean_source
+    stream_clean_source(name)
+
+
+def run_imf_rollups():
+    from src.processing.stream_clean import build_imf_rollups
+    build_imf_rollups()
+
+
+def run_merge(extra_names):
+    from src.processing.stream_clean import merge_cleaned
+    merge_cleaned(list(extra_names))
+
+
+def run_derived():
+    from src.analysis.derived import build_derived
+    build_derived()
+
+
+def run_range_index():
+    from src.analysis.range_index import build_range_index
+    build_range_index()
+
+
+def run_load_db(mode="incremental"):
+    from src.db import load_to_db
+    load_to_db.main(mode)
+
+
+def run_eda():
+    import matplotlib
+    matplotlib.use("Agg")
+    from src.analysis.eda import run_eda as eda
+    eda()
+
+# -------------------------------------------------------------------------------------
+# Stage declaration
+# -------------------------------------------------------------------------------------
+
+class Stage:
+    def __init__(self, name, func, args=(), inputs=(), outputs=(), deps=(), volatile=False):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        # Reads an external source (API) → its inputs can't be hashed, always run it
+        self.volatile = volatile
+
+    def __repr__(self):
+        return f"Stage({self.name})"
+
+
+def build_stages(with_ingest=False, with_db=True, with_eda=True, load_mode="incremental"):
+    from src.processing.stream_clean import SOURCES, available_sources
+    from src.processing.clean_and_merge import EXTRA_INDICATORS
+
+    stages = []
+    ingest_deps = []
+    if with_ingest:
+        stages.append(Stage("worldbank_ingest", run_worldbank_ingest,
+                            outputs=[os.path.join(RAW_DIR, "worldbank_inflation.csv")], volatile=True))
+        ingest_deps = ["worldbank_ingest"]
+
+    sources = available_sources()
+    clean_names = []
+    for name in sources:
+        source_stage = Stage(
+            f"clean_{name}", run_clean_source, args=[name],
+            inputs=[os.path.join(RAW_DIR, SOURCES[name]["file"])],
+            outputs=[os.path.join(INTERIM_DIR, name)],
+            deps=ingest_deps if name != "wages" else [],
+        )
+        stages.append(source_stage)
+        clean_names.append(source_stage.name)
+
+    rollup_outputs = [os.path.join(PROCESSED_DIR, f"commodity_{r}.parquet") for r in ("annual", "quarterly", "monthly")]
+    stages.append(Stage("imf_rollups", run_imf_rollups,
+                        inputs=[os.path.join(RAW_DIR, "imf_commodity_price.csv")],
+                        outputs=rollup_outputs))
+
+    extra_names = [name for name in sources if name in EXTRA_INDICATORS]
+    processed = os.path.join(PROCESSED_DIR, "macro_data")
+    stages.append(Stage(
+        "merge", run_merge, args=[tuple(extra_names)],
+        inputs=[os.path.join(INTERIM_DIR, name) for name in sources] + [rollup_outputs[0]],
+        outputs=[os.path.join(PROCESSED_DIR, "cleaned_global_data.csv"), processed],
+        deps=clean_names + ["imf_rollups"],
+    ))
+
+    if with_db:
+        # The monthly commodity table is loaded into commodity_prices alongside macro_data
+        stages.append(Stage("load_db", run_load_db, args=[load_mode], inputs=[processed, rollup_outputs[2]],
+                            deps=["merge"]))
+    from src.analysis.derived import CORRELATIONS_PATH, DERIVED_PATH
+    stages.append(Stage("derived", run_derived, inputs=[processed],
+                        outputs=[DERIVED_PATH, CORRELATIONS_PATH], deps=["merge"]))
+    from src.analysis.range_index import RANGE_INDEX_PATH
+    stages.append(Stage("range_index", run_range_index, inputs=[processed], outputs=[RANGE_INDEX_PATH],
+                        deps=["merge"]))
+
+    if with_eda:
+        stages.append(Stage("eda", run_eda, inputs=[processed], outputs=["reports/figures"], deps=["merge"]))
+
+    return stages
+
+# -------------------------------------------------------------------------------------
+# Content hashing + state
+# -------------------------------------------------------------------------------------
+
+def _hash_file(h, path):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+
+
+def _module_file(name):
+    base = os.path.join(ROOT_DIR, *name.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _src_imports(source):
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            # `from src.ingestion import worldbank_async` may name a module too
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+        elif isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+    return {name for name in names if name == "src" or name.startswith("src.")}
+
+
+def code_files(func):
+    """Source files of every src module the stage function reaches (parsed, not imported)."""
+    pending = _src_imports(textwrap.dedent(inspect.getsource(func)))
+    seen, files = set(), set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = _module_file(name)
+        if path is None or path in files:
+            continue
+        files.add(path)
+        with open(path, encoding="utf-8") as f:
+            pending |= _src_imports(f.read())
+    return sorted(files)
+
+
+def stage_hash(stage):
+    """sha256 over the stage code (wrapper + the modules doing the work), its arguments
+    and the content of every input."""
+    h = hashlib.sha256()
+    h.update(stage.name.encode())
+    h.update(repr(stage.args).encode())
+    try:
+        h.update(inspect.getsource(stage.func).encode())
+        for path in code_files(stage.func):
+            h.update(os.path.relpath(path, ROOT_DIR).encode())
+            _hash_file(h, path)
+    except (OSError, TypeError):
+        h.update(stage.func.__qualname__.encode())
+
+    for path in sorted(stage.inputs):
+        h.update(path.encode())
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    h.update(os.path.relpath(file_path, path).encode())
+                    _hash_file(h, file_path)
+        elif os.path.exists(path):
+            _hash_file(h, path)
+        else:
+            h.update(b"<missing>")
+
+    return h.hexdigest()
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(stage, digest, state):
+    if stage.volatile:
+        return False
+    previous = state.get(stage.name)
+    if not previous or previous.get("input_hash") != digest:
+        return False
+    return all(os.path.exists(path) for path in stage.outputs)
+
+# -------------------------------------------------------------------------------------
+# Execution
+# -------------------------------------------------------------------------------------
+
+def _execute(stage):
+    # Runs in a worker process
+    started = time.perf_counter()
+    with instrumented_stage(f"pipeline_{stage.name}"):
+        stage.func(*stage.args)
+    return time.perf_counter() - started
+
+
+def run(stages, force=False, only=None, workers=None, dry_run=False):
+    """Run the DAG; returns {stage: "ran" | "skipped" | "failed" | "blocked"}."""
+    by_name = {s.name: s for s in stages}
+    state = load_state()
+    status = {}
+
+    pending = dict(by_name)
+    running = {}
+    workers = workers or min(len(stages), os.cpu_count() or 1)
+
+    def ready(s):
+        return all(status.get(d) in ("ran", "skipped") for d in s.deps if d in by_name)
+
+    def blocked(s):
+        return any(status.get(d) in ("failed", "blocked") for d in s.deps if d in by_name)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            # Schedule every stage whose dependencies are done
+            for name, s in list(pending.items()):
+                if blocked(s):
+                    status[name] = "blocked"
+                    print(f"⛔ {name}: blocked by a failed dependency")
+                    del pending[name]
+                    continue
+                if not ready(s):
+                    continue
+
+                digest = stage_hash(s)
+                selected = only is None or name in only
+                if not selected or (not force and is_fresh(s, digest, state)):
+                    status[name] = "skipped"
+                    print(f"⏭  {name}: inputs unchanged — skipped")
+                elif dry_run:
+                    status[name] = "skipped"
+                    print(f"📝 {name}: would run")
+                else:
+                    print(f"▶️  {name}: running")
+                    running[pool.submit(_execute, s)] = (s, digest)
+                del pending[name]
+
+            if not running:
+                if pending and not any(ready(s) or blocked(s) for s in pending.values()):
+                    raise RuntimeError(f"Unresolvable dependencies: {list(pending)}")
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                s, digest = running.pop(future)
+                try:
+                    duration = future.result()
+                except Exception as e:
+                    status[s.name] = "failed"
+                    print(f"❌ {s.name} failed: {e}")
+                    continue
+
+                status[s.name] = "ran"
+                # Output content is hashed by the dependants; here we only record the inputs
+                state[s.name] = {
+                    "input_hash": digest,
+                    "finished_at": datetime.now(timezone.utc).isoformat(),
+                    "duration_s": round(duration, 3),
+                }
+                save_state(state)
+                print(f"✅ {s.name}: done in {duration:.2f}s")
+
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline as a cached DAG")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and run every stage")
+    parser.add_argument("--only", nargs="+", help="run only these stages (others may be skipped)")
+    parser.add_argument("--workers", type=int, help="process pool size")
+    parser.add_argument("--with-ingest", action="store_true", help="include World Bank ingestion")
+    parser.add_argument("--no-db", action="store_true", help="skip the database load")
+    parser.add_argument("--no-eda", action="store_true", help="skip the EDA figures")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run")
+    args = parser.parse_args(argv)
+
+    stages = build_stages(args.with_ingest, not args.no_db, not args.no_eda)
+    status = run(stages, force=args.force, only=args.only, workers=args.workers, dry_run=args.dry_run)
+
+    ran = [n for n, s in status.items() if s == "ran"]
+    failed = [n for n, s in status.items() if s in ("failed", "blocked")]
+    print(f"\n🎉 Pipeline finished: {len(ran)} ran, "
+          f"{sum(s == 'skipped' for s in status.values())} skipped, {len(failed)} failed/blocked")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,194 +1,289 @@
-"""
-PHASE 3 - CLEAN AND MERGE ECONOMIC DATA
----------------------------------------
-
-This script:
-- Loads raw data (World Bank, IMF, OECD)
-- Cleans column formats
-- Converts country names to ISO3
-- Standardizes numeric formats
-- Normalizes date formats
-- Merges datasets
-- Saves cleaned output to data/processed/
-
-"""
-
-import pandas as pd
-import pycountry
-import os
-
-RAW_DIR = "data/raw/"
-PROCESSED_DIR = "data/processed/"
-
-# -------------------------------------------------------------------------------------
-# Helper: Convert country names → ISO3
-# -------------------------------------------------------------------------------------
-
-def to_iso3(country_name):
-    if pd.isna(country_name):
-        return None
-    try:
-        return pycountry.countries.lookup(country_name).alpha_3
-    except:
-        return None
-
-# -------------------------------------------------------------------------------------
-# Load Raw Data
-# -------------------------------------------------------------------------------------
-
-def load_data():
-    inflation_path = os.path.join(RAW_DIR, "worldbank_inflation.csv")
-    imf_path = os.path.join(RAW_DIR, "imf_commodity_price.csv")
-    oecd_path = os.path.join(RAW_DIR, "oecd_wages.csv")
-
-    print("📥 Loading raw data...")
-
-    inflation = pd.read_csv(inflation_path)
-    imf = pd.read_csv(imf_path)
-    wages = pd.read_csv(oecd_path)
-
-    print("✔ Loaded World Bank Inflation:", inflation.shape)
-    print("✔ Loaded IMF Commodities:    ", imf.shape)
-    print("✔ Loaded OECD Wages:         ", wages.shape)
-
-    return inflation, imf, wages
-
-# -------------------------------------------------------------------------------------
-# Clean World Bank Inflation
-# -------------------------------------------------------------------------------------
-
-def clean_inflation(df):
-    print("🔧 Cleaning World Bank dataset...")
-
-    # Expected columns: country, year, inflation_rate
-    df.rename(columns={
-        "country": "country",
-        "year": "year",
-        "inflation_rate": "inflation_rate"
-    }, inplace=True)
-
-    # Convert "7.4%" → 7.4
-    df["inflation_rate"] = (
-        df["inflation_rate"]
-        .astype(str)
-        .str.replace("%", "", regex=False)
-        .str.replace(",", "", regex=False)
-    )
-
-    df["inflation_rate"] = pd.to_numeric(df["inflation_rate"], errors="coerce")
-
-    # Convert year to datetime
-    df["date"] = pd.to_datetime(df["year"].astype(str) + "-01-01", errors="coerce")
-
-    # Convert country to ISO3
-    df["iso3"] = df["country"].apply(to_iso3)
-
-    return df[["iso3", "date", "inflation_rate"]]
-
-# -------------------------------------------------------------------------------------
-# Clean IMF Commodity Data (GLOBAL — no country column)
-# -------------------------------------------------------------------------------------
-
-def clean_imf(df):
-    print("🔧 Cleaning IMF dataset...")
-
-    # Rename Date column only
-    df.rename(columns={"Date": "date"}, inplace=True)
-
-    # IMF file DOES NOT contain country or price columns
-    # Select one global index → All Commodity Price Index
-    if "All Commodity Price Index" not in df.columns:
-        raise KeyError("Missing 'All Commodity Price Index' column in IMF data.")
-
-    df["commodity_price"] = pd.to_numeric(
-        df["All Commodity Price Index"]
-        .astype(str)
-        .str.replace(r"[^0-9.]", "", regex=True),
-        errors="coerce"
-    )
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    # Global dataset — no ISO
-    df["iso3"] = None
-
-    return df[["iso3", "date", "commodity_price"]]
-
-# -------------------------------------------------------------------------------------
-# Clean OECD Wages
-# -------------------------------------------------------------------------------------
-
-def clean_wages(df):
-    print("🔧 Cleaning OECD wages dataset...")
-
-    # Rename relevant columns
-    df.rename(columns={
-        "REF_AREA": "country",
-        "TIME_PERIOD": "year",
-        "OBS_VALUE": "wage_index"
-    }, inplace=True)
-
-    # Convert wage index to numeric
-    df["wage_index"] = pd.to_numeric(
-        df["wage_index"].astype(str).str.replace(r"[^0-9.]", "", regex=True),
-        errors="coerce"
-    )
-
-    # Convert year → datetime
-    df["date"] = pd.to_datetime(df["year"].astype(str) + "-01-01", errors="coerce")
-
-    # Convert country → ISO3
-    df["iso3"] = df["country"].apply(to_iso3)
-
-    return df[["iso3", "date", "wage_index"]]
-
-
-# -------------------------------------------------------------------------------------
-# Merge All Datasets
-# -------------------------------------------------------------------------------------
-
-def merge_data(inflation, imf, wages):
-    print("🔗 Merging datasets...")
-
-    # Merge inflation + wages by country
-    merged = inflation.merge(wages, on=["iso3", "date"], how="left")
-
-    # Merge IMF GLOBAL dataset by date only
-    merged = merged.merge(imf[["date", "commodity_price"]], on="date", how="left")
-
-    merged = merged.drop_duplicates()
-
-    # Keep countries with enough observations
-    merged = merged.groupby("iso3").filter(lambda x: len(x) > 3)
-
-    return merged
-
-# -------------------------------------------------------------------------------------
-# Main Execution
-# -------------------------------------------------------------------------------------
-
-def main():
-    if not os.path.exists(PROCESSED_DIR):
-        os.makedirs(PROCESSED_DIR)
-
-    inflation, imf, wages = load_data()
-
-    inflation_clean = clean_inflation(inflation)
-    imf_clean = clean_imf(imf)
-    wages_clean = clean_wages(wages)
-
-    merged = merge_data(inflation_clean, imf_clean, wages_clean)
-
-    output_path = os.path.join(PROCESSED_DIR, "cleaned_global_data.csv")
-    merged.to_csv(output_path, index=False)
-
-    print("\n🎉 DONE! Cleaned dataset saved to:")
-    print(output_path)
-    print("\nFinal shape:", merged.shape)
-
-# -------------------------------------------------------------------------------------
-# Run Script
-# -------------------------------------------------------------------------------------
-
-if __name__ == "__main__":
-    main()
+"""
+PHASE 3 - CLEAN AND MERGE ECONOMIC DATA
+---------------------------------------
+
+This script:
+- Loads raw data (World Bank, IMF, OECD)
+- Adds extra World Bank indicators (GDP per capita, ...) when they were ingested
+- Cleans column formats
+- Converts country names to ISO3
+- Standardizes numeric formats
+- Normalizes date formats
+- Rolls monthly IMF commodities up to annual / quarterly tables
+- Merges datasets on integer (iso3, year) keys (index-aligned, one row per key)
+- Saves cleaned output to data/processed/ (CSV + partitioned Parquet)
+- Derives real wages, YoY changes and correlations (src/analysis/derived.py)
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.processing.commodity_rollups import build_rollups, headline_annual
+from src.processing.country_codes import resolve_iso3
+from src.processing.parquet_store import PROCESSED_DATASET, write_processed
+from src.utils.instrumentation import instrumented
+from src.utils.schema import compact
+
+RAW_DIR = "data/raw/"
+PROCESSED_DIR = "data/processed/"
+
+# Extra World Bank indicators (src/ingestion/worldbank_async.py) — merged when present
+EXTRA_INDICATORS = {
+    "gdp_per_capita": "worldbank_gdp_per_capita.csv",
+    "unemployment_rate": "worldbank_unemployment_rate.csv",
+}
+
+# Countries need more than this many distinct years to be kept
+MIN_OBSERVATIONS = int(os.getenv("MERGE_MIN_OBSERVATIONS", "3"))
+
+# (iso3, year) merge key = iso3 code * YEAR_SPAN + year
+YEAR_SPAN = 10_000
+
+# -------------------------------------------------------------------------------------
+# Helper: Strip formatting characters → float
+# -------------------------------------------------------------------------------------
+
+def to_number(series, pattern):
+    # Already numeric (clean exports) → skip the string round-trip
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(
+        series.astype(str).str.replace(pattern, "", regex=True),
+        errors="coerce"
+    )
+
+# -------------------------------------------------------------------------------------
+# Load Raw Data
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def load_data():
+    inflation_path = os.path.join(RAW_DIR, "worldbank_inflation.csv")
+    imf_path = os.path.join(RAW_DIR, "imf_commodity_price.csv")
+    oecd_path = os.path.join(RAW_DIR, "oecd_wages.csv")
+
+    print("📥 Loading raw data...")
+
+    inflation = pd.read_csv(inflation_path)
+    imf = pd.read_csv(imf_path)
+    wages = pd.read_csv(oecd_path)
+
+    print("✔ Loaded World Bank Inflation:", inflation.shape)
+    print("✔ Loaded IMF Commodities:    ", imf.shape)
+    print("✔ Loaded OECD Wages:         ", wages.shape)
+
+    return inflation, imf, wages
+
+@instrumented()
+def load_extra_indicators():
+    extras = {}
+    for column, file_name in EXTRA_INDICATORS.items():
+        path = os.path.join(RAW_DIR, file_name)
+        if os.path.exists(path):
+            extras[column] = pd.read_csv(path)
+            print(f"✔ Loaded World Bank {column}:", extras[column].shape)
+    return extras
+
+# -------------------------------------------------------------------------------------
+# Clean World Bank Inflation
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def clean_inflation(df):
+    print("🔧 Cleaning World Bank dataset...")
+
+    # Expected columns: country, year, inflation_rate
+    df.rename(columns={
+        "country": "country",
+        "year": "year",
+        "inflation_rate": "inflation_rate"
+    }, inplace=True)
+
+    # Convert "7.4%" → 7.4
+    df["inflation_rate"] = to_number(df["inflation_rate"], r"[%,]")
+
+    # Convert year to datetime
+    df["date"] = pd.to_datetime(df["year"].astype(str) + "-01-01", errors="coerce")
+
+    # Convert country to ISO3
+    df["iso3"] = resolve_iso3(df["country"])
+
+    return compact(df[["iso3", "date", "inflation_rate"]].copy(), floats=False)
+
+# -------------------------------------------------------------------------------------
+# Clean other World Bank indicators (country_code, country, year, <column>)
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def clean_indicator(df, column):
+    print(f"🔧 Cleaning World Bank {column} dataset...")
+
+    # Same formatting rules as inflation: "1,234" → 1234, "7.4%" → 7.4
+    df[column] = to_number(df[column], r"[%,]")
+
+    # Convert year to datetime
+    df["date"] = pd.to_datetime(df["year"].astype(str) + "-01-01", errors="coerce")
+
+    # Convert country to ISO3
+    df["iso3"] = resolve_iso3(df["country"])
+
+    return compact(df[["iso3", "date", column]].copy(), floats=False)
+
+# -------------------------------------------------------------------------------------
+# Clean OECD Wages
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def clean_wages(df):
+    print("🔧 Cleaning OECD wages dataset...")
+
+    # Rename relevant columns
+    df.rename(columns={
+        "REF_AREA": "country",
+        "TIME_PERIOD": "year",
+        "OBS_VALUE": "wage_index"
+    }, inplace=True)
+
+    # Convert wage index to numeric
+    df["wage_index"] = to_number(df["wage_index"], r"[^0-9.]")
+
+    # Convert year → datetime
+    df["date"] = pd.to_datetime(df["year"].astype(str) + "-01-01", errors="coerce")
+
+    # Convert country → ISO3
+    df["iso3"] = resolve_iso3(df["country"])
+
+    return compact(df[["iso3", "date", "wage_index"]].copy(), floats=False)
+
+
+# -------------------------------------------------------------------------------------
+# Merge All Datasets
+# -------------------------------------------------------------------------------------
+
+def year_keys(df, categories=None):
+    """int64 merge key per row: iso3 code * YEAR_SPAN + year (year only when categories is None); -1 if missing."""
+    dates = df["date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce")
+
+    year = dates.dt.year
+    missing = year.isna().to_numpy()
+    keys = year.fillna(0).to_numpy(dtype="int64")
+
+    if categories is not None:
+        codes = pd.Categorical(df["iso3"], categories=categories).codes.astype("int64")
+        missing |= codes < 0
+        keys = codes * YEAR_SPAN + keys
+
+    return np.where(missing, -1, keys)
+
+
+def first_per_key(keys):
+    """Mask keeping the first row of every valid key (key-only dedupe)."""
+    return (keys >= 0) & ~pd.Series(keys).duplicated().to_numpy()
+
+
+def aligned_columns(left_keys, right, right_keys, columns):
+    """Left join by index alignment: `columns` of `right` looked up for every left key."""
+    keep = first_per_key(right_keys)
+    position = pd.Index(right_keys[keep]).get_indexer(left_keys)
+    found = position >= 0
+
+    aligned = {}
+    for column in columns:
+        values = right[column].to_numpy()[keep]
+        if len(values):
+            aligned[column] = np.where(found, values.take(np.where(found, position, 0)), np.nan)
+        else:
+            aligned[column] = np.full(len(left_keys), np.nan)
+    return aligned
+
+
+@instrumented()
+def merge_data(inflation, imf, wages, extras=None):
+    print("🔗 Merging datasets...")
+
+    # Sorted ISO3 categories of the left table → integer (iso3, year) keys for every source
+    categories = pd.Index(np.sort(inflation["iso3"].dropna().astype(str).unique()))
+    keys = year_keys(inflation, categories)
+
+    # One row per (iso3, year), first wins (aggregates without ISO3 drop out here)
+    first = first_per_key(keys)
+    keys = keys[first]
+    codes = keys // YEAR_SPAN
+
+    # Keep countries with enough observations — group sizes straight from the codes
+    enough = np.bincount(codes, minlength=len(categories))[codes] > MIN_OBSERVATIONS
+    keys, codes = keys[enough], codes[enough]
+
+    merged = inflation[first][enough].reset_index(drop=True)
+    merged["iso3"] = pd.Categorical.from_codes(codes, categories=categories).remove_unused_categories()
+
+    # Wages + extra World Bank indicators by (iso3, year): one index lookup per source
+    joined = {}
+    for frame in [wages, *(extras or [])]:
+        columns = [c for c in frame.columns if c not in ("iso3", "date")]
+        joined.update(aligned_columns(keys, frame, year_keys(frame, categories), columns))
+
+    # IMF GLOBAL annual rollup by year only
+    joined.update(aligned_columns(keys % YEAR_SPAN, imf, year_keys(imf), ["commodity_price"]))
+
+    # Columns attached once at the end (no frame copy per join)
+    merged = pd.concat([merged, pd.DataFrame(joined, index=merged.index)], axis=1)
+    return compact(merged, floats=False)
+
+# -------------------------------------------------------------------------------------
+# Save Outputs
+# -------------------------------------------------------------------------------------
+
+@instrumented()
+def save_outputs(merged):
+    if not os.path.exists(PROCESSED_DIR):
+        os.makedirs(PROCESSED_DIR)
+
+    output_path = os.path.join(PROCESSED_DIR, "cleaned_global_data.csv")
+    merged.to_csv(output_path, index=False)
+
+    # Columnar copy, partitioned by year, for EDA / DB loader / other readers
+    write_processed(merged)
+
+    print("\n🎉 DONE! Cleaned dataset saved to:")
+    print(output_path)
+    print(PROCESSED_DATASET + "/ (parquet, partitioned by year)")
+    print("\nFinal shape:", merged.shape)
+
+# -------------------------------------------------------------------------------------
+# Main Execution
+# -------------------------------------------------------------------------------------
+
+def main():
+    inflation, imf, wages = load_data()
+
+    inflation_clean = clean_inflation(inflation)
+    wages_clean = clean_wages(wages)
+    extras_clean = [clean_indicator(df, column) for column, df in load_extra_indicators().items()]
+
+    # Monthly IMF → precomputed annual/quarterly tables; the merge joins the annual one
+    imf_annual = headline_annual(build_rollups(imf)["annual"])
+
+    merged = merge_data(inflation_clean, imf_annual, wages_clean, extras_clean)
+
+    save_outputs(merged)
+
+    # Real wages, YoY changes, rolling / per-country correlations for the dashboard
+    from src.analysis.derived import build_derived
+    build_derived(merged)
+
+    # Year-window statistics: only the new / revised years are re-indexed
+    from src.analysis.range_index import build_range_index
+    build_range_index(merged)
+
+# -------------------------------------------------------------------------------------
+# Run Script
+# -------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+IMF COMMODITY ROLLUPS - PRECOMPUTED ANNUAL / QUARTERLY TABLES
+-------------------------------------------------------------
+
+The IMF file is monthly; everything downstream is annual (merge) or
+chart-resolution (dashboard). This stage parses ALL commodity columns in
+one vectorized pass and aggregates them in one groupby per resolution:
+- monthly: long date, commodity, price (the full typed panel)
+- annual / quarterly: mean, end-of-period (last), min, max
+  stored long: date (period start), commodity, mean, last, min, max
+- data/processed/commodity_{monthly,annual,quarterly}.parquet
+
+The merge joins the small annual table; the dashboard reads the tables
+directly and the DB loader copies the monthly one into commodity_prices.
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.utils.instrumentation import instrumented
+
+PROCESSED_DIR = "data/processed"
+
+FREQUENCIES = {"annual": "Y", "quarterly": "Q"}
+STATS = ["mean", "last", "min", "max"]
+RESOLUTIONS = ["monthly", *FREQUENCIES]
+
+# Formatting characters stripped from text-typed price cells ("1,234.5", "$80")
+NON_NUMERIC = r"[^0-9.\-]"
+NUMBER = r"^-?([0-9]+\.?[0-9]*|\.[0-9]+)$"
+
+# Headline series merged into macro_data.commodity_price (annual mean)
+HEADLINE = "All Commodity Price Index"
+HEADLINE_STAT = "mean"
+
+
+def rollup_path(resolution, processed_dir=PROCESSED_DIR):
+    return os.path.join(processed_dir, f"commodity_{resolution}.parquet")
+
+# -------------------------------------------------------------------------------------
+# Build
+# -------------------------------------------------------------------------------------
+
+def parse_prices(frame):
+    """Text price cells → float64 array of the same shape.
+
+    Every cell of every column goes through ONE Arrow regex kernel + cast
+    (no per-column Python string round trip); unparseable cells become NaN.
+    """
+    cells = pa.array(frame.astype(str).to_numpy().ravel(), type=pa.string())
+    cleaned = pc.replace_substring_regex(cells, NON_NUMERIC, "")
+    cleaned = pc.if_else(pc.match_substring_regex(cleaned, NUMBER), cleaned, pa.scalar(None, pa.string()))
+    parsed = pc.cast(cleaned, pa.float64()).to_numpy(zero_copy_only=False)
+    return parsed.reshape(frame.shape)
+
+
+def commodity_panel(imf):
+    """Monthly wide panel: date + one float64 column per commodity, parsed in one pass."""
+    values = imf.drop(columns=["Date"])
+
+    # Numeric columns are already typed; the text ones are parsed together
+    text = values.columns[[not pd.api.types.is_numeric_dtype(t) for t in values.dtypes]]
+    if len(text):
+        values[text] = parse_prices(values[text])
+
+    panel = values.astype("float64")
+    panel.insert(0, "date", pd.to_datetime(imf["Date"], errors="coerce"))
+    return panel.dropna(subset=["date"]).sort_values("date")
+
+
+def commodity_long(panel):
+    """Long monthly table date, commodity, price from the wide panel (one reshape)."""
+    commodities = [c for c in panel.columns if c != "date"]
+    prices = panel[commodities].to_numpy()
+
+    table = pd.DataFrame({
+        "date": np.repeat(panel["date"].to_numpy(), len(commodities)),
+        "commodity": pd.Categorical.from_codes(
+            np.tile(np.arange(len(commodities)), len(panel)), categories=commodities
+        ),
+        "price": prices.ravel(),
+    })
+    return table.dropna(subset=["price"]).reset_index(drop=True)
+
+
+def rollup(panel, resolution):
+    commodities = [c for c in panel.columns if c != "date"]
+    period = panel["date"].dt.to_period(FREQUENCIES[resolution]).rename("period")
+
+    # One groupby over every commodity column at once
+    grouped = panel.groupby(period)[commodities].agg(STATS)
+
+    table = grouped.stack(level=0, future_stack=True).rename_axis(["period", "commodity"]).reset_index()
+    table.insert(0, "date", table.pop("period").dt.start_time)
+    table["commodity"] = table["commodity"].astype("category")
+    return table.dropna(subset=["mean"]).reset_index(drop=True)
+
+
+@instrumented()
+def build_rollups(imf, processed_dir=PROCESSED_DIR):
+    print("🔧 Building IMF commodity rollups...")
+
+    if HEADLINE not in imf.columns:
+        raise KeyError(f"Missing '{HEADLINE}' column in IMF data.")
+
+    panel = commodity_panel(imf)
+    tables = {"monthly": commodity_long(panel)}
+    for resolution in FREQUENCIES:
+        tables[resolution] = rollup(panel, resolution)
+
+    for resolution in RESOLUTIONS:
+        path = rollup_path(resolution, processed_dir)
+        os.makedirs(processed_dir, exist_ok=True)
+        tables[resolution].to_parquet(path, index=False)
+        print(f"✔ {resolution.title()} table: {len(tables[resolution]):,} rows → {path}")
+
+    return tables
+
+# -------------------------------------------------------------------------------------
+# Read
+# -------------------------------------------------------------------------------------
+
+def load_rollup(resolution="annual", commodities=None, year_range=None, processed_dir=PROCESSED_DIR):
+    filters = []
+    if commodities:
+        filters.append(("commodity", "in", list(commodities)))
+    if year_range:
+        start_year, end_year = year_range
+        filters.append(("date", ">=", pd.Timestamp(int(start_year), 1, 1)))
+        filters.append(("date", "<=", pd.Timestamp(int(end_year), 12, 31)))
+
+    return pd.read_parquet(rollup_path(resolution, processed_dir), filters=filters or None)
+
+
+def commodity_names(processed_dir=PROCESSED_DIR):
+    """Every commodity in the rollups (reads only the commodity column)."""
+    column = pd.read_parquet(rollup_path("annual", processed_dir), columns=["commodity"])["commodity"]
+    return list(column.cat.categories) if isinstance(column.dtype, pd.CategoricalDtype) else list(column.unique())
+
+
+def headline_annual(annual):
+    """[date, commodity_price] — the annual table the merge joins on."""
+    headline = annual[annual["commodity"] == HEADLINE]
+    return headline[["date", HEADLINE_STAT]].rename(columns={HEADLINE_STAT: "commodity_price"})
@@ -0,0 +1,182 @@
+"""
+COUNTRY RESOLUTION - NAME / CODE → ISO3
+---------------------------------------
+
+Shared by every cleaner in clean_and_merge:
+- Resolves each distinct country name or code ONCE (pycountry lookup)
+- Keeps the results in a persisted lookup table (data/reference/iso3_lookup.csv)
+- Handles World Bank / OECD aggregates explicitly (no lookup, no ISO3)
+- Maps a whole column with a vectorized factorize + take
+
+The lookup table can be edited by hand: set `iso3` on a row to override
+what pycountry returns (e.g. "Korea, Rep." → KOR).
+
+The runner cleans sources in parallel processes: new keys are merged into
+the file on disk under a file lock and swapped in atomically, so workers
+never lose each other's keys or read a half-written table.
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pycountry
+from filelock import FileLock
+
+LOOKUP_PATH = os.getenv("ISO3_LOOKUP_PATH", "data/reference/iso3_lookup.csv")
+
+KIND_COUNTRY = "country"
+KIND_AGGREGATE = "aggregate"
+KIND_UNRESOLVED = "unresolved"
+
+# -------------------------------------------------------------------------------------
+# Known aggregates (World Bank regions / income groups, OECD totals)
+# -------------------------------------------------------------------------------------
+
+AGGREGATE_CODES = {
+    "1A", "1W", "4E", "7E", "8S", "B8", "EU", "F1", "OE",
+    "S1", "S2", "S3", "S4", "T2", "T3", "T4", "T5", "T6", "T7",
+    "V1", "V2", "V3", "V4", "XC", "XD", "XE", "XF", "XG", "XH",
+    "XI", "XJ", "XL", "XM", "XN", "XO", "XP", "XQ", "XT", "XU",
+    "Z4", "Z7", "ZF", "ZG", "ZH", "ZI", "ZJ", "ZQ", "ZT",
+    "OECD", "EA20", "EU27_2020",
+}
+
+AGGREGATE_NAMES = {
+    "Africa Eastern and Southern",
+    "Africa Western and Central",
+    "Arab World",
+    "Caribbean small states",
+    "Central Europe and the Baltics",
+    "Early-demographic dividend",
+    "East Asia & Pacific",
+    "East Asia & Pacific (excluding high income)",
+    "East Asia & Pacific (IDA & IBRD countries)",
+    "Euro area",
+    "Europe & Central Asia",
+    "Europe & Central Asia (excluding high income)",
+    "Europe & Central Asia (IDA & IBRD countries)",
+    "European Union",
+    "Fragile and conflict affected situations",
+    "Heavily indebted poor countries (HIPC)",
+    "High income",
+    "IBRD only",
+    "IDA & IBRD total",
+    "IDA blend",
+    "IDA only",
+    "IDA total",
+    "Late-demographic dividend",
+    "Latin America & Caribbean",
+    "Latin America & Caribbean (excluding high income)",
+    "Latin America & the Caribbean (IDA & IBRD countries)",
+    "Least developed countries: UN classification",
+    "Low & middle income",
+    "Low income",
+    "Lower middle income",
+    "Middle East, North Africa, Afghanistan & Pakistan",
+    "Middle East, North Africa, Afghanistan & Pakistan (excluding high income)",
+    "Middle East, North Africa, Afghanistan & Pakistan (IDA & IBRD)",
+    "Middle income",
+    "North America",
+    "OECD members",
+    "Other small states",
+    "Pacific island small states",
+    "Post-demographic dividend",
+    "Pre-demographic dividend",
+    "Small states",
+    "South Asia",
+    "South Asia (IDA & IBRD)",
+    "Sub-Saharan Africa",
+    "Sub-Saharan Africa (excluding high income)",
+    "Sub-Saharan Africa (IDA & IBRD countries)",
+    "Upper middle income",
+    "World",
+}
+
+# In-process cache of the lookup tables: path → {key → (iso3 or None, kind)}
+_LOOKUPS = {}
+
+
+def reset_lookup():
+    """Drop the in-process cache (e.g. after editing the file by hand)."""
+    _LOOKUPS.clear()
+
+
+# -------------------------------------------------------------------------------------
+# Lookup table persistence
+# -------------------------------------------------------------------------------------
+
+def _read_lookup(path):
+    lookup = {}
+    if os.path.exists(path):
+        table = pd.read_csv(path, dtype=str, keep_default_na=False)
+        for key, iso3, kind in table[["key", "iso3", "kind"]].itertuples(index=False):
+            lookup[key] = (iso3 or None, kind)
+    return lookup
+
+
+def load_lookup(path=None):
+    path = os.path.abspath(path or LOOKUP_PATH)
+    if path not in _LOOKUPS:
+        _LOOKUPS[path] = _read_lookup(path)
+    return _LOOKUPS[path]
+
+
+def save_lookup(path=None):
+    """Merge this process's keys into the file on disk (locked, atomic replace)."""
+    path = os.path.abspath(path or LOOKUP_PATH)
+    lookup = load_lookup(path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with FileLock(path + ".lock"):
+        # Rows already on disk win: hand edits and other workers' keys are kept
+        merged = {**lookup, **_read_lookup(path)}
+        table = pd.DataFrame(
+            [(key, iso3 or "", kind) for key, (iso3, kind) in merged.items()],
+            columns=["key", "iso3", "kind"],
+        ).sort_values("key")
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        table.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    lookup.update(merged)
+
+
+# -------------------------------------------------------------------------------------
+# Resolution
+# -------------------------------------------------------------------------------------
+
+def _resolve_one(key):
+    if key in AGGREGATE_CODES or key in AGGREGATE_NAMES:
+        return None, KIND_AGGREGATE
+    try:
+        return pycountry.countries.lookup(key).alpha_3, KIND_COUNTRY
+    except LookupError:
+        return None, KIND_UNRESOLVED
+
+
+def to_iso3(country_name):
+    """Scalar resolver, backed by the same lookup table as resolve_iso3."""
+    if pd.isna(country_name):
+        return None
+    return resolve_iso3(pd.Series([country_name])).iloc[0]
+
+
+def resolve_iso3(values, path=None, persist=True):
+    """Map a column of country names/codes to ISO3 (None for aggregates / unknowns)."""
+    lookup = load_lookup(path)
+
+    codes, uniques = pd.factorize(values.astype("string"), use_na_sentinel=True)
+
+    new_keys = [key for key in uniques if key not in lookup]
+    for key in new_keys:
+        lookup[key] = _resolve_one(key)
+
+    if new_keys and persist:
+        save_lookup(path)
+
+    # One ISO3 per distinct key, then a single take over the whole column
+    resolved = np.array([lookup[key][0] for key in uniques] + [None], dtype=object)
+    return pd.Series(resolved[codes], index=values.index, dtype=object)
@@ -0,0 +1,123 @@
+"""
+PROCESSED DATA STORE - PARTITIONED PARQUET
+------------------------------------------
+
+Columnar, typed copy of the merged dataset:
+- Written by clean_and_merge to data/processed/macro_data/ (hive partitions year=YYYY/)
+- Optional second partition level on iso3 (PARQUET_PARTITION_ISO3=1)
+- read_processed() supports column projection and predicate pushdown, so
+  downstream steps (EDA, DB loader) only read what they need
+
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROCESSED_DATASET = "data/processed/macro_data"
+PROCESSED_CSV = "data/processed/cleaned_global_data.csv"
+
+PARTITION_ISO3 = os.getenv("PARQUET_PARTITION_ISO3", "false").lower() in ("1", "true", "yes")
+
+SCHEMA = pa.schema([
+    ("iso3", pa.string()),
+    ("date", pa.date32()),
+    ("year", pa.int16()),
+    ("inflation_rate", pa.float64()),
+    ("wage_index", pa.float64()),
+    ("commodity_price", pa.float64()),
+])
+
+# -------------------------------------------------------------------------------------
+# Write
+# -------------------------------------------------------------------------------------
+
+def to_table(df):
+    """Typed Arrow table (extra numeric columns are kept as float64)."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"])
+    df["year"] = df["date"].dt.year.astype("int16")
+    df["date"] = df["date"].dt.date
+
+    fields = [f for f in SCHEMA if f.name in df.columns]
+    fields += [pa.field(c, pa.float64()) for c in df.columns if c not in SCHEMA.names]
+    schema = pa.schema(fields)
+
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+
+def write_processed(df, root=PROCESSED_DATASET, partition_iso3=PARTITION_ISO3):
+    table = to_table(df)
+    partition_cols = ["year", "iso3"] if partition_iso3 else ["year"]
+
+    # Full rewrite: stale partitions (dropped years/countries) must not survive
+    if os.path.exists(root):
+        shutil.rmtree(root)
+
+    # Deterministic file names → identical data gives an identical tree (pipeline cache)
+    pq.write_to_dataset(table, root_path=root, partition_cols=partition_cols,
+                        basename_template="part-{i}.parquet")
+    return root
+
+# -------------------------------------------------------------------------------------
+# Read
+# -------------------------------------------------------------------------------------
+
+def dataset_exists(root=PROCESSED_DATASET):
+    return os.path.isdir(root) and any(os.scandir(root))
+
+
+def read_processed(columns=None, filters=None, root=PROCESSED_DATASET):
+    """
+    Read the processed dataset.
+
+    columns: list of columns to read (projection), None for all
+    filters: pyarrow DNF predicates, e.g. [("year", ">=", 2000), ("iso3", "in", ["USA"])]
+    """
+    table = pq.read_table(root, columns=columns, filters=filters, partitioning="hive")
+    df = table.to_pandas(date_as_object=False)
+
+    # Partition keys come back as dictionary columns → restore the stored types
+    if "year" in df.columns:
+        df["year"] = df["year"].astype("int16")
+    if "iso3" in df.columns:
+        df["iso3"] = df["iso3"].astype(str)
+
+    return df
+
+
+_OPS = {
+    "=": lambda s, v: s == v,
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(list(v)),
+    "not in": lambda s, v: ~s.isin(list(v)),
+}
+
+
+def _apply_filters(df, filters):
+    # Same (column, op, value) conjunction as pyarrow, evaluated in pandas
+    for column, op, value in filters or []:
+        df = df[_OPS[op](df[column], value)]
+    return df
+
+
+def load_processed(columns=None, filters=None):
+    """Parquet dataset when available, otherwise the legacy CSV."""
+    if dataset_exists():
+        return read_processed(columns=columns, filters=filters)
+
+    df = pd.read_csv(PROCESSED_CSV)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["year"] = df["date"].dt.year.astype("Int16")
+
+    df = _apply_filters(df, filters)
+    return df if columns is None else df[list(columns)]
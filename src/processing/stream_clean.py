@@ -0,0 +1,175 @@
+"""
+STREAMING CLEAN - BOUNDED-MEMORY MODE FOR LARGE RAW EXPORTS
+-----------------------------------------------------------
+
+Same cleaning rules as clean_and_merge, but each raw source is:
+- read in chunks of CHUNK_SIZE rows
+- restricted to the columns the cleaner uses (usecols) with explicit dtypes;
+  value columns are read as text, so "7.4%" / "1,234" go through the same
+  to_number parsing as the in-memory cleaners instead of failing read_csv
+- cleaned chunk by chunk and written as a Parquet part under data/interim/<source>/
+
+Peak memory during cleaning is bounded by the chunk size, not the file size.
+The merge then runs on the (much smaller) cleaned partitions; the monthly IMF
+file is small and goes through the commodity rollups instead.
+
+Usage: python -m src.processing.stream_clean [--chunksize N]
+
+"""
+
+import argparse
+import os
+import shutil
+from functools import partial
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.processing.commodity_rollups import build_rollups, headline_annual, load_rollup
+from src.utils.instrumentation import stage
+from src.processing.clean_and_merge import (
+    EXTRA_INDICATORS,
+    RAW_DIR,
+    clean_indicator,
+    clean_inflation,
+    clean_wages,
+    merge_data,
+    save_outputs,
+)
+
+INTERIM_DIR = "data/interim"
+CHUNK_SIZE = int(os.getenv("CLEAN_CHUNK_SIZE", "200000"))
+
+# -------------------------------------------------------------------------------------
+# Source specs: file, columns actually used, explicit dtypes, cleaner
+# -------------------------------------------------------------------------------------
+
+SOURCES = {
+    "inflation": {
+        "file": "worldbank_inflation.csv",
+        "usecols": ["country", "year", "inflation_rate"],
+        "dtype": {"country": "string", "year": "string", "inflation_rate": "string"},
+        "cleaner": clean_inflation,
+    },
+    "wages": {
+        "file": "oecd_wages.csv",
+        "usecols": ["REF_AREA", "TIME_PERIOD", "OBS_VALUE"],
+        "dtype": {"REF_AREA": "string", "TIME_PERIOD": "string", "OBS_VALUE": "string"},
+        "cleaner": clean_wages,
+    },
+}
+
+for _column, _file in EXTRA_INDICATORS.items():
+    SOURCES[_column] = {
+        "file": _file,
+        "usecols": ["country", "year", _column],
+        "dtype": {"country": "string", "year": "string", _column: "string"},
+        "cleaner": partial(clean_indicator, column=_column),
+        "optional": True,
+    }
+
+
+def _schema(df):
+    # Fixed schema for every part (an all-None iso3 chunk must still be a string column)
+    fields = [pa.field("iso3", pa.string()), pa.field("date", pa.timestamp("ns"))]
+    fields += [pa.field(c, pa.float64()) for c in df.columns if c not in ("iso3", "date")]
+    return pa.schema(fields)
+
+# -------------------------------------------------------------------------------------
+# Per-source streaming
+# -------------------------------------------------------------------------------------
+
+def source_dir(name, interim_dir=INTERIM_DIR):
+    return os.path.join(interim_dir, name)
+
+
+def stream_clean_source(name, chunksize=CHUNK_SIZE, raw_dir=RAW_DIR, interim_dir=INTERIM_DIR):
+    """Clean one raw source chunk by chunk into data/interim/<name>/part-NNNNN.parquet."""
+    spec = SOURCES[name]
+    raw_path = os.path.join(raw_dir, spec["file"])
+    out_dir = source_dir(name, interim_dir)
+
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    rows_in = rows_out = bytes_out = parts = 0
+
+    with stage(f"stream_clean_{name}", chunksize=chunksize) as metrics:
+        reader = pd.read_csv(raw_path, usecols=spec["usecols"], dtype=spec["dtype"], chunksize=chunksize)
+
+        for chunk in reader:
+            cleaned = spec["cleaner"](chunk)
+            table = pa.Table.from_pandas(cleaned, schema=_schema(cleaned), preserve_index=False)
+            part_path = os.path.join(out_dir, f"part-{parts:05d}.parquet")
+            pq.write_table(table, part_path)
+
+            rows_in += len(chunk)
+            rows_out += len(cleaned)
+            bytes_out += os.path.getsize(part_path)
+            parts += 1
+
+        metrics.rows_in, metrics.bytes_in = rows_in, os.path.getsize(raw_path)
+        metrics.rows_out, metrics.bytes_out = rows_out, bytes_out
+
+    print(f"✔ {name}: {rows_in:,} raw rows → {rows_out:,} cleaned rows in {parts} parts")
+    return {"rows_in": rows_in, "rows_out": rows_out, "parts": parts, "path": out_dir}
+
+
+def read_cleaned(name, interim_dir=INTERIM_DIR):
+    df = pq.read_table(source_dir(name, interim_dir)).to_pandas()
+    df["iso3"] = df["iso3"].astype(object).where(df["iso3"].notna(), None)
+    return df
+
+def available_sources(raw_dir=RAW_DIR):
+    return [
+        name for name, spec in SOURCES.items()
+        if not spec.get("optional") or os.path.exists(os.path.join(raw_dir, spec["file"]))
+    ]
+
+
+def build_imf_rollups(raw_dir=RAW_DIR):
+    # IMF is small (monthly, global) → read once for the precomputed rollups
+    imf = pd.read_csv(os.path.join(raw_dir, "imf_commodity_price.csv"))
+    return build_rollups(imf)
+
+
+def merge_cleaned(extra_names=None, imf_annual=None):
+    """Merge the cleaned partitions + annual commodity rollup and save the outputs."""
+    if imf_annual is None:
+        imf_annual = headline_annual(load_rollup("annual"))
+    if extra_names is None:
+        extra_names = [name for name in available_sources() if name in EXTRA_INDICATORS]
+
+    extras = [read_cleaned(name) for name in extra_names]
+    merged = merge_data(read_cleaned("inflation"), imf_annual, read_cleaned("wages"), extras)
+
+    save_outputs(merged)
+    return merged
+
+# -------------------------------------------------------------------------------------
+# Main Execution
+# -------------------------------------------------------------------------------------
+
+def main(chunksize=CHUNK_SIZE):
+    print(f"🌊 Streaming clean (chunksize={chunksize:,})...")
+
+    available = available_sources()
+    for name in available:
+        stream_clean_source(name, chunksize=chunksize)
+
+    imf_annual = headline_annual(build_imf_rollups()["annual"])
+    merged = merge_cleaned([name for name in available if name in EXTRA_INDICATORS], imf_annual)
+
+    from src.analysis.derived import build_derived
+    build_derived(merged)
+
+    from src.analysis.range_index import build_range_index
+    build_range_index(merged)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunked, bounded-memory cleaning")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    main(parser.parse_args().chunksize)
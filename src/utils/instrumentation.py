@@ -0,0 +1,335 @@
+"""
+STAGE INSTRUMENTATION
+---------------------
+
+Machine-readable metrics for every ETL stage (the emoji prints stay for humans):
+- `stage("name")` context manager / `@instrumented()` decorator
+- wall time, CPU time, peak RSS (sampled while the stage runs, so each stage
+  reports its own peak, not the process high-water mark), rows and bytes
+  in/out, status
+- optional per-query SQL timing (`instrument_engine`, DB_QUERY_TIMING=1)
+
+Output (METRICS_FORMAT):
+- jsonl       one JSON object per stage / query appended to METRICS_PATH (default)
+- prometheus  node-exporter textfile with the latest value per stage; every
+              process merges its stages into the file under a file lock
+- off         nothing is written
+
+"""
+
+import contextvars
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FORMAT = os.getenv("METRICS_FORMAT", "jsonl").lower()
+METRICS_PATH = os.getenv(
+    "METRICS_PATH",
+    "logs/metrics.prom" if METRICS_FORMAT == "prometheus" else "logs/metrics.jsonl"
+)
+
+# One id per process run, so every record of a nightly refresh can be grouped
+RUN_ID = os.getenv("PIPELINE_RUN_ID") or uuid.uuid4().hex[:12]
+
+# Seconds between RSS samples while a stage runs
+RSS_SAMPLE_INTERVAL = float(os.getenv("METRICS_RSS_SAMPLE_INTERVAL", "0.05"))
+
+_current_stage = contextvars.ContextVar("current_stage", default=None)
+_write_lock = threading.Lock()
+
+# -------------------------------------------------------------------------------------
+# Measurements
+# -------------------------------------------------------------------------------------
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _RSSSampler:
+    """One daemon thread per process tracking the peak RSS of every open stage."""
+
+    def __init__(self):
+        self._active = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, metrics):
+        metrics.rss_start_mb = metrics.rss_peak_mb = _rss_mb()
+        if metrics.rss_start_mb is None:
+            return
+        with self._lock:
+            self._active.add(metrics)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self, metrics):
+        with self._lock:
+            self._active.discard(metrics)
+        metrics.observe_rss(_rss_mb())
+
+    def _run(self):
+        while True:
+            time.sleep(RSS_SAMPLE_INTERVAL)
+            rss = _rss_mb()
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                for metrics in self._active:
+                    metrics.observe_rss(rss)
+
+
+_sampler = _RSSSampler()
+
+
+def measure_size(obj):
+    """(rows, bytes) for a DataFrame / Arrow table / file path / collection of those."""
+    if obj is None:
+        return None, None
+    if hasattr(obj, "memory_usage") and hasattr(obj, "shape"):
+        return int(obj.shape[0]), int(obj.memory_usage(index=True).sum())
+    if hasattr(obj, "num_rows") and hasattr(obj, "nbytes"):
+        return int(obj.num_rows), int(obj.nbytes)
+    if isinstance(obj, (str, os.PathLike)) and os.path.isfile(obj):
+        return None, os.path.getsize(obj)
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (list, tuple)):
+        sizes = [measure_size(o) for o in obj]
+        rows = [r for r, _ in sizes if r is not None]
+        sizes_b = [b for _, b in sizes if b is not None]
+        return (sum(rows) if rows else None), (sum(sizes_b) if sizes_b else None)
+    if isinstance(obj, int) and not isinstance(obj, bool):
+        return obj, None
+    return None, None
+
+
+class StageMetrics:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.rows_in = self.rows_out = None
+        self.bytes_in = self.bytes_out = None
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.rss_start_mb = self.rss_peak_mb = None
+
+    def observe_rss(self, rss):
+        if rss is not None and (self.rss_peak_mb is None or rss > self.rss_peak_mb):
+            self.rss_peak_mb = rss
+
+    def record_input(self, obj):
+        self.rows_in, self.bytes_in = measure_size(obj)
+
+    def record_output(self, obj):
+        self.rows_out, self.bytes_out = measure_size(obj)
+
+# -------------------------------------------------------------------------------------
+# Emitters
+# -------------------------------------------------------------------------------------
+
+def _write_jsonl(record):
+    os.makedirs(os.path.dirname(METRICS_PATH) or ".", exist_ok=True)
+    with _write_lock, open(METRICS_PATH, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+PROMETHEUS_GAUGES = [
+    ("etl_stage_wall_seconds", "wall_s"),
+    ("etl_stage_cpu_seconds", "cpu_s"),
+    ("etl_stage_peak_rss_megabytes", "peak_rss_mb"),
+    ("etl_stage_rss_growth_megabytes", "rss_growth_mb"),
+    ("etl_stage_rows_in", "rows_in"),
+    ("etl_stage_rows_out", "rows_out"),
+    ("etl_stage_bytes_in", "bytes_in"),
+    ("etl_stage_bytes_out", "bytes_out"),
+    ("etl_stage_sql_queries", "sql_queries"),
+    ("etl_stage_sql_seconds", "sql_seconds"),
+    ("etl_stage_success", "success"),
+    ("etl_stage_last_run_timestamp_seconds", "finished_unix"),
+]
+
+_PROMETHEUS_SAMPLE = re.compile(r'^(\w+)\{stage="([^"]*)"\} (\S+)$')
+
+
+def _read_prometheus(path):
+    """{stage: {record key: value}} from an existing textfile."""
+    keys = dict(PROMETHEUS_GAUGES)
+    stages = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                match = _PROMETHEUS_SAMPLE.match(line.strip())
+                if match and match.group(1) in keys:
+                    stages.setdefault(match.group(2), {})[keys[match.group(1)]] = float(match.group(3))
+    except FileNotFoundError:
+        pass
+    return stages
+
+
+def _write_prometheus(record):
+    if record.get("type") != "stage":
+        return
+
+    from filelock import FileLock
+
+    os.makedirs(os.path.dirname(METRICS_PATH) or ".", exist_ok=True)
+    # Runner workers and separate CLI runs share the file → merge, never overwrite
+    with _write_lock, FileLock(METRICS_PATH + ".lock"):
+        stages = _read_prometheus(METRICS_PATH)
+        stages[record["stage"]] = record
+
+        lines = []
+        for metric, key in PROMETHEUS_GAUGES:
+            lines.append(f"# TYPE {metric} gauge")
+            for name, rec in sorted(stages.items()):
+                value = rec.get(key)
+                if value is not None:
+                    lines.append(f'{metric}{{stage="{name}"}} {float(value)}')
+
+        # Write + rename so the textfile collector never reads a partial file
+        tmp_path = f"{METRICS_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, METRICS_PATH)
+
+
+def emit(record):
+    if METRICS_FORMAT == "off":
+        return
+    record = {"ts": datetime.now(timezone.utc).isoformat(), "run_id": RUN_ID, **record}
+    try:
+        if METRICS_FORMAT == "prometheus":
+            _write_prometheus(record)
+        else:
+            _write_jsonl(record)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics to {METRICS_PATH}: {e}")
+
+# -------------------------------------------------------------------------------------
+# Stage context manager / decorator
+# -------------------------------------------------------------------------------------
+
+@contextmanager
+def stage(name, **labels):
+    """Measure the enclosed block; use the yielded object to record rows/bytes."""
+    metrics = StageMetrics(name, labels)
+    token = _current_stage.set(metrics)
+    _sampler.start(metrics)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    status = "ok"
+
+    try:
+        yield metrics
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _current_stage.reset(token)
+        _sampler.stop(metrics)
+        wall = time.perf_counter() - wall_start
+        emit({
+            "type": "stage",
+            "stage": name,
+            "status": status,
+            "success": int(status == "ok"),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(time.process_time() - cpu_start, 6),
+            # Sampled during this stage; without /proc, the process high-water mark
+            "peak_rss_mb": round(metrics.rss_peak_mb, 3) if metrics.rss_peak_mb is not None else _peak_rss_mb(),
+            "rss_growth_mb": (round(metrics.rss_peak_mb - metrics.rss_start_mb, 3)
+                              if metrics.rss_start_mb is not None else None),
+            "process_peak_rss_mb": _peak_rss_mb(),
+            "rss_mb": _rss_mb(),
+            "rows_in": metrics.rows_in,
+            "rows_out": metrics.rows_out,
+            "bytes_in": metrics.bytes_in,
+            "bytes_out": metrics.bytes_out,
+            "sql_queries": metrics.queries,
+            "sql_seconds": round(metrics.query_seconds, 6),
+            "finished_unix": time.time(),
+            **labels,
+        })
+
+
+def instrumented(name=None, **labels):
+    """Decorator: input = DataFrame positional args, output = return value."""
+    def decorator(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, **labels) as metrics:
+                inputs = [
+                    a for a in args
+                    if hasattr(a, "shape")
+                    or (isinstance(a, (list, tuple)) and any(hasattr(x, "shape") for x in a))
+                ]
+                if inputs:
+                    metrics.record_input(inputs)
+                result = fn(*args, **kwargs)
+                metrics.record_output(result)
+                return result
+
+        return wrapper
+    return decorator
+
+# -------------------------------------------------------------------------------------
+# SQL timing
+# -------------------------------------------------------------------------------------
+
+def instrument_engine(engine, log_queries=True):
+    """Time every statement; totals are added to the enclosing stage."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+        current = _current_stage.get()
+        if current is not None:
+            current.queries += 1
+            current.query_seconds += elapsed
+
+        if log_queries:
+            emit({
+                "type": "query",
+                "stage": current.name if current is not None else None,
+                "statement": " ".join(statement.split())[:500],
+                "executemany": executemany,
+                "rowcount": cursor.rowcount,
+                "duration_s": round(elapsed, 6),
+            })
+
+    return engine
@@ -0,0 +1,107 @@
+"""
+COMPACT DATAFRAME SCHEMA
+------------------------
+
+One place that decides the in-memory types of the macro dataset:
+- iso3   → category (≈250 distinct codes instead of one Python str per row)
+- values → float32 when the float32 round trip stays within FLOAT32_ATOL,
+           float64 otherwise (e.g. wages / GDP in the 10⁴–10⁵ range)
+- date is kept as is (the charts and range filters use it); an int16 year
+  is only derived on request (year=True): next to date it adds a column
+  rather than replacing one
+
+Used by the cleaners (keys only — stored values stay float64), the EDA loader
+and the dashboard queries. memory_report() prints the measured saving.
+
+Usage: python -m src.utils.schema   (report for the processed dataset)
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLUMNS = ["iso3"]
+KEY_COLUMNS = ["iso3", "date", "year"]
+
+# Max absolute error accepted from float32 (values are published to ≤ 3 decimals)
+FLOAT32_ATOL = float(os.getenv("SCHEMA_FLOAT32_ATOL", "5e-4"))
+
+# -------------------------------------------------------------------------------------
+# Conversions
+# -------------------------------------------------------------------------------------
+
+def compact_keys(df):
+    """iso3 → category, in place where possible; returns df."""
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def add_year(df):
+    if "date" in df.columns and "year" not in df.columns:
+        df["year"] = pd.to_datetime(df["date"], errors="coerce").dt.year.astype("Int16")
+        if not df["year"].isna().any():
+            df["year"] = df["year"].astype("int16")
+    return df
+
+
+def float32_safe(series, atol=FLOAT32_ATOL):
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    error = np.abs(values.astype("float32").astype("float64") - values)
+    return bool(np.nanmax(error, initial=0.0) <= atol)
+
+
+def downcast_values(df, columns=None, atol=FLOAT32_ATOL):
+    """float64 value columns → float32 where precision allows."""
+    if columns is None:
+        columns = [c for c in df.columns if c not in KEY_COLUMNS and df[c].dtype == "float64"]
+    for column in columns:
+        if float32_safe(df[column], atol):
+            df[column] = df[column].astype("float32")
+    return df
+
+
+def compact(df, year=False, floats=True):
+    """Apply the shared schema: categorical iso3, float32 values (+ int16 year if asked)."""
+    df = compact_keys(df)
+    if year:
+        df = add_year(df)
+    if floats:
+        df = downcast_values(df)
+    return df
+
+# -------------------------------------------------------------------------------------
+# Memory report
+# -------------------------------------------------------------------------------------
+
+def memory_bytes(df):
+    return df.memory_usage(index=True, deep=True)
+
+
+def memory_report(before, after, label="dataset"):
+    """Per-column deep memory of two versions of the same frame; returns totals in bytes."""
+    old, new = memory_bytes(before), memory_bytes(after)
+
+    print(f"\n🧮 Memory — {label} ({len(after):,} rows)")
+    for column in new.index:
+        dtype = after[column].dtype if column in after.columns else "index"
+        print(f"   {column:<20} {old.get(column, 0) / 1e6:8.2f} MB → "
+              f"{new[column] / 1e6:8.2f} MB  {dtype}")
+
+    total_old, total_new = int(old.sum()), int(new.sum())
+    print(f"   {'total':<20} {total_old / 1e6:8.2f} MB → {total_new / 1e6:8.2f} MB "
+          f"(-{(1 - total_new / max(total_old, 1)) * 100:.0f}%)")
+    return {"before_bytes": total_old, "after_bytes": total_new}
+
+
+if __name__ == "__main__":
+    from src.processing.parquet_store import load_processed
+
+    # CSV-equivalent types (object iso3, float64 values) as the baseline
+    raw = load_processed()
+    baseline = raw.assign(iso3=raw["iso3"].astype(object))
+    baseline = baseline.astype({c: "float64" for c in baseline.columns if c not in KEY_COLUMNS})
+    memory_report(baseline, compact(baseline.copy()), "processed macro_data")
@@ -0,0 +1,25 @@
+"""
+Test setup: every test run gets its own scratch SQLite database, data version
+file and metrics log, so nothing under data/ or logs/ is touched.
+
+Usage: python -m pytest -q
+
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Read by src.db.config / src.db.query / src.utils.instrumentation at import time
+SCRATCH_DIR = tempfile.mkdtemp(prefix="global-econ-tests-")
+os.environ.pop("DATABASE_URL", None)
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(SCRATCH_DIR, "global_econ.db")
+os.environ["DATA_VERSION_FILE"] = os.path.join(SCRATCH_DIR, ".data_version")
+os.environ["DASHBOARD_SNAPSHOT_DIR"] = os.path.join(SCRATCH_DIR, "snapshot")
+os.environ["METRICS_PATH"] = os.path.join(SCRATCH_DIR, "metrics.jsonl")
+os.environ["ISO3_LOOKUP_PATH"] = os.path.join(SCRATCH_DIR, "iso3_lookup.csv")
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.db import query
+from src.db.config import engine
+from src.db.models import Base, CommodityPrice, MacroData
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    macro = pd.DataFrame({
+        "iso3": ["USA"] * 4 + ["DEU"] * 4,
+        "date": pd.to_datetime(["1985-01-01", "1995-01-01", "2000-01-01", "2010-01-01"] * 2).date,
+        "inflation_rate": [3.5, 2.8, 3.4, 1.6, 2.1, 1.7, 1.4, 1.1],
+        "wage_index": [40.0, 50.0, 60.0, 70.0, 30.0, 40.0, 50.0, 60.0],
+        "commodity_price": [50.0, 55.0, 60.0, 80.0, 50.0, 55.0, 60.0, 80.0],
+    })
+    commodities = pd.DataFrame({
+        "commodity": ["Copper"] * 3,
+        "date": pd.to_datetime(["1988-06-01", "1990-12-01", "1991-01-01"]).date,
+        "price": [1500.0, 2600.0, 2650.0],
+    })
+    with engine.begin() as conn:
+        conn.execute(MacroData.__table__.insert(), macro.to_dict("records"))
+        conn.execute(CommodityPrice.__table__.insert(), commodities.to_dict("records"))
+
+    query.invalidate_cache()
+    return TestClient(app)
+
+
+def test_macro_end_year_only(client):
+    response = client.get("/macro", params={"end_year": 2000})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 6
+    assert max(row["date"] for row in body["data"]) == "2000-01-01"
+
+
+def test_macro_start_year_only(client):
+    response = client.get("/macro", params={"start_year": 2000, "country": "USA"})
+
+    assert response.status_code == 200
+    assert [row["date"] for row in response.json()["data"]] == ["2000-01-01", "2010-01-01"]
+
+
+def test_commodity_prices_end_year_only(client):
+    response = client.get("/commodities/prices", params={"end_year": 1990})
+
+    assert response.status_code == 200
+    assert [row["date"] for row in response.json()["data"]] == ["1988-06-01", "1990-12-01"]
+
+
+def test_macro_not_modified(client):
+    first = client.get("/macro", params={"country": "DEU"})
+    second = client.get("/macro", params={"country": "DEU"}, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 304
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.dashboard import charts
+
+
+def series(n=200):
+    return pd.DataFrame({
+        "iso3": ["USA"] * n,
+        "date": pd.date_range("1800-01-01", periods=n, freq="YS"),
+        "inflation_rate": np.arange(n, dtype=float),
+    })
+
+
+def test_stats_do_not_serialize_the_figure_by_default(monkeypatch):
+    def to_json(self, *args, **kwargs):
+        raise AssertionError("figure serialized for the stats caption")
+
+    monkeypatch.setattr(charts, "MEASURE_PAYLOAD", False)
+    monkeypatch.setattr(go.Figure, "to_json", to_json)
+
+    _, stats = charts.line_chart(series(), x="date", y="inflation_rate", color="iso3")
+
+    assert stats["payload_bytes"] is None
+    assert "payload" not in charts.format_stats(stats)
+
+
+def test_payload_measured_when_enabled(monkeypatch):
+    monkeypatch.setattr(charts, "MEASURE_PAYLOAD", True)
+
+    fig, stats = charts.line_chart(series(), x="date", y="inflation_rate", color="iso3")
+
+    assert stats["payload_bytes"] == len(fig.to_json())
+    assert "KB payload" in charts.format_stats(stats)
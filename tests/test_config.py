@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_duckdb_backend_without_driver_fails_clearly(tmp_path):
+    # Fresh interpreter: config is read at import time; None in sys.modules makes the import fail
+    code = "import sys; sys.modules['duckdb_engine'] = None; import src.db.config"
+    env = {**os.environ, "DB_BACKEND": "duckdb", "DUCKDB_PATH": str(tmp_path / "x.duckdb")}
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True)
+
+    assert result.returncode != 0
+    assert "ImportError: The duckdb backend needs the DuckDB driver: pip install duckdb duckdb-engine" \
+        in result.stderr
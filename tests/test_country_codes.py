@@ -0,0 +1,40 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.processing import country_codes
+
+
+def _resolve_in_worker(path, names):
+    country_codes.resolve_iso3(pd.Series(names), path=path)
+
+
+def test_parallel_workers_keep_each_others_keys(tmp_path):
+    path = str(tmp_path / "iso3_lookup.csv")
+    batches = [[f"Nowhere {worker}-{i}" for i in range(20)] + ["Germany"] for worker in range(8)]
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_resolve_in_worker, [path] * len(batches), batches))
+
+    table = pd.read_csv(path, dtype=str, keep_default_na=False)
+    assert set(table["key"]) == {name for batch in batches for name in batch}
+    assert table.loc[table["key"] == "Germany", "iso3"].item() == "DEU"
+
+
+def test_hand_edits_on_disk_win(tmp_path):
+    path = str(tmp_path / "iso3_lookup.csv")
+    pd.DataFrame({"key": ["Korea, Rep."], "iso3": ["KOR"], "kind": ["country"]}).to_csv(path, index=False)
+    country_codes.reset_lookup()
+
+    resolved = country_codes.resolve_iso3(pd.Series(["Korea, Rep.", "France"]), path=path)
+
+    assert resolved.tolist() == ["KOR", "FRA"]
+    assert set(pd.read_csv(path)["key"]) == {"Korea, Rep.", "France"}
+
+
+def test_lookup_cache_is_per_path(tmp_path):
+    first, second = str(tmp_path / "a.csv"), str(tmp_path / "b.csv")
+    pd.DataFrame({"key": ["Atlantis"], "iso3": ["ATL"], "kind": ["country"]}).to_csv(first, index=False)
+
+    assert "Atlantis" in country_codes.load_lookup(first)
+    assert "Atlantis" not in country_codes.load_lookup(second)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis.derived import MIN_PERIODS, compute_derived, country_correlations, country_panel
+
+
+def merged_frame(seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for iso3 in ("DEU", "FRA", "USA"):
+        # Gaps in the years and NaN values in both series
+        years = np.sort(rng.choice(np.arange(1980, 2021), size=30, replace=False))
+        frame = pd.DataFrame({
+            "iso3": iso3,
+            "date": pd.to_datetime([f"{y}-01-01" for y in years]),
+            "inflation_rate": rng.normal(3, 2, len(years)),
+            "wage_index": rng.normal(100, 10, len(years)),
+            "commodity_price": rng.normal(60, 15, len(years)),
+        })
+        frame.loc[rng.random(len(frame)) < 0.15, "inflation_rate"] = np.nan
+        frame.loc[rng.random(len(frame)) < 0.15, "commodity_price"] = np.nan
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_rolling_correlation_matches_pandas():
+    df = merged_frame()
+    derived = compute_derived(df, window=8)
+    panel = country_panel(df)
+
+    # Window counts observations (rows), not calendar years
+    column = "inflation_commodity_corr_8obs"
+    expected = pd.concat([
+        group["inflation_rate"].rolling(8, min_periods=MIN_PERIODS).corr(group["commodity_price"])
+        for _, group in panel.groupby("iso3", sort=False)
+    ]).reindex(panel.index)
+
+    np.testing.assert_allclose(derived[column].to_numpy(), expected.to_numpy(), atol=1e-10)
+    assert derived[column].notna().sum() > 0
+
+
+def test_country_correlations_match_pandas():
+    df = merged_frame(seed=1)
+    got = country_correlations(df).set_index(["iso3", "var_x", "var_y"])
+
+    for iso3, group in country_panel(df).groupby("iso3"):
+        for x, y in [("inflation_rate", "wage_index"), ("inflation_rate", "commodity_price"),
+                     ("wage_index", "commodity_price")]:
+            row = got.loc[(iso3, x, y)]
+            assert np.isclose(row["corr"], group[x].corr(group[y], min_periods=MIN_PERIODS), atol=1e-10)
+            assert row["n_obs"] == (group[x].notna() & group[y].notna()).sum()
@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+import pytest
+
+from src.ingestion import http_cache
+from src.ingestion.http_cache import CacheMiss, HTTPCache
+
+
+def blobs(cache_dir):
+    return [name for _, _, names in os.walk(os.path.join(cache_dir, "blobs")) for name in names]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.csv"
+    path.write_bytes(b"country,year,value\n" + b"USA,2020,1.5\n" * 1000)
+    return path
+
+
+def test_local_file_is_hashed_in_chunks_and_referenced(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(http_cache, "FILE_CHUNK_SIZE", 64)
+    cache = HTTPCache(str(tmp_path / "cache"))
+
+    response = cache.get_file(source)
+
+    assert response.status == 200 and not response.not_modified
+    assert response.path == source
+    assert response.entry["blob"] == hashlib.sha256(source.read_bytes()).hexdigest()
+    assert response.entry["size"] == source.stat().st_size
+    assert response.entry["path"] == str(source)
+    # No copy of the file in the cache
+    assert blobs(cache.cache_dir) == []
+
+
+def test_unchanged_file_is_not_modified(tmp_path, source):
+    cache = HTTPCache(str(tmp_path / "cache"))
+    cache.get_file(source)
+
+    # Same size + mtime → not even hashed
+    assert cache.get_file(source).not_modified
+
+    # Rewritten with the same content → new mtime, same sha256
+    source.write_bytes(source.read_bytes())
+    os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 10**9))
+    assert cache.get_file(source).not_modified
+
+    source.write_bytes(b"country,year,value\nDEU,2020,2.0\n")
+    response = cache.get_file(source)
+    assert response.status == 200 and not response.not_modified
+    assert response.body == b"country,year,value\nDEU,2020,2.0\n"
+
+
+def test_offline_replay_of_a_local_file(tmp_path, source):
+    HTTPCache(str(tmp_path / "cache")).get_file(source)
+    offline = HTTPCache(str(tmp_path / "cache"), mode="offline")
+
+    response = offline.get_file(source)
+    assert response.from_cache and response.path == str(source)
+
+    with pytest.raises(CacheMiss):
+        offline.get_file(tmp_path / "never_cached.csv")
+
+
+def test_offline_replay_rejects_an_edited_file(tmp_path, source):
+    HTTPCache(str(tmp_path / "cache")).get_file(source)
+    source.write_bytes(b"country,year,value\nDEU,2020,2.0\n")
+
+    with pytest.raises(CacheMiss):
+        HTTPCache(str(tmp_path / "cache"), mode="offline").get_file(source)
+
+
+def test_superseded_blobs_are_deleted(tmp_path):
+    cache = HTTPCache(str(tmp_path / "cache"))
+    cache.store("http://api/a", {"page": 1}, b"v1")
+    cache.store("http://api/b", {"page": 1}, b"shared")
+    cache.store("http://api/c", {"page": 1}, b"shared")
+
+    cache.store("http://api/a", {"page": 1}, b"v2")
+    assert sorted(blobs(cache.cache_dir)) == sorted(hashlib.sha256(b).hexdigest() for b in (b"v2", b"shared"))
+
+    # Still referenced by /c → kept; a fresh cache object sees the same references
+    HTTPCache(cache.cache_dir).store("http://api/b", {"page": 1}, b"v3")
+    assert hashlib.sha256(b"shared").hexdigest() in blobs(cache.cache_dir)
+    assert cache.replay("http://api/c", {"page": 1}).body == b"shared"
+
+    HTTPCache(cache.cache_dir).store("http://api/c", {"page": 1}, b"v3")
+    assert sorted(blobs(cache.cache_dir)) == sorted(hashlib.sha256(b).hexdigest() for b in (b"v2", b"v3"))
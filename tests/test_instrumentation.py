@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.utils import instrumentation
+
+
+@pytest.fixture
+def prometheus(tmp_path, monkeypatch):
+    path = tmp_path / "metrics.prom"
+    monkeypatch.setattr(instrumentation, "METRICS_FORMAT", "prometheus")
+    monkeypatch.setattr(instrumentation, "METRICS_PATH", str(path))
+    return path
+
+
+def _peaks(path):
+    return {stage: values["peak_rss_mb"] for stage, values in instrumentation._read_prometheus(path).items()}
+
+
+@pytest.mark.skipif(instrumentation._rss_mb() is None, reason="needs /proc RSS")
+def test_peak_rss_is_per_stage(prometheus):
+    with instrumentation.stage("big"):
+        block = np.ones(64 * 1024 * 1024 // 8)   # 64 MB, touched, alive until the stage ends
+    del block
+    with instrumentation.stage("small"):
+        np.ones(1024)
+
+    peaks = _peaks(prometheus)
+    assert peaks["small"] < peaks["big"] - 32
+
+
+def _run_stage(name):
+    with instrumentation.stage(name):
+        pass
+
+
+def test_prometheus_file_keeps_other_processes_stages(prometheus):
+    names = [f"stage_{i}" for i in range(8)]
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_run_stage, names))
+    _run_stage("parent")
+
+    assert set(instrumentation._read_prometheus(prometheus)) == set(names) | {"parent"}
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+
+from src.db import load_to_db
+from src.db.config import engine
+from src.db.models import Base, MacroData
+
+# macro_data as the original loader created it: no row_hash, no unique key
+LEGACY_DDL = """
+CREATE TABLE macro_data (
+    id INTEGER PRIMARY KEY,
+    iso3 VARCHAR,
+    date DATE,
+    inflation_rate FLOAT,
+    wage_index FLOAT,
+    commodity_price FLOAT
+)
+"""
+
+
+@pytest.fixture
+def processed_csv(tmp_path):
+    path = tmp_path / "cleaned_global_data.csv"
+    pd.DataFrame({
+        "iso3": ["USA", "USA", "DEU"],
+        "date": ["2019-01-01", "2020-01-01", "2020-01-01"],
+        "inflation_rate": [1.8, 1.2, 0.5],
+        "wage_index": [100.0, 102.0, 98.0],
+        "commodity_price": [80.0, 70.0, 70.0],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def legacy_db():
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(LEGACY_DDL)
+        # The original loader appended on every run → duplicate country-years
+        for _ in range(2):
+            conn.exec_driver_sql(
+                "INSERT INTO macro_data (iso3, date, inflation_rate, wage_index, commodity_price) "
+                "VALUES ('USA', '2019-01-01', 1.8, 100.0, 80.0), ('USA', '2020-01-01', 9.9, 102.0, 70.0)"
+            )
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+def stored():
+    with engine.connect() as conn:
+        return pd.read_sql(text("SELECT iso3, date, inflation_rate, row_hash FROM macro_data ORDER BY iso3, date"),
+                           conn)
+
+
+def assert_upgraded():
+    assert not load_to_db.legacy_schema()
+    df = stored()
+    assert list(zip(df["iso3"], df["date"].astype(str))) == [
+        ("DEU", "2020-01-01"), ("USA", "2019-01-01"), ("USA", "2020-01-01"),
+    ]
+    assert df["inflation_rate"].tolist() == [0.5, 1.8, 1.2]
+    assert df["row_hash"].notna().all()
+    unique = [sorted(uq["column_names"]) for uq in inspect(engine).get_unique_constraints("macro_data")]
+    assert ["date", "iso3"] in unique
+
+
+def test_legacy_schema_is_detected(legacy_db):
+    assert load_to_db.legacy_schema()
+
+
+def test_incremental_load_upgrades_an_old_schema(legacy_db, processed_csv):
+    assert load_to_db.load_incremental(processed_csv) == 3
+    assert_upgraded()
+
+    # Next run is a plain incremental no-op
+    assert load_to_db.load_incremental(processed_csv) == 0
+
+
+def test_swap_load_upgrades_an_old_schema(legacy_db, processed_csv):
+    assert load_to_db.load_swap(processed_csv) == 3
+    assert_upgraded()
+
+    assert load_to_db.load_swap(processed_csv) == 0
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from src.db import query
+
+
+def test_clear_does_not_count_evictions():
+    query.clear_query_cache()
+    for i in range(3):
+        query._cache[("SELECT", i)] = pd.DataFrame({"x": [i]})
+    before = query.query_cache_stats()["evictions"]
+
+    query.clear_query_cache()
+
+    assert query.query_cache_stats()["evictions"] == before
+    assert query.query_cache_stats()["entries"] == 0
+
+
+def test_making_room_counts_evictions():
+    cache = query._ResultCache(maxsize=2, ttl=60)
+    before = query._stats["evictions"]
+
+    for i in range(3):
+        cache[i] = i
+
+    assert query._stats["evictions"] == before + 1
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.range_index import STATISTICS, RangeIndex
+
+COLUMNS = ["inflation_rate", "wage_index"]
+WINDOWS = [(2000, 2021), (2003, 2003), (2004, 2011), (1990, 2005), (2013, 2030), (2006, 2007), (2010, 2005)]
+
+
+def merged_frame(countries=("DEU", "FRA", "USA"), years=range(2000, 2021), seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [(c, y) for c in countries for y in years]
+    df = pd.DataFrame({
+        "iso3": [c for c, _ in rows],
+        "date": pd.to_datetime([f"{y}-01-01" for _, y in rows]),
+        "inflation_rate": rng.normal(3, 2, len(rows)),
+        "wage_index": rng.normal(100, 10, len(rows)),
+    })
+    # Gaps: NaN values and whole missing country-years
+    df.loc[rng.random(len(df)) < 0.15, "inflation_rate"] = np.nan
+    df.loc[rng.random(len(df)) < 0.15, "wage_index"] = np.nan
+    return df.drop(index=df.index[rng.random(len(df)) < 0.1]).reset_index(drop=True)
+
+
+def reference(df, start_year, end_year):
+    """The same statistics straight from pandas."""
+    countries = sorted(df["iso3"].unique())
+    window = df[df["date"].dt.year.between(start_year, end_year)]
+    long = window.melt(id_vars=["iso3"], value_vars=COLUMNS, var_name="indicator")
+    stats = long.groupby(["iso3", "indicator"])["value"].agg(["count", "mean", "min", "max"])
+    stats = stats.reindex(pd.MultiIndex.from_product([countries, COLUMNS], names=["iso3", "indicator"]))
+    stats["count"] = stats["count"].fillna(0).astype(int)
+    return stats.rename(columns={"count": "n_years"})
+
+
+def assert_matches(index, df):
+    for start_year, end_year in WINDOWS:
+        got = index.window(start_year, end_year).set_index(["iso3", "indicator"]).sort_index()
+        expected = reference(df, start_year, end_year).loc[got.index]
+        for name in STATISTICS:
+            np.testing.assert_allclose(got[name].to_numpy(dtype=float), expected[name].to_numpy(dtype=float),
+                                       rtol=1e-12, err_msg=f"{name} over {start_year}-{end_year}")
+
+
+def assert_same_arrays(index, rebuilt):
+    np.testing.assert_array_equal(index.counts, rebuilt.counts)
+    np.testing.assert_allclose(index.sums, rebuilt.sums, rtol=1e-12)
+    assert len(index.mins) == len(rebuilt.mins)
+    for level in range(len(index.mins)):
+        np.testing.assert_array_equal(index.mins[level], rebuilt.mins[level])
+        np.testing.assert_array_equal(index.maxs[level], rebuilt.maxs[level])
+
+
+@pytest.fixture
+def base():
+    return merged_frame()
+
+
+def test_build_matches_pandas(base):
+    assert_matches(RangeIndex.build(base), base)
+
+
+def test_appended_year_rebuilds_only_the_new_year(base):
+    index = RangeIndex.build(base)
+    appended = pd.concat([base, merged_frame(years=[2021], seed=1)], ignore_index=True)
+
+    updated, rebuilt_from = index.update(appended)
+
+    assert rebuilt_from == 2021
+    assert_matches(updated, appended)
+    assert_same_arrays(updated, RangeIndex.build(appended))
+
+
+def test_revised_year_rebuilds_from_that_year(base):
+    index = RangeIndex.build(base)
+    revised = base.copy()
+    years = revised["date"].dt.year
+    # First observed USA inflation from 2006 on is revised, a later DEU wage withdrawn
+    usa = revised.index[(revised["iso3"] == "USA") & (years >= 2006) & revised["inflation_rate"].notna()][0]
+    deu = revised.index[(revised["iso3"] == "DEU") & (years >= 2015) & revised["wage_index"].notna()][0]
+    revised.loc[usa, "inflation_rate"] = 42.0
+    revised.loc[deu, "wage_index"] = np.nan
+
+    updated, rebuilt_from = index.update(revised)
+
+    assert rebuilt_from == years[usa] < years[deu]
+    assert_matches(updated, revised)
+    assert_same_arrays(updated, RangeIndex.build(revised))
+
+
+def test_changed_country_set_falls_back_to_a_full_rebuild(base):
+    index = RangeIndex.build(base)
+    more = pd.concat([base, merged_frame(countries=("JPN",), seed=2)], ignore_index=True)
+
+    updated, rebuilt_from = index.update(more)
+
+    assert rebuilt_from == 2000
+    assert list(updated.countries) == ["DEU", "FRA", "JPN", "USA"]
+    assert_matches(updated, more)
+
+
+def test_unchanged_data_keeps_the_index(base):
+    index = RangeIndex.build(base)
+    assert index.update(base.copy()) == (index, None)
+
+
+def test_saved_index_round_trips(base, tmp_path):
+    index = RangeIndex.build(base)
+    loaded = RangeIndex.load(index.save(str(tmp_path / "range_index.npz")))
+
+    assert_same_arrays(loaded, index)
+    assert_matches(loaded, base)
@@ -0,0 +1,31 @@
+import os
+import shutil
+
+from src.pipeline import runner
+
+
+def _stages(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(runner.ROOT_DIR, "src"), tmp_path / "src")
+    monkeypatch.setattr(runner, "ROOT_DIR", str(tmp_path))
+    return {s.name: s for s in runner.build_stages(with_db=True, with_eda=True)}
+
+
+def test_code_files_follow_the_real_work(tmp_path, monkeypatch):
+    stages = _stages(tmp_path, monkeypatch)
+    files = {os.path.relpath(p, tmp_path) for p in runner.code_files(stages["merge"].func)}
+
+    assert os.path.join("src", "processing", "clean_and_merge.py") in files
+    assert os.path.join("src", "processing", "commodity_rollups.py") in files
+
+
+def test_changing_worker_code_invalidates_the_stage(tmp_path, monkeypatch):
+    stages = _stages(tmp_path, monkeypatch)
+    before = {name: runner.stage_hash(s) for name, s in stages.items()}
+
+    with open(tmp_path / "src" / "processing" / "commodity_rollups.py", "a") as f:
+        f.write("\n# changed\n")
+    after = {name: runner.stage_hash(s) for name, s in stages.items()}
+
+    assert after["imf_rollups"] != before["imf_rollups"]
+    assert after["merge"] != before["merge"]
+    assert after["derived"] == before["derived"]
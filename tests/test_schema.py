@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.schema import compact, memory_bytes
+
+
+def macro_frame(rows=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "iso3": np.array(["USA", "DEU", "FRA", "JPN"], dtype=object)[rng.integers(0, 4, rows)],
+        "date": pd.to_datetime((1980 + rng.integers(0, 40, rows)).astype(str), format="%Y"),
+        "inflation_rate": rng.normal(3, 2, rows).round(2),
+        "wage_index": rng.normal(100, 10, rows).round(1),
+    })
+
+
+def test_compact_never_widens_the_frame():
+    df = macro_frame()
+    before = memory_bytes(df).sum()
+
+    compacted = compact(df.copy())
+
+    assert list(compacted.columns) == list(df.columns)
+    assert isinstance(compacted["iso3"].dtype, pd.CategoricalDtype)
+    assert compacted["date"].dtype == df["date"].dtype
+    assert compacted["inflation_rate"].dtype == "float32"
+    assert memory_bytes(compacted).sum() < before
+
+
+def test_year_is_derived_only_on_request():
+    compacted = compact(macro_frame(), year=True)
+
+    assert compacted["year"].dtype == "int16"
+    assert (compacted["year"] == compacted["date"].dt.year).all()
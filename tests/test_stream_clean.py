@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from src.processing import stream_clean
+from src.processing.clean_and_merge import clean_inflation, clean_wages
+
+RAW_INFLATION = """country,year,inflation_rate
+Germany,2019,1.4%
+Germany,2020,"0,5"
+France,2019,1.1
+France,2020,
+United States,2019,"1,234"
+"""
+
+RAW_WAGES = """REF_AREA,TIME_PERIOD,OBS_VALUE,UNIT
+DEU,2019,"52,000 USD",USD
+FRA,2019,45000,USD
+FRA,2020,n/a,USD
+"""
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    (tmp_path / "worldbank_inflation.csv").write_text(RAW_INFLATION)
+    (tmp_path / "oecd_wages.csv").write_text(RAW_WAGES)
+    return tmp_path
+
+
+@pytest.mark.parametrize("name, cleaner", [("inflation", clean_inflation), ("wages", clean_wages)])
+def test_streaming_matches_in_memory_cleaning(raw_dir, tmp_path, name, cleaner):
+    spec = stream_clean.SOURCES[name]
+    interim_dir = tmp_path / "interim"
+
+    stream_clean.stream_clean_source(name, chunksize=2, raw_dir=str(raw_dir), interim_dir=str(interim_dir))
+    streamed = stream_clean.read_cleaned(name, interim_dir=str(interim_dir))
+    expected = cleaner(pd.read_csv(raw_dir / spec["file"]))
+
+    value = streamed.columns[-1]
+    assert streamed["iso3"].tolist() == expected["iso3"].astype(object).tolist()
+    assert streamed[value].tolist() == pytest.approx(expected[value].astype("float64").tolist(), nan_ok=True)
+
+
+def test_formatted_values_are_parsed(raw_dir, tmp_path):
+    interim_dir = str(tmp_path / "interim")
+    stream_clean.stream_clean_source("inflation", chunksize=2, raw_dir=str(raw_dir), interim_dir=interim_dir)
+    streamed = stream_clean.read_cleaned("inflation", interim_dir=interim_dir)
+
+    assert streamed["inflation_rate"].tolist()[:2] == [1.4, 5.0]
+    assert streamed["inflation_rate"].iloc[-1] == 1234.0
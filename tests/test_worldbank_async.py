@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import json
+
+import pandas as pd
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer, unused_port
+
+from src.ingestion import worldbank_async
+from src.ingestion.http_cache import HTTPCache
+
+CODE = "FP.CPI.TOTL.ZG"
+COLUMN = "inflation_rate"
+COUNTRIES = [("US", "United States"), ("DE", "Germany"), ("FR", "France"), ("JP", "Japan")]
+
+
+class StandInAPI:
+    """World Bank v2 stand-in: paging, date windows, ETag / 304 and scripted failures."""
+
+    def __init__(self, years=range(2015, 2024), per_page=5):
+        self.values = {(cid, year): round(cid_index + year / 1000, 3)
+                       for cid_index, (cid, _) in enumerate(COUNTRIES) for year in years}
+        self.last_updated = "2024-01-10"
+        self.per_page = per_page
+        self.fail = {}          # page → statuses to return before succeeding
+        self.delay = {}         # page → seconds to wait before answering
+        self.requests = []
+        # Fixed across runs: the URL is part of the HTTP cache key
+        self.port = unused_port()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/v2/country/all/indicator/{code}", self.handle)
+        return app
+
+    async def handle(self, request):
+        page = int(request.query.get("page", 1))
+        self.requests.append(dict(request.query))
+
+        if self.fail.get(page):
+            return web.Response(status=self.fail[page].pop(0))
+        await asyncio.sleep(self.delay.get(page, 0))
+
+        names = dict(COUNTRIES)
+        rows = sorted(self.values.items(), key=lambda kv: (-kv[0][1], kv[0][0]))
+        if "date" in request.query:
+            start, end = (int(y) for y in request.query["date"].split(":"))
+            rows = [r for r in rows if start <= r[0][1] <= end]
+
+        pages = max(1, -(-len(rows) // self.per_page))
+        chunk = rows[(page - 1) * self.per_page:page * self.per_page]
+        body = json.dumps([
+            {"page": page, "pages": pages, "per_page": self.per_page, "total": len(rows),
+             "lastupdated": self.last_updated},
+            [{"country": {"id": cid, "value": names[cid]}, "date": str(year), "value": value}
+             for (cid, year), value in chunk],
+        ])
+
+        etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.setattr(worldbank_async, "cache", HTTPCache(str(tmp_path / "http_cache")))
+    monkeypatch.setattr(worldbank_async, "BACKOFF_SECONDS", 0)
+    return tmp_path
+
+
+def run(api, tmp_path, full=False):
+    async def go():
+        server = TestServer(api.app(), port=api.port)
+        await server.start_server()
+        try:
+            return await worldbank_async.ingest(
+                {CODE: COLUMN}, base_url=str(server.make_url("/v2")), raw_dir=str(tmp_path / "raw"),
+                concurrency=4, full=full, watermark_path=str(tmp_path / "raw" / "watermarks.json"),
+            )
+        finally:
+            await server.close()
+
+    api.requests.clear()
+    return asyncio.run(go())[CODE]
+
+
+def raw(tmp_path):
+    return pd.read_csv(worldbank_async.raw_file(COLUMN, str(tmp_path / "raw")))
+
+
+def watermark(tmp_path):
+    return worldbank_async.load_watermarks(str(tmp_path / "raw" / "watermarks.json"))[CODE]
+
+
+def test_every_page_is_written_in_page_order(env):
+    api = StandInAPI()
+    # Later pages land first: the file must still follow the API's order
+    api.delay = {2: 0.2, 3: 0.1}
+
+    written = run(api, env, full=True)
+
+    assert written == 36
+    assert sorted(int(r["page"]) for r in api.requests) == list(range(1, 9))
+    df = raw(env)
+    assert list(df.columns) == ["country_code", "country", "year", COLUMN]
+    expected = sorted(api.values, key=lambda k: (-k[1], k[0]))
+    assert list(zip(df["country_code"], df["year"])) == expected
+    assert watermark(env)["last_year"] == 2023
+
+
+def test_transient_errors_are_retried(env):
+    api = StandInAPI()
+    api.fail = {1: [503], 2: [429, 502]}
+
+    assert run(api, env, full=True) == 36
+
+    assert [int(r["page"]) for r in api.requests].count(2) == 3
+    assert len(raw(env)) == 36
+
+
+def test_persistent_error_fails_the_indicator_and_keeps_the_watermark(env, monkeypatch):
+    monkeypatch.setattr(worldbank_async, "MAX_RETRIES", 1)
+    api = StandInAPI()
+    run(api, env, full=True)
+    before = watermark(env)
+
+    api.fail = {1: [503, 503]}
+    result = run(api, env, full=True)
+
+    assert isinstance(result, worldbank_async.RetryableError)
+    assert watermark(env) == before
+
+
+def test_not_modified_skips_the_indicator(env):
+    api = StandInAPI()
+    run(api, env, full=True)
+    path = worldbank_async.raw_file(COLUMN, str(env / "raw"))
+    with open(path, "rb") as f:
+        content = f.read()
+
+    assert run(api, env, full=True) == 0
+
+    # Page 1 answered 304 → no other page requested, file untouched
+    assert [int(r["page"]) for r in api.requests] == [1]
+    with open(path, "rb") as f:
+        assert f.read() == content
+    assert watermark(env)["last_year"] == 2023
+
+
+def test_incremental_sync_merges_the_recent_window(env):
+    api = StandInAPI()
+    run(api, env, full=True)
+
+    api.last_updated = "2024-02-01"
+    api.values[("US", 2023)] = 9.5          # revised
+    api.values[("DE", 2024)] = 4.2          # new year
+    api.values[("FR", 2022)] = None         # withdrawn (null value)
+
+    written = run(api, env)
+
+    assert watermark(env)["mode"] == "incremental"
+    assert {r.get("date") for r in api.requests} == {f"2022:{max(2024, pd.Timestamp.now().year)}"}
+    assert written == 9
+
+    df = raw(env).set_index(["country_code", "year"])[COLUMN]
+    assert df[("US", 2023)] == 9.5
+    assert df[("DE", 2024)] == 4.2
+    assert ("FR", 2022) not in df.index
+    assert df[("JP", 2015)] == api.values[("JP", 2015)]
+    assert len(df) == 36                    # +1 new, -1 withdrawn
+    assert watermark(env)["last_year"] == 2024
+
+
+def test_incremental_sync_skips_an_unchanged_lastupdated(env):
+    api = StandInAPI()
+    run(api, env, full=True)
+    api.values[("US", 2023)] = 9.5          # same lastupdated stamp → not merged
+
+    assert run(api, env) == 0
+
+    assert [int(r["page"]) for r in api.requests] == [1]
+    assert raw(env).set_index(["country_code", "year"])[COLUMN][("US", 2023)] != 9.5